@@ -169,6 +169,7 @@ custom_links = {
     "Python": ("Python", "https://python.org"),
     "NumPy": ("NumPy", "https://numpy.org/"),
     "SciPy": ("SciPy", "https://scipy.org/"),
+    "Numba": ("Numba", "https://numba.pydata.org/"),
     "matplotlib": ("matplotlib", "https://matplotlib.org/"),
     "tqdm": ("tqdm", "https://tqdm.github.io/"),
     "termcolor": ("termcolor", "https://pypi.org/project/termcolor/"),
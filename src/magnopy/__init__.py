@@ -21,16 +21,92 @@ __doclink__ = "magnopy.org"
 __release_date__ = "undefined"
 __git_commit__ = "undefined"
 
-from . import exceptions, io, magnons, spinham, units
-from .exceptions import *
-from .io import *
-from .magnons import *
-from .spinham import *
-from .units import *
+import importlib
+
+# Submodules and the names they export are imported at the first access
+# (PEP 562), so "import magnopy" does not load h5py, scipy, wulfric, etc.
+# Has to be in sync with the __all__ of the submodules.
+_LAZY_NAMES = {
+    "exceptions": (
+        "ColpaFailed",
+        "NotationError",
+        "FailedToVerifyTxtModelFile",
+    ),
+    "io": (
+        "load_spinham",
+        "load_spinham_txt",
+        "dump_spinham_txt",
+        "load_tb2j",
+        "dump_vampire",
+        "dump_mat",
+        "dump_ucf",
+        "load_spinham_hdf5",
+        "dump_spinham_hdf5",
+    ),
+    "magnons": (
+        "solve_via_colpa",
+        "solve_via_colpa_batch",
+        "solve_via_colpa_classified",
+        "COLPA_POSITIVE_DEFINITE",
+        "COLPA_POSITIVE_SEMIDEFINITE",
+        "COLPA_NEGATIVE_DEFINITE",
+        "COLPA_NEGATIVE_SEMIDEFINITE",
+        "COLPA_UNSTABLE",
+        "COLPA_FAILED",
+        "MagnonDispersion",
+        "MagnonDOS",
+        "DispersionInterpolator",
+        "DispersionKernel",
+        "KGrid",
+        "lattice_point_group",
+        "SQW",
+        "MagnonThermodynamics",
+    ),
+    "spinham": (
+        "SpinHamiltonian",
+        "PREDEFINED_NOTATIONS",
+        "MatrixParameter",
+        "Energy",
+        "LuttingerTisza",
+    ),
+    "units": (
+        "si",
+        "LENGTH",
+        "ENERGY",
+        "TIME",
+        "MAGNETIC_FIELD",
+        "TEMPERATURE",
+        "LENGTH_NAME",
+        "ENERGY_NAME",
+        "TIME_NAME",
+        "MAGNETIC_FIELD_NAME",
+        "TEMPERATURE_NAME",
+        "TRUE_KEYWORDS",
+        "FALSE_KEYWORDS",
+    ),
+}
+
+# Name -> submodule
+_LAZY_SOURCES = dict(
+    [(name, module) for module in _LAZY_NAMES for name in _LAZY_NAMES[module]]
+)
 
 __all__ = ["__version__", "__doclink__", "__release_date__"]
-__all__.extend(spinham.__all__)
-__all__.extend(io.__all__)
-__all__.extend(magnons.__all__)
-__all__.extend(exceptions.__all__)
-__all__.extend(units.__all__)
+__all__.extend(_LAZY_SOURCES)
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    elif name in _LAZY_SOURCES:
+        value = getattr(__getattr__(_LAZY_SOURCES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Cache it, so __getattr__ is called only once for each name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_LAZY_NAMES))
@@ -0,0 +1,47 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+R"""
+Memory budget of the chunked computations.
+
+Large stacks (phases of the bonds for many k points, broadened states for many
+energies, ...) are computed in chunks, each of which has at most
+:py:data:`MAX_ELEMENTS` elements.
+"""
+
+# Maximum amount of elements in the arrays, that are computed at once.
+# 2**22 complex numbers take 64 MiB.
+MAX_ELEMENTS = 2**22
+
+
+def chunk_size(elements_per_item):
+    r"""
+    Amount of items, that fit in the memory budget.
+
+    Parameters
+    ----------
+    elements_per_item : int
+        Amount of elements of the computed arrays per one item (i.e. per k point).
+
+    Returns
+    -------
+    size : int
+        Amount of items in one chunk, at least one.
+    """
+
+    return max(1, MAX_ELEMENTS // max(1, int(elements_per_item)))
@@ -0,0 +1,206 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+R"""
+Optional compiled backend.
+
+If |Numba|_ is importable, then the kernels of this module are compiled
+just-in-time and are used by :py:class:`.MagnonDispersion` and :py:class:`.Energy`
+for the sums over the bonds. Otherwise the kernels are plain Python functions, that
+are not used by magnopy, and the NumPy implementations are used instead.
+
+The compiled backend can be switched off by setting the environment variable
+``MAGNOPY_NUMBA=0`` before the import of magnopy.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import numba
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Whether the compiled kernels are used
+ENABLED = NUMBA_AVAILABLE and os.environ.get("MAGNOPY_NUMBA", "1") != "0"
+
+# Whether the thread pool of the parallel kernels is started in this process.
+# Processes, that are forked after that, hang in the parallel kernels.
+THREADS_STARTED = False
+
+
+def _jit(parallel=False):
+    # Compile the kernel if numba is available, keep the Python function otherwise
+    def decorator(function):
+        if NUMBA_AVAILABLE:
+            return numba.njit(cache=True, parallel=parallel)(function)
+        return function
+
+    return decorator
+
+
+if NUMBA_AVAILABLE:
+    prange = numba.prange
+else:
+    prange = range
+
+
+def bond_sum(kpoints, dis_vectors, J_matrices, indices_i, indices_j, N):
+    r"""
+    Fourier transform of the exchange parameters.
+
+    .. math::
+
+        \boldsymbol{J}_{i,j}(\boldsymbol{k}) = \sum_{\boldsymbol{d}}\boldsymbol{J}_{i,j}(\boldsymbol{d})e^{-i\boldsymbol{k}\boldsymbol{d}}
+
+    Parameters
+    ----------
+    kpoints : (M, 3) :numpy:`ndarray`
+        Reciprocal vectors in absolute coordinates.
+    dis_vectors : (B, 3) :numpy:`ndarray`
+        Bond vectors.
+    J_matrices : (B, 3, 3) :numpy:`ndarray`
+        Exchange parameters.
+    indices_i : (B,) :numpy:`ndarray` of int
+        Indices of the first atom in the exchange pair.
+    indices_j : (B,) :numpy:`ndarray` of int
+        Indices of the second atom in the exchange pair.
+    N : int
+        Number of magnetic atoms.
+
+    Returns
+    -------
+    J : (M, N, N, 3, 3) :numpy:`ndarray`
+        J(k) matrix for each k point.
+    """
+
+    global THREADS_STARTED
+    THREADS_STARTED = THREADS_STARTED or NUMBA_AVAILABLE
+
+    return _bond_sum(kpoints, dis_vectors, J_matrices, indices_i, indices_j, N)
+
+
+@_jit(parallel=True)
+def _bond_sum(kpoints, dis_vectors, J_matrices, indices_i, indices_j, N):
+    # Compiled kernel of bond_sum
+    M = kpoints.shape[0]
+    B = J_matrices.shape[0]
+    result = np.zeros((M, N, N, 3, 3), dtype=np.complex128)
+
+    # Each k point is independent, no race conditions
+    for m in prange(M):
+        for b in range(B):
+            phase = (
+                kpoints[m, 0] * dis_vectors[b, 0]
+                + kpoints[m, 1] * dis_vectors[b, 1]
+                + kpoints[m, 2] * dis_vectors[b, 2]
+            )
+            value = np.cos(phase) - 1j * np.sin(phase)
+            i = indices_i[b]
+            j = indices_j[b]
+            for x in range(3):
+                for y in range(3):
+                    result[m, i, j, x, y] += value * J_matrices[b, x, y]
+
+    return result
+
+
+@_jit()
+def bilinear_sum(
+    left,
+    right,
+    coefficients,
+    weights,
+    spiral_vector,
+    dis_vectors,
+    J_matrices,
+    indices_i,
+    indices_j,
+):
+    r"""
+    Sum of the bilinear forms over the bonds.
+
+    .. math::
+
+        E = \sum_{b}w_b\sum_{t}\left(c_t^0 + c_t^c\cos(\boldsymbol{q}\boldsymbol{d}_b)
+        + c_t^s\sin(\boldsymbol{q}\boldsymbol{d}_b)\right)
+        \boldsymbol{l}_{t,i_b}^T\boldsymbol{J}_b\boldsymbol{r}_{t,j_b}
+
+    Parameters
+    ----------
+    left : (T, I, 3) :numpy:`ndarray`
+        Left vectors of each term for each atom.
+    right : (T, I, 3) :numpy:`ndarray`
+        Right vectors of each term for each atom.
+    coefficients : (T, 3) :numpy:`ndarray`
+        Constant, cosine and sine coefficients of each term.
+    weights : (B,) :numpy:`ndarray`
+        Weight of each bond.
+    spiral_vector : (3,) :numpy:`ndarray`
+        Spiral vector :math:`\boldsymbol{q}`.
+    dis_vectors : (B, 3) :numpy:`ndarray`
+        Bond vectors.
+    J_matrices : (B, 3, 3) :numpy:`ndarray`
+        Exchange parameters.
+    indices_i : (B,) :numpy:`ndarray` of int
+        Indices of the first atom in the exchange pair.
+    indices_j : (B,) :numpy:`ndarray` of int
+        Indices of the second atom in the exchange pair.
+
+    Returns
+    -------
+    energy : float
+        Value of the sum.
+    gradient : (3,) :numpy:`ndarray`
+        Derivative of the sum with respect to the spiral vector.
+    """
+
+    T = coefficients.shape[0]
+    B = J_matrices.shape[0]
+    energy = 0.0
+    gradient = np.zeros(3, dtype=np.float64)
+
+    for b in range(B):
+        phase = (
+            spiral_vector[0] * dis_vectors[b, 0]
+            + spiral_vector[1] * dis_vectors[b, 1]
+            + spiral_vector[2] * dis_vectors[b, 2]
+        )
+        cos = np.cos(phase)
+        sin = np.sin(phase)
+        i = indices_i[b]
+        j = indices_j[b]
+        value = 0.0
+        derivative = 0.0
+        for t in range(T):
+            form = 0.0
+            for x in range(3):
+                for y in range(3):
+                    form += left[t, i, x] * J_matrices[b, x, y] * right[t, j, y]
+            value += (
+                coefficients[t, 0] + coefficients[t, 1] * cos + coefficients[t, 2] * sin
+            ) * form
+            derivative += (coefficients[t, 2] * cos - coefficients[t, 1] * sin) * form
+        energy += weights[b] * value
+        for x in range(3):
+            gradient[x] += weights[b] * derivative * dis_vectors[b, x]
+
+    return energy, gradient
@@ -16,7 +16,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from magnopy.magnons.diagonalization import solve_via_colpa
-from magnopy.magnons.dispersion import MagnonDispersion
+from magnopy.magnons.diagonalization import *
+from magnopy.magnons.dispersion import *
+from magnopy.magnons.dos import *
+from magnopy.magnons.interpolation import *
+from magnopy.magnons.kernel import *
+from magnopy.magnons.kgrid import *
+from magnopy.magnons.sqw import *
+from magnopy.magnons.thermodynamics import *
 
-__all__ = ["solve_via_colpa", "MagnonDispersion"]
+__all__ = []
+__all__.extend(diagonalization.__all__)
+__all__.extend(dispersion.__all__)
+__all__.extend(dos.__all__)
+__all__.extend(interpolation.__all__)
+__all__.extend(kernel.__all__)
+__all__.extend(kgrid.__all__)
+__all__.extend(sqw.__all__)
+__all__.extend(thermodynamics.__all__)
@@ -21,7 +21,25 @@ from numpy.linalg import LinAlgError
 
 from magnopy.exceptions import ColpaFailed
 
-__all__ = ["solve_via_colpa"]
+__all__ = [
+    "solve_via_colpa",
+    "solve_via_colpa_batch",
+    "solve_via_colpa_classified",
+    "COLPA_POSITIVE_DEFINITE",
+    "COLPA_POSITIVE_SEMIDEFINITE",
+    "COLPA_NEGATIVE_DEFINITE",
+    "COLPA_NEGATIVE_SEMIDEFINITE",
+    "COLPA_UNSTABLE",
+    "COLPA_FAILED",
+]
+
+# Status codes of the grand-dynamical matrix, see solve_via_colpa_classified()
+COLPA_POSITIVE_DEFINITE = 0
+COLPA_POSITIVE_SEMIDEFINITE = 1
+COLPA_NEGATIVE_DEFINITE = 2
+COLPA_NEGATIVE_SEMIDEFINITE = 3
+COLPA_UNSTABLE = 4
+COLPA_FAILED = 5
 
 
 def solve_via_colpa(D):
@@ -118,32 +136,229 @@ def solve_via_colpa(D):
         93(3-4), pp.327-353.
     """
 
-    D = np.array(D)
+    E, G, success = solve_via_colpa_batch([D])
 
-    N = len(D) // 2
-    g = np.diag(np.concatenate((np.ones(N), -np.ones(N))))
+    if not success[0]:
+        raise ColpaFailed
+
+    return E[0], G[0]
+
+
+def _cholesky_bisect(D, K_dag, success):
+    r"""
+    Cholesky decomposition of a stack of matrices, that tolerates the matrices,
+    which are not positive-defined.
+
+    Numpy fails for the whole stack if one of the matrices is not
+    positive-defined. In that case the stack is split in two halves, that are
+    decomposed again. Therefore, the amount of the calls is proportional to
+    :math:`f\log M` for :math:`f` failed matrices and the decomposition stays
+    batched for the rest of them.
+
+    Parameters
+    ----------
+    D : (M, 2N, 2N) :numpy:`ndarray`
+        Stack of matrices.
+    K_dag : (M, 2N, 2N) :numpy:`ndarray`
+        Lower triangular matrices, filled in place.
+    success : (M,) :numpy:`ndarray` of bool
+        Set to ``False`` in place for the matrices, that are not positive-defined.
+    """
 
     try:
-        # In Colpa article decomposition is K^{\dag}K, while numpy gives KK^{\dag}
-        K = np.conjugate(np.linalg.cholesky(D)).T
+        K_dag[:] = np.linalg.cholesky(D)
     except LinAlgError:
-        raise ColpaFailed
+        if len(D) == 1:
+            success[0] = False
+            return
+        middle = len(D) // 2
+        _cholesky_bisect(D[:middle], K_dag[:middle], success[:middle])
+        _cholesky_bisect(D[middle:], K_dag[middle:], success[middle:])
+
+
+def solve_via_colpa_batch(D):
+    r"""
+    Diagonalize a stack of grand-dynamical matrices following the method of Colpa [1]_.
+
+    Vectorized version of :py:func:`.solve_via_colpa`. Cholesky decomposition,
+    diagonalization and the computation of the transformation matrices are done for
+    the whole stack at once. As :math:`\boldsymbol{K}\boldsymbol{g}\boldsymbol{K}^{\dagger}`
+    is Hermitian, the Hermitian eigensolver is used.
+
+    Parameters
+    ----------
+    D : (M, 2N, 2N) |array-like|_
+        Stack of grand dynamical matrices. Each one has to be Hermitian and
+        positive-defined. See :py:func:`.solve_via_colpa` for details.
+
+    Returns
+    -------
+    E : (M, 2N) :numpy:`ndarray`
+        The eigenvalues for each matrix of the stack. Order is the same as in
+        :py:func:`.solve_via_colpa`. Filled with ``nan`` for the matrices, that
+        failed to be diagonalized.
+    G : (M, 2N, 2N) :numpy:`ndarray`
+        Transformation matrix for each matrix of the stack.
+        See :py:func:`.solve_via_colpa` for details. Filled with ``nan`` for the
+        matrices, that failed to be diagonalized.
+    success : (M,) :numpy:`ndarray` of bool
+        Whether the diagonalization succeeded for each matrix of the stack.
+        It fails if the matrix is not positive-defined.
+
+    Notes
+    -----
+    Unlike :py:func:`.solve_via_colpa` this function does not raise
+    :py:exc:`.ColpaFailed`, but reports the failed matrices via ``success``.
+
+    References
+    ----------
+    .. [1] Colpa, J.H.P., 1978.
+        Diagonalization of the quadratic boson hamiltonian.
+        Physica A: Statistical Mechanics and its Applications,
+        93(3-4), pp.327-353.
+    """
+
+    D = np.array(D, dtype=complex)
+
+    M = len(D)
+    N = D.shape[-1] // 2
+    g = np.concatenate((np.ones(N), -np.ones(N)))
+
+    E = np.full((M, 2 * N), np.nan, dtype=float)
+    G = np.full((M, 2 * N, 2 * N), np.nan, dtype=complex)
+    success = np.ones(M, dtype=bool)
 
-    L, U = np.linalg.eig(K @ g @ np.conjugate(K).T)
+    # In Colpa article decomposition is K^{\dag}K, while numpy gives KK^{\dag}
+    K_dag = np.zeros(D.shape, dtype=complex)
+    _cholesky_bisect(D, K_dag, success)
+
+    if not success.any():
+        return E, G, success
+
+    K_dag = K_dag[success]
+    K = np.conjugate(np.transpose(K_dag, (0, 2, 1)))
+
+    # Eigenvalues of K g K^{\dag} in ascending order
+    L, U = np.linalg.eigh((K * g) @ K_dag)
 
     # Sort with respect to L, in descending order
-    U = np.concatenate((L[:, None], U.T), axis=1).T
-    U = U[:, np.argsort(U[0])]
-    L = U[0, ::-1]
-    U = U[1:, ::-1]
+    L = L[:, ::-1]
+    U = U[:, :, ::-1]
 
-    E = g @ L
+    E_success = g * L
 
-    G_minus_one = np.linalg.inv(K) @ U @ np.sqrt(np.diag(E))
+    # G^{-1} = K^{-1} U sqrt(E), without the explicit inversion of K
+    G_minus_one = np.linalg.solve(K, U * np.sqrt(E_success)[:, np.newaxis, :])
 
     # Compute G from G^-1 following Colpa, see equation (3.7) for details
-    G = np.conjugate(G_minus_one).T
-    G[:N, N:] *= -1
-    G[N:, :N] *= -1
+    G_success = np.conjugate(np.transpose(G_minus_one, (0, 2, 1)))
+    G_success[:, :N, N:] *= -1
+    G_success[:, N:, :N] *= -1
+
+    E[success] = E_success
+    G[success] = G_success
+
+    return E, G, success
+
+
+def solve_via_colpa_classified(D, tolerance=1e-8):
+    r"""
+    Classify and diagonalize a stack of grand-dynamical matrices.
+
+    Every matrix is first diagonalized via :py:func:`.solve_via_colpa_batch`. The
+    eigenvalues of the matrices, for which the Cholesky decomposition failed, are
+    computed once and the matrices are classified in one of the categories:
+
+    * ``COLPA_POSITIVE_DEFINITE``
+      Matrix is diagonalized as it is.
+    * ``COLPA_POSITIVE_SEMIDEFINITE``
+      Matrix is diagonalized as :math:`\boldsymbol{D} + \epsilon\boldsymbol{I}`.
+    * ``COLPA_NEGATIVE_DEFINITE``
+      Matrix is diagonalized as :math:`-\boldsymbol{D}`, signs of ``E`` and ``G``
+      are inverted.
+    * ``COLPA_NEGATIVE_SEMIDEFINITE``
+      Matrix is diagonalized as :math:`-\boldsymbol{D} + \epsilon\boldsymbol{I}`,
+      signs of ``E`` and ``G`` are inverted.
+    * ``COLPA_UNSTABLE``
+      Matrix has both positive and negative eigenvalues, it is not diagonalized.
+    * ``COLPA_FAILED``
+      Diagonalization failed for the matrix of the selected category.
+
+    where :math:`\epsilon` is equal to ``tolerance``. All matrices of the
+    semidefinite and negative categories are diagonalized by one more call to
+    :py:func:`.solve_via_colpa_batch`.
+
+    Parameters
+    ----------
+    D : (M, 2N, 2N) |array-like|_
+        Stack of grand dynamical matrices. Each one has to be Hermitian.
+    tolerance : float, default 1e-8
+        Eigenvalues with the absolute value smaller than ``tolerance`` are treated
+        as zero.
+
+    Returns
+    -------
+    E : (M, 2N) :numpy:`ndarray`
+        The eigenvalues for each matrix of the stack. See
+        :py:func:`.solve_via_colpa` for details. Filled with ``nan`` for the
+        matrices with the status ``COLPA_UNSTABLE`` or
+        ``COLPA_FAILED``.
+    G : (M, 2N, 2N) :numpy:`ndarray`
+        Transformation matrix for each matrix of the stack. See
+        :py:func:`.solve_via_colpa` for details. Filled with ``nan`` for the
+        matrices with the status ``COLPA_UNSTABLE`` or
+        ``COLPA_FAILED``.
+    status : (M,) :numpy:`ndarray` of int
+        Status code for each matrix of the stack.
+    """
+
+    D = np.array(D, dtype=complex)
+
+    E, G, success = solve_via_colpa_batch(D)
+
+    status = np.full(len(D), COLPA_POSITIVE_DEFINITE, dtype=int)
+
+    if success.all():
+        return E, G, status
+
+    failed = np.nonzero(~success)[0]
+
+    # Single eigenvalue check for all failed matrices
+    eigenvalues = np.linalg.eigvalsh(D[failed])
+    lowest = eigenvalues[:, 0]
+    highest = eigenvalues[:, -1]
+
+    status[failed] = COLPA_UNSTABLE
+    status[failed[lowest >= -tolerance]] = COLPA_POSITIVE_SEMIDEFINITE
+    status[failed[highest < -tolerance]] = COLPA_NEGATIVE_DEFINITE
+    status[
+        failed[(highest >= -tolerance) & (highest <= tolerance) & (lowest < -tolerance)]
+    ] = COLPA_NEGATIVE_SEMIDEFINITE
+
+    # Positive semidefinite: D + eps, negative: -D, negative semidefinite: -D + eps
+    signs = np.ones(len(D), dtype=float)
+    signs[
+        (status == COLPA_NEGATIVE_DEFINITE) | (status == COLPA_NEGATIVE_SEMIDEFINITE)
+    ] = -1
+    shifts = np.zeros(len(D), dtype=float)
+    shifts[
+        (status == COLPA_POSITIVE_SEMIDEFINITE)
+        | (status == COLPA_NEGATIVE_SEMIDEFINITE)
+    ] = tolerance
+
+    to_solve = failed[status[failed] != COLPA_UNSTABLE]
+
+    if len(to_solve) == 0:
+        return E, G, status
+
+    identity = np.eye(D.shape[-1], dtype=float)
+    E_solved, G_solved, success = solve_via_colpa_batch(
+        signs[to_solve, np.newaxis, np.newaxis] * D[to_solve]
+        + shifts[to_solve, np.newaxis, np.newaxis] * identity
+    )
+
+    E[to_solve] = signs[to_solve, np.newaxis] * E_solved
+    G[to_solve] = signs[to_solve, np.newaxis, np.newaxis] * G_solved
+    status[to_solve[~success]] = COLPA_FAILED
 
-    return E, G
+    return E, G, status
@@ -16,60 +16,41 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from copy import deepcopy
-from math import sqrt
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
-from scipy.spatial.transform import Rotation
+from scipy.optimize import linear_sum_assignment, minimize
 from wulfric import Kpoints
 
-from magnopy.magnons.diagonalization import ColpaFailed, solve_via_colpa
-from magnopy.spinham.hamiltonian import SpinHamiltonian
+from magnopy import _chunking, _numba
+from magnopy.magnons.diagonalization import (
+    COLPA_FAILED,
+    COLPA_UNSTABLE,
+    solve_via_colpa_classified,
+)
+from magnopy.magnons.interpolation import DispersionInterpolator
+from magnopy.magnons.kernel import DispersionKernel, span_orthonormal_set
+from magnopy.magnons.kgrid import KGrid, lattice_point_group
 
 __all__ = ["MagnonDispersion"]
 
+# Instance of MagnonDispersion of the worker process, see _initialize_worker()
+_worker_dispersion = None
 
-def span_orthonormal_set(vec):
-    r"""
-    Span orthonormal set of vectors.
-
-    Parameters
-    ----------
-    vec : (3,) |array-like|_
-        Vector, which serves as :math:`e_3`
-
-    Returns
-    -------
-    e1 : (3,) :numpy:`ndarray`
-    e2 : (3,) :numpy:`ndarray`
-    e3 : (3,) :numpy:`ndarray`
-    """
 
-    vec = np.array(vec) / np.linalg.norm(vec)
+def _initialize_worker(kernel):
+    # Called once per worker process, so the bond arrays are transferred only once
+    global _worker_dispersion
+    _worker_dispersion = MagnonDispersion(kernel)
 
-    if np.allclose(vec, [0, 0, 1]):
-        return (
-            np.array([1.0, 0.0, 0.0]),
-            np.array([0.0, 1.0, 0.0]),
-            np.array([0.0, 0.0, 1.0]),
-        )
 
-    if np.allclose(vec, [0, 0, -1]):
-        return (
-            np.array([1.0, 0.0, 0.0]),
-            np.array([0.0, -1.0, 0.0]),
-            np.array([0.0, 0.0, -1.0]),
-        )
+def _worker_omegas(kpoints):
+    return _worker_dispersion._omegas_with_status(kpoints)
 
-    z_dir = [0, 0, 1]
-    n = (
-        np.cross(vec, z_dir)
-        / np.linalg.norm(np.cross(vec, z_dir))
-        * np.arccos(np.dot(vec, z_dir) / np.linalg.norm(vec))
-    )
-    rotation_matrix = Rotation.from_rotvec(n).as_matrix()
 
-    return rotation_matrix
+def _task_omegas(kernel, kpoints):
+    return MagnonDispersion(kernel)._omegas_with_status(kpoints)
 
 
 class MagnonDispersion:
@@ -78,20 +59,21 @@ class MagnonDispersion:
 
     Parameters
     ----------
-    model : :py:class:`.SpinHamiltonian`
-        Spin Hamiltonian.
+    model : :py:class:`.SpinHamiltonian` or :py:class:`.DispersionKernel`
+        Spin Hamiltonian or the kernel of another dispersion. The kernel is shared
+        and not copied.
 
     Attributes
     ----------
     N : int
         Number of magnetic atoms.
-    J_matrices : (M,) :numpy:`ndarray`
+    J_matrices : (B, 3, 3) :numpy:`ndarray`
         Exchange parameters.
-    i : (M,) :numpy:`ndarray`
+    indices_i : (B,) :numpy:`ndarray` of int32
         Indices of the first atom in the exchange pair.
-    j : (M,) :numpy:`ndarray`
+    indices_j : (B,) :numpy:`ndarray` of int32
         Indices of the second atom in the exchange pair.
-    d : (M, 3) :numpy:`ndarray`
+    dis_vectors : (B, 3) :numpy:`ndarray`
         Vectors from the first atom to the second atom in the exchange pair.
     S : (N, 3) :numpy:`ndarray`
         Spin vectors.
@@ -99,51 +81,56 @@ class MagnonDispersion:
         Defined from local spin directions.
     v : (N, 3) :numpy:`ndarray`
         Defined from local spin directions.
+
+    Notes
+    -----
+    Bond arrays are frozen at the creation of the object and are the read-only
+    arrays of the :py:attr:`.MagnonDispersion.kernel`. Bonds are grouped by the
+    pair of atoms :math:`(i, j)`, i.e. all bonds of the same pair are stored
+    contiguously, which allows to compute the Fourier transform of the exchange
+    parameters as a segment reduction.
     """
 
-    def __init__(self, model: SpinHamiltonian):
-        self._C = None
-        # Store the exchange model, but privately
-        self._model = deepcopy(model)
-        self._model.notation = "SpinW"
+    def __init__(self, model):
+        if isinstance(model, DispersionKernel):
+            kernel = model
+        else:
+            kernel = DispersionKernel(model)
+        self._kernel = kernel
 
-        # Get the number of magnetic atoms
-        self.N = len(self._model.magnetic_atoms)
+        # Arrays are shared with the kernel and are read-only
+        self.N = kernel.N
+        self.J_matrices = kernel.J_matrices
+        self.indices_i = kernel.indices_i
+        self.indices_j = kernel.indices_j
+        self.dis_vectors = kernel.dis_vectors
+        self._cell_vectors = kernel.cell_vectors
+        self._pair_offsets = kernel.pair_offsets
+        self._pair_i = kernel.pair_i
+        self._pair_j = kernel.pair_j
+        self._reciprocal_cell = kernel.reciprocal_cell
+        self._positions = kernel.positions
+        self.S = kernel.S
+        self.u = kernel.u
+        self.v = kernel.v
+        self._spin_norms = kernel.spin_norms
+        self._sqrt_spins = kernel.sqrt_spins
+        self._u_conj = kernel.u_conj
 
-        # Get the exchange parameters, indices and vectors form the SpinHamiltonian
-        self._atom_indices = dict(
-            [(atom, i) for i, atom in enumerate(self._model.magnetic_atoms)]
-        )
-        self.J_matrices = []
-        self.indices_i = []
-        self.indices_j = []
-        self.dis_vectors = []
-
-        for atom1, atom2, R, J in self._model.exchange_like:
-            i = self._atom_indices[atom1]
-            j = self._atom_indices[atom2]
-            d = self._model.get_vector(atom1, atom2, R)
-            self.J_matrices.append(J)
-            self.indices_i.append(i)
-            self.indices_j.append(j)
-            self.dis_vectors.append(d)
-
-        # Initialize spin vector, u vector and v vector arrays
-        self.S = np.zeros((self.N, 3), dtype=float)
-        self.u = np.zeros((self.N, 3), dtype=complex)
-        self.v = np.zeros((self.N, 3), dtype=complex)
-
-        # Get spin vectors and compute u and v vectors from local spin directions
-        for a_i, atom in enumerate(self._model.magnetic_atoms):
-            try:
-                self.S[a_i] = atom.spin_vector
-                e1, e2, e3 = span_orthonormal_set(self.S[a_i])
-                self.v[a_i] = e3
-                self.u[a_i] = e1 + 1j * e2
-            except ValueError:
-                raise ValueError(
-                    f"Spin vector is not defined for {atom.fullname} atom."
-                )
+    @property
+    def kernel(self) -> DispersionKernel:
+        r"""
+        k-independent data of the dispersion.
+
+        Pass it to the constructor of :py:class:`.MagnonDispersion` to create another
+        instance without the processing of the spin Hamiltonian.
+
+        Returns
+        -------
+        kernel : :py:class:`.DispersionKernel`
+        """
+
+        return self._kernel
 
     def J(self, k):
         r"""
@@ -160,20 +147,141 @@ class MagnonDispersion:
         k : (3,) |array-like|_
             Reciprocal vector.
             In absolute coordinates.
+
+        Returns
+        -------
+        J : (N, N, 3, 3) :numpy:`ndarray`
+            J(k) matrix.
+
+        See Also
+        --------
+        J_batch
+        """
+
+        return self.J_batch([k])[0]
+
+    def J_batch(self, kpoints):
+        r"""
+        Computes J(k) matrix for a set of k points at once.
+
+        .. math::
+
+            \boldsymbol{J}_{i,j}(\boldsymbol{k}) = \sum_{\boldsymbol{d}}\boldsymbol{J}_{i,j}(\boldsymbol{d})e^{-i\boldsymbol{k}\boldsymbol{d}}
+
+        The phase factors :math:`e^{-i\boldsymbol{k}\boldsymbol{d}}` are computed as
+        one (M, B) matrix for all k points and all bonds, which is then multiplied
+        by the stack of exchange matrices and summed over the segments of bonds of
+        each pair of atoms. If |Numba|_ is available, then the compiled loop over the
+        k points and bonds is used instead.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        J : (M, N, N, 3, 3) :numpy:`ndarray`
+            J(k) matrix for each k point.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+
+        result = np.zeros((len(kpoints), self.N, self.N, 3, 3), dtype=complex)
+
+        if len(self.J_matrices) == 0:
+            return result
+
+        if _numba.ENABLED:
+            # Output of each call of the kernel is a temporary copy, keep it bounded
+            chunk_size = _chunking.chunk_size(9 * self.N**2)
+            for start in range(0, len(kpoints), chunk_size):
+                end = start + chunk_size
+                result[start:end] = _numba.bond_sum(
+                    kpoints[start:end],
+                    self.dis_vectors,
+                    self.J_matrices,
+                    self.indices_i,
+                    self.indices_j,
+                    self.N,
+                )
+            return result
+
+        # Split k points in chunks to keep the (M, B, 3, 3) stack of reasonable size
+        chunk_size = _chunking.chunk_size(9 * len(self.J_matrices))
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            phases = np.exp(-1j * (kpoints[start:end] @ self.dis_vectors.T))
+            # Sum over the bonds of each pair of atoms as a segment reduction
+            result[start:end, self._pair_i, self._pair_j] = np.add.reduceat(
+                phases[:, :, np.newaxis, np.newaxis] * self.J_matrices,
+                self._pair_offsets,
+                axis=1,
+            )
+
+        return result
+
+    def _dJ_batch(self, kpoints):
+        r"""
+        Computes the derivatives of J(k) matrix for a set of k points.
+
+        .. math::
+
+            \dfrac{\partial\boldsymbol{J}_{i,j}(\boldsymbol{k})}{\partial k_{\alpha}}
+            = -i\sum_{\boldsymbol{d}}d_{\alpha}\boldsymbol{J}_{i,j}(\boldsymbol{d})e^{-i\boldsymbol{k}\boldsymbol{d}}
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        dJ : (M, 3, N, N, 3, 3) :numpy:`ndarray`
+            Derivatives of J(k) along each Cartesian axis for each k point.
         """
-        # Initialize matrix
-        result = np.zeros((self.N, self.N, 3, 3), dtype=complex)
-        k = np.array(k)
-        # Compute J(k)
-        for index in range(len(self.J_matrices)):
-            i = self.indices_i[index]
-            j = self.indices_j[index]
 
-            result[i][j] += self.J_matrices[index].matrix * np.exp(
-                -1j * (k @ self.dis_vectors[index])
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+
+        result = np.zeros((len(kpoints), 3, self.N, self.N, 3, 3), dtype=complex)
+
+        if len(self.J_matrices) == 0:
+            return result
+
+        chunk_size = _chunking.chunk_size(27 * len(self.J_matrices))
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            phases = np.exp(-1j * (kpoints[start:end] @ self.dis_vectors.T))
+            # (M, 3, B)
+            phases = -1j * phases[:, np.newaxis, :] * self.dis_vectors.T
+            result[start:end, :, self._pair_i, self._pair_j] = np.add.reduceat(
+                phases[..., np.newaxis, np.newaxis] * self.J_matrices,
+                self._pair_offsets,
+                axis=2,
             )
+
         return result
 
+    def _A(self, J):
+        # A^{ij} = sqrt(S_i S_j) / 2 * u_i^T J_ij \bar{u}_j, for the stack of J
+        return (
+            self._sqrt_spins
+            / 2
+            * np.einsum("ix,mijxy,jy->mij", self.u, J, self._u_conj, optimize=True)
+        )
+
+    def _B(self, J):
+        # B^{ij} = sqrt(S_i S_j) / 2 * u_i^T J_ij u_j, for the stack of J
+        return (
+            self._sqrt_spins
+            / 2
+            * np.einsum("ix,mijxy,jy->mij", self.u, J, self.u, optimize=True)
+        )
+
     def A(self, k):
         r"""
         Computes A(k) matrix.
@@ -190,20 +298,10 @@ class MagnonDispersion:
             Reciprocal vector.
             In absolute coordinates.
         """
-        # Initialize matrix
-        result = np.zeros((self.N, self.N), dtype=complex)
-        k = np.array(k)
-
-        # Compute A(k)
-        J = self.J(-k)
-        for i in range(len(J)):
-            for j in range(len(J[i])):
-                result[i][j] += (
-                    sqrt(np.linalg.norm(self.S[i]) * np.linalg.norm(self.S[j]))
-                    / 2
-                    * (self.u[i] @ J[i][j] @ np.conjugate(self.u[j]))
-                )
-        return result
+
+        k = np.array(k, dtype=float)
+
+        return self._A(self.J_batch([-k]))[0]
 
     def B(self, k):
         r"""
@@ -221,20 +319,10 @@ class MagnonDispersion:
             Reciprocal vector.
             In absolute coordinates.
         """
-        # Initialize matrix
-        result = np.zeros((self.N, self.N), dtype=complex)
-        k = np.array(k)
-
-        # Compute B(k)
-        J = self.J(-k)
-        for i in range(len(J)):
-            for j in range(len(J[i])):
-                result[i][j] += (
-                    sqrt(np.linalg.norm(self.S[i]) * np.linalg.norm(self.S[j]))
-                    / 2
-                    * (self.u[i] @ J[i][j] @ self.u[j])
-                )
-        return result
+
+        k = np.array(k, dtype=float)
+
+        return self._B(self.J_batch([-k]))[0]
 
     def C(self):
         r"""
@@ -247,29 +335,368 @@ class MagnonDispersion:
         where indices :math:`i` and :math:`j` correspond to the atoms in the exchange pair.
         """
 
-        if self._C is None:
-            self._C = np.zeros((self.N, self.N), dtype=complex)
-
-            # Compute C matrix, note: sum over l is hidden here
-            J = self.J(np.zeros(3))
-            for i in range(len(J)):
-                for j in range(len(J[i])):
-                    self._C[i][i] += (
-                        np.linalg.norm(self.S[j]) * self.v[i] @ J[i][j] @ self.v[j]
-                    )
-        return self._C
+        return self._kernel.C
 
     def h(self, k):
-        k = np.array(k)
-        # Compute h matrix
-        left = np.concatenate(
-            (2 * self.A(k) - 2 * self.C(), 2 * np.conjugate(self.B(k)).T), axis=0
+        r"""
+        Computes h(k) matrix.
+
+        .. math::
+
+            h(\boldsymbol{k}) = 2\begin{pmatrix}
+                A(\boldsymbol{k}) - C & B(\boldsymbol{k}) \\
+                B^{\dagger}(\boldsymbol{k}) & \overline{A(-\boldsymbol{k})} - C
+            \end{pmatrix}
+
+        Parameters
+        ----------
+        k : (3,) |array-like|_
+            Reciprocal vector.
+            In absolute coordinates.
+
+        Returns
+        -------
+        h : (2N, 2N) :numpy:`ndarray`
+            h(k) matrix.
+
+        See Also
+        --------
+        h_batch
+        """
+
+        return self.h_batch([k])[0]
+
+    def h_batch(self, kpoints):
+        r"""
+        Computes h(k) matrix for a set of k points at once.
+
+        J(k) and J(-k) are computed once for every k point and A(k), B(k) and
+        A(-k) are obtained from them by the tensor contractions with
+        :math:`\boldsymbol{u}`, :math:`\overline{\boldsymbol{u}}` and
+        :math:`\sqrt{S_i\cdot S_j}`.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        h : (M, 2N, 2N) :numpy:`ndarray`
+            h(k) matrix for each k point. See :py:meth:`.MagnonDispersion.h`.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.N
+
+        result = np.zeros((len(kpoints), 2 * N, 2 * N), dtype=complex)
+
+        # Split k points in chunks to keep the stacks of J(k) of reasonable size
+        chunk_size = _chunking.chunk_size(18 * N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            points = kpoints[start:end]
+            J = self.J_batch(np.concatenate((points, -points), axis=0))
+            # J(k) and J(-k)
+            result[start:end] = self._h(J[: len(points)], J[len(points) :])
+
+        return result
+
+    def _h(self, J_plus, J_minus):
+        r"""
+        Assembles the stack of h(k) matrices from the stacks of J(k) and J(-k).
+
+        Parameters
+        ----------
+        J_plus : (M, N, N, 3, 3) :numpy:`ndarray`
+            J(k) for each k point.
+        J_minus : (M, N, N, 3, 3) :numpy:`ndarray`
+            J(-k) for each k point.
+
+        Returns
+        -------
+        h : (M, 2N, 2N) :numpy:`ndarray`
+        """
+
+        return self._assemble_h(self._A(J_minus), self._B(J_minus), self._A(J_plus))
+
+    def _assemble_h(self, A, B, A_opposite):
+        r"""
+        Assembles the stack of h(k) matrices from the stacks of A(k), B(k) and A(-k).
+
+        Parameters
+        ----------
+        A : (M, N, N) :numpy:`ndarray`
+        B : (M, N, N) :numpy:`ndarray`
+        A_opposite : (M, N, N) :numpy:`ndarray`
+
+        Returns
+        -------
+        h : (M, 2N, 2N) :numpy:`ndarray`
+        """
+
+        N = self.N
+        C = self.C()
+
+        result = np.zeros((len(A), 2 * N, 2 * N), dtype=complex)
+
+        result[:, :N, :N] = 2 * A - 2 * C
+        result[:, :N, N:] = 2 * B
+        result[:, N:, :N] = 2 * np.conjugate(np.transpose(B, (0, 2, 1)))
+        result[:, N:, N:] = 2 * np.conjugate(A_opposite) - 2 * C
+
+        return result
+
+    def _mesh_transform(self, values, size, shift, sign, phases=True):
+        r"""
+        Fourier transform of the bond quantities on a regular grid of k points.
+
+        .. math::
+
+            X_{i,j}(\boldsymbol{k}) = \sum_{\boldsymbol{d}}X_{i,j}(\boldsymbol{d})e^{\pm i\boldsymbol{k}\boldsymbol{d}}
+
+        Bond quantities are placed on the real-space lattice by the cell vectors of
+        the bonds (modulo the size of the grid), which is exact, and transformed by
+        one FFT per pair of atoms and component.
+
+        Parameters
+        ----------
+        values : (B, ...) :numpy:`ndarray`
+            Quantity for each bond, i.e. exchange matrices.
+        size : (3,) tuple of int
+            Size of the grid.
+        shift : (3,) :numpy:`ndarray`
+            Shift of the grid in the units of the grid step.
+        sign : int
+            Sign of the exponent, either -1 or 1.
+        phases : bool, default True
+            Whether to apply the phases between the atoms of each pair,
+            :math:`e^{\pm i\boldsymbol{k}(\boldsymbol{r}_j - \boldsymbol{r}_i)}`.
+            Without them the result is periodic in the reciprocal lattice.
+
+        Returns
+        -------
+        X : (M, N, N, ...) :numpy:`ndarray`
+            Transformed quantity for each point of the grid. Points are ordered as
+            in :py:attr:`.KGrid.relative`.
+        """
+
+        size = tuple(size)
+        shift = np.array(shift, dtype=float)
+        M = size[0] * size[1] * size[2]
+        shape = values.shape[1:]
+
+        result = np.zeros((M, self.N, self.N) + shape, dtype=complex)
+
+        if len(values) == 0:
+            return result
+
+        # Phase of the shift: e^{+-2 pi i s R / n}
+        values = values * np.exp(
+            sign * 2j * np.pi * (self._cell_vectors @ (shift / size))
+        ).reshape((-1,) + (1,) * len(shape))
+
+        # Real-space tables of each pair of atoms
+        pair_index = np.repeat(
+            np.arange(len(self._pair_offsets)),
+            np.diff(np.append(self._pair_offsets, len(values))),
+        )
+        tables = np.zeros((len(self._pair_offsets),) + size + shape, dtype=complex)
+        np.add.at(tables, (pair_index, *np.mod(self._cell_vectors, size).T), values)
+
+        if sign < 0:
+            tables = np.fft.fftn(tables, axes=(1, 2, 3))
+        else:
+            tables = np.fft.ifftn(tables, axes=(1, 2, 3)) * M
+
+        tables = tables.reshape((len(self._pair_offsets), M) + shape).swapaxes(0, 1)
+
+        if not phases:
+            result[:, self._pair_i, self._pair_j] = tables
+            return result
+
+        # Phases between the atoms: e^{+-i k (r_j - r_i)}
+        relative = np.stack(
+            np.meshgrid(*[np.arange(n) for n in size], indexing="ij"), axis=-1
+        ).reshape((-1, 3))
+        kpoints = ((relative + shift) / size) @ self._reciprocal_cell
+        atom_phases = np.exp(
+            sign
+            * 1j
+            * (
+                kpoints
+                @ (self._positions[self._pair_j] - self._positions[self._pair_i]).T
+            )
+        )
+
+        result[:, self._pair_i, self._pair_j] = tables * atom_phases.reshape(
+            atom_phases.shape + (1,) * len(shape)
+        )
+
+        return result
+
+    def J_mesh(self, n1, n2, n3, shift=(0, 0, 0)):
+        r"""
+        Computes J(k) matrix for all points of a regular grid by FFT.
+
+        The cost is :math:`O(M\log M)` instead of :math:`O(M\cdot B)` of
+        :py:meth:`.MagnonDispersion.J_batch`.
+
+        Parameters
+        ----------
+        n1 : int
+            Amount of points along the first reciprocal lattice vector.
+        n2 : int
+            Amount of points along the second reciprocal lattice vector.
+        n3 : int
+            Amount of points along the third reciprocal lattice vector.
+        shift : (3,) |array-like|_, default (0, 0, 0)
+            Shift of the grid in the units of the grid step.
+
+        Returns
+        -------
+        J : (M, N, N, 3, 3) :numpy:`ndarray`
+            J(k) matrix for each point of the grid. Points are ordered as in
+            :py:attr:`.KGrid.points` (see :py:meth:`.MagnonDispersion.grid`).
+        """
+
+        return self._mesh_transform(
+            self.J_matrices, (int(n1), int(n2), int(n3)), shift, sign=-1
         )
-        right = np.concatenate(
-            (2 * self.B(k), 2 * np.conjugate(self.A(-k)) - 2 * self.C()), axis=0
+
+    def _omegas_on_grid(self, grid: KGrid):
+        r"""
+        Energies at the irreducible points of the grid, with h(k) computed by FFT.
+
+        Contractions of the exchange matrices with the vectors u are done before
+        the transform, therefore only three scalar channels per pair of atoms are
+        transformed.
+        """
+
+        N = self.N
+        i, j = self.indices_i, self.indices_j
+        factors = self._sqrt_spins[i, j] / 2
+        values_A = factors * np.einsum(
+            "bx,bxy,by->b", self.u[i], self.J_matrices, self._u_conj[j], optimize=True
+        )
+        values_B = factors * np.einsum(
+            "bx,bxy,by->b", self.u[i], self.J_matrices, self.u[j], optimize=True
+        )
+
+        # A(k) and B(k) are build from J(-k), A(-k) from J(k)
+        AB = self._mesh_transform(
+            np.stack((values_A, values_B), axis=-1), grid.size, grid.shift, sign=1
         )
-        h = np.concatenate((left, right), axis=1)
-        return h
+        A_opposite = self._mesh_transform(values_A, grid.size, grid.shift, sign=-1)
+
+        indices = grid._irreducible_indices
+        omegas = np.zeros((len(indices), N), dtype=float)
+        status = np.zeros(len(indices), dtype=int)
+
+        chunk_size = _chunking.chunk_size(4 * N**2)
+
+        for start in range(0, len(indices), chunk_size):
+            end = start + chunk_size
+            chunk = indices[start:end]
+            E, _, status[start:end] = solve_via_colpa_classified(
+                self._assemble_h(
+                    AB[chunk, ..., 0], AB[chunk, ..., 1], A_opposite[chunk]
+                )
+            )
+            omegas[start:end] = E[:, :N]
+
+        return omegas, status
+
+    def _dh_batch(self, kpoints):
+        r"""
+        Computes the derivatives of h(k) matrix for a set of k points.
+
+        C does not depend on k, therefore
+
+        .. math::
+
+            \dfrac{\partial h(\boldsymbol{k})}{\partial k_{\alpha}} = 2\begin{pmatrix}
+                \partial_{\alpha}A(\boldsymbol{k}) & \partial_{\alpha}B(\boldsymbol{k}) \\
+                \partial_{\alpha}B^{\dagger}(\boldsymbol{k}) & \partial_{\alpha}\overline{A(-\boldsymbol{k})}
+            \end{pmatrix}
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        dh : (M, 3, 2N, 2N) :numpy:`ndarray`
+            Derivatives of h(k) along each Cartesian axis for each k point.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.N
+
+        result = np.zeros((len(kpoints), 3, 2 * N, 2 * N), dtype=complex)
+
+        chunk_size = _chunking.chunk_size(54 * N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            points = kpoints[start:end]
+            M = len(points)
+            dJ = self._dJ_batch(np.concatenate((points, -points), axis=0))
+            # Stack the derivatives along the three axes for the contractions
+            dJ = dJ.reshape((2 * M * 3, N, N, 3, 3))
+            dJ_plus = dJ[: 3 * M]
+            dJ_minus = dJ[3 * M :]
+
+            # A(k) and B(k) depend on J(-k), hence the minus sign
+            dA = -self._A(dJ_minus).reshape((M, 3, N, N))
+            dB = -self._B(dJ_minus).reshape((M, 3, N, N))
+
+            result[start:end, :, :N, :N] = 2 * dA
+            result[start:end, :, :N, N:] = 2 * dB
+            result[start:end, :, N:, :N] = 2 * np.conjugate(
+                np.transpose(dB, (0, 1, 3, 2))
+            )
+            result[start:end, :, N:, N:] = 2 * np.conjugate(
+                self._A(dJ_plus).reshape((M, 3, N, N))
+            )
+
+        return result
+
+    def _diagonalize(self, kpoints):
+        r"""
+        Diagonalize h(k) for a set of k points.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) :numpy:`ndarray`
+            K points in absolute coordinates.
+
+        Returns
+        -------
+        E : (M, 2N) :numpy:`ndarray`
+        G : (M, 2N, 2N) :numpy:`ndarray`
+        status : (M,) :numpy:`ndarray` of int
+            See :py:func:`.solve_via_colpa_classified`.
+        """
+
+        E = np.zeros((len(kpoints), 2 * self.N), dtype=float)
+        G = np.zeros((len(kpoints), 2 * self.N, 2 * self.N), dtype=complex)
+        status = np.zeros(len(kpoints), dtype=int)
+
+        # Split k points in chunks to keep the stacks of h(k) of reasonable size
+        chunk_size = _chunking.chunk_size(4 * self.N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            E[start:end], G[start:end], status[start:end] = solve_via_colpa_classified(
+                self.h_batch(kpoints[start:end])
+            )
+
+        return E, G, status
 
     def omega(self, k, zeros_to_none=False, return_G=False, return_imaginary=False):
         r"""
@@ -289,7 +716,11 @@ class MagnonDispersion:
         return_imaginary : bool, default False
             Whether to return imaginary part of the energies.
             If ``True``, then real and imaginary part can be accessed via
-            ``omegas.real`` and ``omegas.imag``.
+            ``omegas.real`` and ``omegas.imag``. Imaginary part is non-zero only
+            if h(k) is unstable (or the diagonalization fails). In that case the
+            energies are the eigenvalues of :math:`\boldsymbol{g}\boldsymbol{h}`,
+            sorted by their real and then imaginary parts in descending order, and
+            ``G`` is filled with zeros.
             .. versionadded:: 0.8.10
 
         Returns
@@ -301,70 +732,962 @@ class MagnonDispersion:
         G : (2N, 2N) : :numpy:`ndarray`
             Transformation matrix. Returned only if ``return_G`` is ``True``.
             See :py:func:`.solve_via_colpa` for details.
+
+        Notes
+        -----
+        The type of h(k) (positive or negative, definite or semidefinite) is
+        detected with a single eigenvalue check, see
+        :py:func:`.solve_via_colpa_classified`.
         """
+
         # Diagonalize h matrix via Colpa
-        k = np.array(k)
-        h = self.h(k)
-        try:
-            omegas, G = solve_via_colpa(h)
-        except ColpaFailed:
-            # Try to solve for positive semidefinite matrix
-            try:
-                omegas, G = solve_via_colpa(h + np.diag(1e-8 * np.ones(2 * self.N)))
-            except ColpaFailed:
-                # Try to solve for negative defined matrix
-                try:
-                    omegas, G = solve_via_colpa(-h)
-                    omegas *= -1
-                    G *= -1
-                except ColpaFailed:
-                    # Try to solve for negative semidefinite matrix
-                    try:
-                        omegas, G = solve_via_colpa(
-                            -h - np.diag(1e-8 * np.ones(h.shape[0]))
-                        )
-                        omegas *= -1
-                        G *= -1
-                    except ColpaFailed:
-                        # If all fails, return None or 0
-                        if zeros_to_none:
-                            omegas = np.array([None] * 2 * self.N, dtype=float)
-                            if return_G:
-                                G = np.empty((2 * self.N, 2 * self.N), dtype=float)
-
-                        else:
-                            omegas = np.zeros(self.N, dtype=float)
-                            if return_G:
-                                G = np.zeros((2 * self.N, 2 * self.N), dtype=float)
+        k = np.array(k, dtype=float)
+        E, G, status = self._diagonalize(k.reshape((1, 3)))
+        omegas, G = E[0], G[0]
+
+        # If all fails, return None or 0
+        if status[0] in [COLPA_UNSTABLE, COLPA_FAILED] and not zeros_to_none:
+            omegas = np.zeros(2 * self.N, dtype=float)
+            G = np.zeros((2 * self.N, 2 * self.N), dtype=float)
+
         omegas[np.abs(omegas) <= 1e-8] = 0
-        if not return_imaginary:
-            omegas = omegas.real
+        if return_imaginary:
+            omegas = omegas.astype(complex)
+            if status[0] in [COLPA_UNSTABLE, COLPA_FAILED]:
+                omegas = self._dynamical_eigenvalues(k)
+                G = np.zeros((2 * self.N, 2 * self.N), dtype=float)
         if return_G:
             return omegas, G
         else:
             return omegas[: self.N]
 
-    def omegas(self, kpoints, zeros_to_none=False):
+    def _dynamical_eigenvalues(self, k):
         r"""
-        Dispersion spectra.
+        Eigenvalues of :math:`\boldsymbol{g}\boldsymbol{h}(\boldsymbol{k})`, that
+        are complex if h(k) is unstable.
 
         Parameters
         ----------
-        kpoints : (M, 3) |array-like|_
-            K points in absolute coordinates.
-        zeros_to_none : bool, default=False
-            If True, then return ``None`` instead of 0 if Colpa fails.
+        k : (3,) :numpy:`ndarray`
+            Reciprocal vector in absolute coordinates.
+
+        Returns
+        -------
+        omegas : (2N,) :numpy:`ndarray` of complex
+            Sorted by the real and then by the imaginary part in descending order.
         """
 
-        data = []
+        g = np.concatenate((np.ones(self.N), -np.ones(self.N)))
+        omegas = np.linalg.eigvals(g[:, np.newaxis] * self.h(k))
+        omegas.real[np.abs(omegas.real) <= 1e-8] = 0
+        omegas.imag[np.abs(omegas.imag) <= 1e-8] = 0
+
+        return omegas[np.lexsort((-omegas.imag, -omegas.real))]
+
+    def _omegas_with_status(self, kpoints):
+        E, _, status = self._diagonalize(kpoints)
+        return E[:, : self.N], status
+
+    def _omegas_parallel(self, kpoints, n_workers, executor):
+        if n_workers is None:
+            n_chunks = 4
+        else:
+            n_chunks = 4 * n_workers
+        chunks = np.array_split(kpoints, min(n_chunks, max(1, len(kpoints))))
+
+        if executor is None:
+            # Forked processes inherit the started thread pool of the compiled
+            # kernels in an inconsistent state and hang, therefore they are spawned
+            if _numba.THREADS_STARTED:
+                context = multiprocessing.get_context("spawn")
+            else:
+                context = None
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=context,
+                initializer=_initialize_worker,
+                initargs=(self._kernel,),
+            ) as pool:
+                results = list(pool.map(_worker_omegas, chunks))
+        else:
+            futures = [
+                executor.submit(_task_omegas, self._kernel, chunk) for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
 
-        if isinstance(kpoints, Kpoints):
-            kpoints = kpoints.points()
+        # Results are stitched in the order of the chunks
+        omegas = np.concatenate([result[0] for result in results], axis=0)
+        status = np.concatenate([result[1] for result in results], axis=0)
 
-        for point in kpoints:
-            data.append(self.omega(point, zeros_to_none=zeros_to_none))
+        return omegas, status
 
-        return np.array(data).T
+    def omegas(
+        self,
+        kpoints,
+        zeros_to_none=False,
+        return_status=False,
+        n_workers=None,
+        executor=None,
+        connect_bands=False,
+    ):
+        r"""
+        Dispersion spectra.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_ or :py:class:`.KGrid`
+            K points in absolute coordinates. If :py:class:`.KGrid` is given, then the
+            energies are computed only for its irreducible points, use
+            :py:meth:`.KGrid.unfold` to get the energies on the full grid. For the
+            serial computation h(k) is computed on the whole grid by FFT.
+        zeros_to_none : bool, default=False
+            If True, then return ``None`` instead of 0 if Colpa fails.
+        return_status : bool, default False
+            Whether to return the status of the diagonalization for each k point.
+        n_workers : int, optional
+            Number of processes for the parallel computation. K points are split
+            in chunks, which are distributed among the processes of a
+            :py:class:`concurrent.futures.ProcessPoolExecutor`. Every process
+            receives the data of the Hamiltonian only once. By default the
+            computation is serial. If |Numba|_ is installed and J(k) was already
+            computed in the current process, then the processes are spawned
+            instead of forked. In that case the calling script has to be guarded by
+            ``if __name__ == "__main__":``, as for any spawned process.
+        executor : :py:class:`concurrent.futures.Executor`, optional
+            Executor for the parallel computation. If given, then ``n_workers`` is
+            used only to define the amount of chunks (four chunks by default).
+            Data of the Hamiltonian is passed with every chunk, but without the
+            :py:class:`.SpinHamiltonian` itself. If |Numba|_ is installed and J(k) was
+            already computed in the current process, then the processes of the
+            executor have to be spawned, not forked (i.e. created with
+            ``mp_context=multiprocessing.get_context("spawn")``).
+        connect_bands : bool, default False
+            Whether to order the bands by their connectivity along the sequence of
+            k points instead of by energy at each k point. Bands are connected by
+            the maximal overlap of the eigenvectors at the consecutive k points
+            (see :py:meth:`.MagnonDispersion.connect_bands`). The computation is
+            serial in that case and ``kpoints`` can not be a :py:class:`.KGrid`.
+
+        Returns
+        -------
+        omegas : (N, M) :numpy:`ndarray`
+            Magnon energies for each k point.
+        status : (M,) :numpy:`ndarray` of int
+            Status code of h(k) for each k point, one of
+            ``COLPA_POSITIVE_DEFINITE``,
+            ``COLPA_POSITIVE_SEMIDEFINITE``,
+            ``COLPA_NEGATIVE_DEFINITE``,
+            ``COLPA_NEGATIVE_SEMIDEFINITE``, ``COLPA_UNSTABLE``,
+            ``COLPA_FAILED``. Returned only if ``return_status`` is ``True``.
+
+        Notes
+        -----
+        h(k) matrices are diagonalized for many k points at once via
+        :py:func:`.solve_via_colpa_classified`.
+        """
+
+        serial = executor is None and (n_workers is None or n_workers == 1)
+
+        if connect_bands:
+            if isinstance(kpoints, KGrid):
+                raise ValueError("Bands can not be connected on the grid of k points.")
+            if isinstance(kpoints, Kpoints):
+                kpoints = kpoints.points()
+            kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+
+            E, G, status = self._diagonalize(kpoints)
+            order = self._band_order(G, status)
+            omegas = np.take_along_axis(E[:, : self.N], order, axis=1)
+        elif (
+            serial
+            and isinstance(kpoints, KGrid)
+            and np.allclose(kpoints.reciprocal_cell, self._reciprocal_cell)
+        ):
+            omegas, status = self._omegas_on_grid(kpoints)
+        else:
+            if isinstance(kpoints, Kpoints):
+                kpoints = kpoints.points()
+            elif isinstance(kpoints, KGrid):
+                kpoints = kpoints.irreducible
+
+            kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+
+            if serial:
+                omegas, status = self._omegas_with_status(kpoints)
+            else:
+                omegas, status = self._omegas_parallel(kpoints, n_workers, executor)
+
+        # If all fails, return None or 0
+        if not zeros_to_none:
+            omegas[(status == COLPA_UNSTABLE) | (status == COLPA_FAILED)] = 0
+
+        omegas[np.abs(omegas) <= 1e-8] = 0
+
+        if return_status:
+            return omegas.T, status
+        return omegas.T
+
+    def _band_order(self, G, status):
+        r"""
+        Order of the bands at each k point, that follows their connectivity.
+
+        Parameters
+        ----------
+        G : (M, 2N, 2N) :numpy:`ndarray`
+            Transformation matrices at the consecutive k points.
+        status : (M,) :numpy:`ndarray` of int
+            Status of the diagonalization at each k point.
+
+        Returns
+        -------
+        order : (M, N) :numpy:`ndarray` of int
+            ``order[m, n]`` is the index (by energy) of the band ``n`` at the k
+            point ``m``.
+        """
+
+        M = len(G)
+        N = self.N
+
+        order = np.zeros((M, N), dtype=int)
+        order[0] = np.arange(N)
+
+        if M < 2:
+            return order
+
+        # x_n = (G^-1)_{:, n} = g conj(G_{n, :}) for n < N
+        g = np.concatenate((np.ones(N), -np.ones(N)))
+        x = np.conjugate(G[:, :N, :]) * g
+
+        # |x_m^dagger(k_p) g x_n(k_{p+1})|^2 for the whole path, shape (M-1, N, N)
+        overlaps = (
+            np.abs(
+                np.einsum(
+                    "pma,pna->pmn", np.conjugate(x[:-1]) * g, x[1:], optimize=True
+                )
+            )
+            ** 2
+        )
+
+        # Keep the order of the bands around the points, where diagonalization fails
+        failed = (status == COLPA_UNSTABLE) | (status == COLPA_FAILED)
+        overlaps[failed[:-1] | failed[1:]] = np.eye(N)
+
+        # Band m at the point p continues as the band steps[p, m] at p + 1
+        steps = np.argmax(overlaps, axis=2)
+
+        # Resolve the conflicts, where two bands prefer the same continuation
+        conflicts = np.nonzero(
+            np.sort(steps, axis=1)[:, 1:] == np.sort(steps, axis=1)[:, :-1]
+        )[0]
+        for p in np.unique(conflicts):
+            rows, columns = linear_sum_assignment(overlaps[p], maximize=True)
+            steps[p, rows] = columns
+
+        for p in range(M - 1):
+            order[p + 1] = steps[p, order[p]]
+
+        return order
+
+    def connect_bands(self, kpoints):
+        r"""
+        Order of the bands along the sequence of k points by their connectivity.
+
+        Eigenvectors of each band are the columns :math:`\boldsymbol{x}_n` of
+        :math:`G^{-1}` (see :py:meth:`.MagnonDispersion.velocity`). Band :math:`m`
+        at the k point :math:`\boldsymbol{k}_p` is connected to the band :math:`n`
+        at the next k point, that maximizes the overlap
+
+        .. math::
+
+            \left\vert\boldsymbol{x}^{\dagger}_m(\boldsymbol{k}_p)g
+            \boldsymbol{x}_n(\boldsymbol{k}_{p+1})\right\vert^2
+
+        If two bands have the same best continuation, then the assignment with the
+        maximal total overlap is used.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Sequence of k points in absolute coordinates, i.e. a k path.
+
+        Returns
+        -------
+        order : (N, M) :numpy:`ndarray` of int
+            ``order[n, m]`` is the index of the band ``n`` at the k point ``m`` in
+            the energy-sorted output of :py:meth:`.MagnonDispersion.omegas`. At the
+            first k point bands are sorted by energy.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+
+        _, G, status = self._diagonalize(kpoints)
+
+        return self._band_order(G, status).T
+
+    def velocity(self, kpoints):
+        r"""
+        Group velocities of magnons.
+
+        Derivatives of magnon energies are computed analytically by the
+        Hellmann-Feynman theorem for the bosonic eigenproblem
+
+        .. math::
+
+            \dfrac{\partial\omega_n(\boldsymbol{k})}{\partial k_{\alpha}}
+            = \boldsymbol{x}_n^{\dagger}(\boldsymbol{k})
+            \dfrac{\partial h(\boldsymbol{k})}{\partial k_{\alpha}}
+            \boldsymbol{x}_n(\boldsymbol{k})
+
+        where :math:`\boldsymbol{x}_n` is the :math:`n`-th column of
+        :math:`G^{-1} = gG^{\dagger}g` (see :py:func:`.solve_via_colpa`). For the
+        degenerate modes the diagonal elements of the derivative in the degenerate
+        subspace are returned, their sum is exact.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            K points in absolute coordinates.
+
+        Returns
+        -------
+        velocity : (N, M, 3) :numpy:`ndarray`
+            Derivatives of the magnon energies with respect to the Cartesian
+            components of k, in the same order as :py:meth:`.MagnonDispersion.omegas`.
+            Zero for the k points, where the diagonalization fails.
+        """
+
+        return np.transpose(self._omegas_and_velocity(kpoints)[1], (1, 0, 2))
+
+    def _omegas_and_velocity(self, kpoints):
+        r"""
+        Magnon energies and their derivatives from one diagonalization.
+
+        Returns
+        -------
+        omegas : (M, N) :numpy:`ndarray`
+        velocity : (M, N, 3) :numpy:`ndarray`
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.N
+
+        omegas = np.zeros((len(kpoints), N), dtype=float)
+        velocity = np.zeros((len(kpoints), N, 3), dtype=float)
+
+        g = np.concatenate((np.ones(N), -np.ones(N)))
+
+        chunk_size = _chunking.chunk_size(54 * N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            E, G, status = self._diagonalize(kpoints[start:end])
+            omegas[start:end] = E[:, :N]
+            # x_n = (G^-1)_{:, n} = g conj(G_{n, :}) for n < N
+            x = np.conjugate(G[:, :N, :]) * g
+            velocity[start:end] = np.einsum(
+                "mna,mxab,mnb->mnx",
+                np.conjugate(x),
+                self._dh_batch(kpoints[start:end]),
+                x,
+                optimize=True,
+            ).real
+            failed = (status == COLPA_UNSTABLE) | (status == COLPA_FAILED)
+            omegas[start:end][failed] = 0
+            velocity[start:end][failed] = 0
+
+        return omegas, velocity
+
+    def minimum(self, band=0, mesh=(8, 8, 8), candidates=4, tolerance=1e-8):
+        r"""
+        Global minimum of a magnon band over the Brillouin zone.
+
+        The band is scanned on a coarse grid of k points (reduced by symmetry and
+        computed by FFT, see :py:meth:`.MagnonDispersion.grid`), then the lowest
+        points of the grid are refined by the quasi-Newton (BFGS) minimization with
+        the analytic gradient (see :py:meth:`.MagnonDispersion.velocity`).
+
+        Parameters
+        ----------
+        band : int, default 0
+            Index of the band, counted from the lowest one.
+        mesh : (3,) tuple of int, default (8, 8, 8)
+            Size of the coarse grid.
+        candidates : int, default 4
+            Amount of the lowest points of the grid, that are refined.
+        tolerance : float, default 1e-8
+            Tolerance for the norm of the gradient of the local minimization.
+
+        Returns
+        -------
+        omega : float
+            Minimal energy of the band.
+        k : (3,) :numpy:`ndarray`
+            K point of the minimum, in absolute coordinates. It is brought to the
+            unit cell of the reciprocal lattice.
+        """
+
+        if not 0 <= band < self.N:
+            raise ValueError(f"Band has to be from 0 to {self.N - 1}, got {band}")
+
+        # Bands are sorted in descending order
+        row = self.N - 1 - band
+
+        grid = self.grid(*mesh)
+        omegas = self.omegas(grid)[row]
+
+        def function(k):
+            omega, velocity = self._omegas_and_velocity(k)
+            return omega[0, row], velocity[0, row]
+
+        best = np.argmin(omegas)
+        omega, k = omegas[best], grid.irreducible[best]
+        for start in np.argsort(omegas)[:candidates]:
+            result = minimize(
+                function,
+                grid.irreducible[start],
+                jac=True,
+                method="BFGS",
+                options=dict(gtol=tolerance),
+            )
+            if result.fun < omega:
+                omega, k = result.fun, result.x
+
+        # Bring k point to the unit cell of the reciprocal lattice
+        relative = np.mod(k @ np.linalg.inv(self._reciprocal_cell), 1)
+        relative[np.isclose(relative, 1)] = 0
+
+        return float(omega), relative @ self._reciprocal_cell
+
+    def gap(self, mesh=(8, 8, 8), candidates=4, tolerance=1e-8):
+        r"""
+        Magnon gap, i.e. the minimum of the lowest band.
+
+        Parameters
+        ----------
+        mesh : (3,) tuple of int, default (8, 8, 8)
+            Size of the coarse grid.
+        candidates : int, default 4
+            Amount of the lowest points of the grid, that are refined.
+        tolerance : float, default 1e-8
+            Tolerance for the norm of the gradient of the local minimization.
+
+        Returns
+        -------
+        gap : float
+            Energy of the gap.
+        k : (3,) :numpy:`ndarray`
+            K point of the gap, in absolute coordinates.
+
+        See Also
+        --------
+        minimum
+        """
+
+        return self.minimum(
+            band=0, mesh=mesh, candidates=candidates, tolerance=tolerance
+        )
+
+    def _plane(self, mesh, plane, offset):
+        r"""
+        Regular mesh of k points in the plane of two reciprocal lattice vectors.
+
+        Returns
+        -------
+        kpoints : (n_a * n_b, 3) :numpy:`ndarray`
+            K points in absolute coordinates, second index changes faster.
+        steps : (2, 3) :numpy:`ndarray`
+            Steps of the mesh along the two vectors.
+        """
+
+        n_a, n_b = (int(n) for n in mesh)
+        if min(n_a, n_b) < 2:
+            raise ValueError(f"Mesh has to be at least 2 x 2, got {mesh}")
+
+        a, b = plane
+        if a == b or {a, b} - {0, 1, 2}:
+            raise ValueError(
+                f"Plane has to be a pair of different indices from 0 to 2, got {plane}"
+            )
+        c = 3 - a - b
+
+        relative = np.zeros((n_a, n_b, 3), dtype=float)
+        relative[:, :, a] = np.arange(n_a)[:, np.newaxis] / n_a
+        relative[:, :, b] = np.arange(n_b)[np.newaxis, :] / n_b
+        relative[:, :, c] = offset
+
+        steps = np.array(
+            [self._reciprocal_cell[a] / n_a, self._reciprocal_cell[b] / n_b]
+        )
+
+        return relative.reshape((-1, 3)) @ self._reciprocal_cell, steps
+
+    def berry_curvature(self, mesh, plane=(0, 1), offset=0.0):
+        r"""
+        Berry curvature of magnon bands by the link-variable method [1]_.
+
+        Eigenvectors of each band are the columns :math:`\boldsymbol{x}_n` of
+        :math:`G^{-1}` (see :py:meth:`.MagnonDispersion.velocity`), transformed to
+        the periodic gauge. Link variables are defined with the bosonic metric
+        :math:`g`
+
+        .. math::
+
+            U_{n,\mu}(\boldsymbol{k}) = \boldsymbol{x}^{\dagger}_n(\boldsymbol{k})
+            g\boldsymbol{x}_n(\boldsymbol{k} + \Delta\boldsymbol{k}_{\mu})
+
+        and the Berry flux through each plaquette of the mesh is
+
+        .. math::
+
+            F_n(\boldsymbol{k}) = \arg\left(U_{n,1}(\boldsymbol{k})
+            U_{n,2}(\boldsymbol{k} + \Delta\boldsymbol{k}_1)
+            \overline{U_{n,1}(\boldsymbol{k} + \Delta\boldsymbol{k}_2)}
+            \overline{U_{n,2}(\boldsymbol{k})}\right)
+
+        h(k) is diagonalized once for all points of the mesh. Bands have to be
+        isolated, since the curvature of each band is computed independently.
+
+        Parameters
+        ----------
+        mesh : (2,) tuple of int
+            Amount of points along the two reciprocal lattice vectors of the plane.
+        plane : (2,) tuple of int, default (0, 1)
+            Indices of the reciprocal lattice vectors, that span the plane.
+        offset : float, default 0
+            Relative coordinate of the plane along the third reciprocal lattice
+            vector.
+
+        Returns
+        -------
+        curvature : (N, n_a, n_b) :numpy:`ndarray`
+            Berry curvature of each band at each plaquette of the mesh, i.e. the
+            Berry flux divided by the area of the plaquette. Bands are in the same
+            order as in :py:meth:`.MagnonDispersion.omegas`. Plaquette
+            :math:`(i, j)` has the k point :math:`(i, j)` of the mesh as the first
+            corner.
+
+        References
+        ----------
+        .. [1] Fukui, T., Hatsugai, Y. and Suzuki, H., 2005.
+            Chern numbers in discretized Brillouin zone: efficient method of
+            computing (spin) Hall conductances.
+            Journal of the Physical Society of Japan, 74(6), pp.1674-1677.
+        """
+
+        kpoints, steps = self._plane(mesh, plane, offset)
+        n_a, n_b = (int(n) for n in mesh)
+        N = self.N
+
+        _, G, status = self._diagonalize(kpoints)
+
+        if np.any((status == COLPA_UNSTABLE) | (status == COLPA_FAILED)):
+            raise ValueError(
+                "Ground state is unstable at some points of the mesh, "
+                "Berry curvature is not defined."
+            )
+
+        # x_n = (G^-1)_{:, n} = g conj(G_{n, :}) for n < N, shape (M, N, 2N)
+        g = np.concatenate((np.ones(N), -np.ones(N)))
+        x = np.conjugate(G[:, :N, :]) * g
+
+        # Periodic gauge: both a_i(k) and a^dagger_i(-k) acquire e^{ik r_i}
+        phases = np.exp(1j * (kpoints @ self._positions.T))
+        x = x * np.tile(phases, 2)[:, np.newaxis, :]
+        x = x.reshape((n_a, n_b, N, 2 * N))
+
+        def link(axis):
+            neighbours = np.roll(x, -1, axis=axis)
+            return np.einsum(
+                "ijnc,ijnc->nij",
+                np.conjugate(x) * g,
+                neighbours,
+                optimize=True,
+            )
+
+        U_1 = link(0)
+        U_2 = link(1)
+
+        flux = np.angle(
+            U_1
+            * np.roll(U_2, -1, axis=1)
+            * np.conjugate(np.roll(U_1, -1, axis=2))
+            * np.conjugate(U_2)
+        )
+
+        area = np.linalg.norm(np.cross(steps[0], steps[1]))
+
+        return flux / area
+
+    def chern_numbers(self, mesh, plane=(0, 1), offset=0.0):
+        r"""
+        Chern numbers of magnon bands.
+
+        .. math::
+
+            C_n = \dfrac{1}{2\pi}\sum_{\boldsymbol{k}}F_n(\boldsymbol{k})
+
+        where :math:`F_n(\boldsymbol{k})` is the Berry flux through the plaquettes
+        of the mesh (see :py:meth:`.MagnonDispersion.berry_curvature`). Link-variable
+        method gives integer numbers for any mesh, which is fine enough to resolve
+        the curvature.
+
+        Parameters
+        ----------
+        mesh : (2,) tuple of int
+            Amount of points along the two reciprocal lattice vectors of the plane.
+        plane : (2,) tuple of int, default (0, 1)
+            Indices of the reciprocal lattice vectors, that span the plane.
+        offset : float, default 0
+            Relative coordinate of the plane along the third reciprocal lattice
+            vector.
+
+        Returns
+        -------
+        chern_numbers : (N,) :numpy:`ndarray` of int
+            Chern number of each band, in the same order as in
+            :py:meth:`.MagnonDispersion.omegas`.
+        """
+
+        curvature = self.berry_curvature(mesh, plane=plane, offset=offset)
+        _, steps = self._plane(mesh, plane, offset)
+        area = np.linalg.norm(np.cross(steps[0], steps[1]))
+
+        return np.rint(curvature.sum(axis=(1, 2)) * area / 2 / np.pi).astype(int)
+
+    def interpolator(self, size=None, oversampling=4, order=3):
+        r"""
+        Fourier interpolator of the dispersion.
+
+        Exchange parameters are transformed by FFT to a regular grid of k points
+        once and then interpolated for any k point, which is cheaper than the direct
+        summation over the bonds for the dense sets of k points (i.e. k paths for
+        plotting) and long-range Hamiltonians.
+
+        Parameters
+        ----------
+        size : (3,) tuple of int, optional
+            Size of the regular grid. See :py:class:`.DispersionInterpolator`.
+        oversampling : int, default 4
+            Ratio between the default size of the grid and the minimal one.
+        order : int, default 3
+            Order of the splines.
+
+        Returns
+        -------
+        interpolator : :py:class:`.DispersionInterpolator`
+        """
+
+        return DispersionInterpolator(
+            self, size=size, oversampling=oversampling, order=order
+        )
+
+    def adaptive_path(
+        self, kpoints: Kpoints, max_points=1000, n_initial=8, tolerance=1e-3
+    ):
+        r"""
+        Dispersion along the k path with the adaptive density of points.
+
+        Each segment between two high symmetry points starts with ``n_initial``
+        equal intervals. Intervals are bisected recursively, while the energies at
+        their midpoints deviate from the linear interpolation between their ends by
+        more than ``tolerance``. Therefore, curved parts of the bands and band
+        crossings (kinks of the energy-sorted bands) get more points and the flat
+        parts get less. At each step the intervals with the largest deviation are
+        bisected first and all new points are computed in one batch.
+
+        Parameters
+        ----------
+        kpoints : :py:class:`wulfric.Kpoints`
+            K path (i.e. :py:attr:`.SpinHamiltonian.kpoints`).
+        max_points : int, default 1000
+            Maximum amount of computed k points.
+        n_initial : int, default 8
+            Initial amount of intervals at each segment of the path.
+        tolerance : float, default 1e-3
+            Tolerance of the linear interpolation, relative to the range of the
+            magnon energies.
+
+        Returns
+        -------
+        flat : (M,) :numpy:`ndarray`
+            Coordinate of each k point along the path, compatible with
+            :py:meth:`wulfric.Kpoints.ticks`.
+        points : (M, 3) :numpy:`ndarray`
+            K points in absolute coordinates, ordered along the path. Both ends of
+            each segment are included.
+        omegas : (N, M) :numpy:`ndarray`
+            Magnon energies at each k point.
+        """
+
+        n_initial = max(1, int(n_initial))
+
+        # Segments of the path
+        cell = np.array([kpoints.b1, kpoints.b2, kpoints.b3], dtype=float)
+        starts, ends = [], []
+        for subpath in kpoints.path:
+            for name, next_name in zip(subpath[:-1], subpath[1:]):
+                starts.append(kpoints.hs_coordinates[name] @ cell)
+                ends.append(kpoints.hs_coordinates[next_name] @ cell)
+        starts = np.array(starts, dtype=float).reshape((-1, 3))
+        directions = np.array(ends, dtype=float).reshape((-1, 3)) - starts
+        lengths = np.linalg.norm(directions, axis=1)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        def evaluate(segments, parameters):
+            points = starts[segments] + parameters[:, np.newaxis] * directions[segments]
+            return self.omegas(points).T
+
+        # Initial points and the midpoints of the initial intervals
+        n_segments = len(starts)
+        segments = np.repeat(np.arange(n_segments), n_initial + 1)
+        parameters = np.tile(np.linspace(0, 1, n_initial + 1), n_segments)
+        values = evaluate(segments, parameters)
+
+        left = (
+            np.arange(n_segments)[:, np.newaxis] * (n_initial + 1)
+            + np.arange(n_initial)
+        ).flatten()
+        right = left + 1
+
+        def bisect(left, right, segments, parameters, values):
+            new_segments = segments[left]
+            new_parameters = (parameters[left] + parameters[right]) / 2
+            new_values = evaluate(new_segments, new_parameters)
+            middle = len(parameters) + np.arange(len(left))
+            errors = np.max(
+                np.abs(new_values - (values[left] + values[right]) / 2),
+                axis=1,
+                initial=0,
+            )
+            return (
+                middle,
+                errors,
+                np.concatenate((segments, new_segments)),
+                np.concatenate((parameters, new_parameters)),
+                np.concatenate((values, new_values)),
+            )
+
+        middle, errors, segments, parameters, values = bisect(
+            left, right, segments, parameters, values
+        )
+
+        scale = np.ptp(values) if values.size > 0 else 0
+        if scale == 0:
+            scale = 1
+
+        while True:
+            budget = (max_points - len(parameters)) // 2
+            candidates = np.nonzero(errors > tolerance * scale)[0]
+            if budget < 1 or len(candidates) == 0:
+                break
+
+            # Intervals with the largest errors first
+            selected = candidates[np.argsort(errors[candidates])[::-1][:budget]]
+            kept = np.setdiff1d(np.arange(len(left)), selected)
+
+            # Each selected interval gives two children, which need their midpoints
+            child_left = np.concatenate((left[selected], middle[selected]))
+            child_right = np.concatenate((middle[selected], right[selected]))
+
+            child_middle, child_errors, segments, parameters, values = bisect(
+                child_left, child_right, segments, parameters, values
+            )
+
+            left = np.concatenate((left[kept], child_left))
+            right = np.concatenate((right[kept], child_right))
+            middle = np.concatenate((middle[kept], child_middle))
+            errors = np.concatenate((errors[kept], child_errors))
+
+        order = np.lexsort((parameters, segments))
+        segments = segments[order]
+        parameters = parameters[order]
+
+        flat = offsets[segments] + parameters * lengths[segments]
+        points = starts[segments] + parameters[:, np.newaxis] * directions[segments]
+
+        return flat, points, values[order].T
+
+    def symmetry_operations(self, tolerance=1e-6):
+        r"""
+        Symmetry operations of the magnon Hamiltonian.
+
+        Candidates are the operations of the point group of the lattice (see
+        :py:func:`.lattice_point_group`). An operation is kept if, together with
+        some translation, it
+
+        * maps every magnetic atom onto a magnetic atom (the mapping is a
+          permutation of the atoms);
+        * maps the spin vector (axial vector) of every atom onto the spin vector
+          of its image;
+        * maps every bond :math:`(i, j, \boldsymbol{d}, \boldsymbol{J})` onto the
+          bond :math:`(\pi(i), \pi(j), \boldsymbol{R}\boldsymbol{d},
+          \boldsymbol{R}\boldsymbol{J}\boldsymbol{R}^T)` of the Hamiltonian.
+
+        Then :math:`\boldsymbol{h}(\boldsymbol{k}\boldsymbol{W})` is equal to
+        :math:`\boldsymbol{h}(\boldsymbol{k})` up to the permutation of the atoms
+        and the phases of the local frames, hence the operations that are broken by
+        the magnetic order, anisotropy or antisymmetric exchange are removed.
+        Operations combined with the time reversal are not considered.
+
+        Parameters
+        ----------
+        tolerance : float, default 1e-6
+            Tolerance for the comparison of the positions (relative coordinates),
+            spin vectors and exchange matrices (relative to the largest values).
+
+        Returns
+        -------
+        operations : (n, 3, 3) :numpy:`ndarray` of int
+            Operations acting on the relative coordinates of the k points,
+            written as row vectors.
+        """
+
+        reciprocal_cell = self._reciprocal_cell
+        cell = 2 * np.pi * np.linalg.inv(reciprocal_cell).T
+        candidates = lattice_point_group(reciprocal_cell)
+
+        positions = self._positions @ np.linalg.inv(cell)
+        S_scale = max(1.0, np.abs(self.S).max())
+        J_scale = max(1.0, np.abs(self.J_matrices).max())
+
+        # Sum of the exchange matrices for each (i, j, R)
+        bonds = {}
+        for i, j, R, J in zip(
+            self.indices_i, self.indices_j, self._cell_vectors, self.J_matrices
+        ):
+            key = (int(i), int(j), tuple(R))
+            bonds[key] = bonds.get(key, 0) + J
+
+        mask = np.zeros(len(candidates), dtype=bool)
+        for n, W in enumerate(candidates):
+            # k W in absolute coordinates is R k, R acts on column vectors
+            rotation = (np.linalg.inv(reciprocal_cell) @ W @ reciprocal_cell).T
+            # Same rotation, acting on the relative coordinates (row vectors)
+            relative_rotation = cell @ rotation.T @ np.linalg.inv(cell)
+            if not np.allclose(relative_rotation, np.round(relative_rotation)):
+                continue
+            relative_rotation = np.round(relative_rotation).astype(int)
+
+            rotated = positions @ relative_rotation
+            for j in range(self.N):
+                mapping, offsets = self._map_atoms(
+                    rotated + positions[j] - rotated[0], positions, tolerance
+                )
+                if mapping is None:
+                    continue
+
+                # Spins are axial vectors
+                spins = np.linalg.det(rotation) * self.S @ rotation.T
+                if not np.allclose(
+                    spins, self.S[mapping], atol=tolerance * S_scale, rtol=0
+                ):
+                    continue
+
+                if self._bonds_are_mapped(
+                    bonds,
+                    mapping,
+                    offsets,
+                    relative_rotation,
+                    rotation,
+                    tolerance * J_scale,
+                ):
+                    mask[n] = True
+                    break
+
+        return candidates[mask]
+
+    @staticmethod
+    def _map_atoms(images, positions, tolerance):
+        r"""
+        Permutation of the atoms, that maps them onto the images.
+
+        Parameters
+        ----------
+        images : (N, 3) :numpy:`ndarray`
+            Images of the atoms, relative coordinates.
+        positions : (N, 3) :numpy:`ndarray`
+            Positions of the atoms, relative coordinates.
+        tolerance : float
+            Tolerance for the comparison of the positions.
+
+        Returns
+        -------
+        mapping : (N,) :numpy:`ndarray` of int
+            ``images[i]`` is equivalent to ``positions[mapping[i]]``. ``None`` if the
+            images are not a permutation of the atoms.
+        offsets : (N, 3) :numpy:`ndarray` of int
+            ``images[i] = positions[mapping[i]] + offsets[i]``.
+        """
+
+        difference = images[:, np.newaxis, :] - positions[np.newaxis, :, :]
+        integer = np.round(difference)
+        matches = np.all(np.abs(difference - integer) <= tolerance, axis=2)
+
+        if not (matches.sum(axis=1) == 1).all():
+            return None, None
+        mapping = np.argmax(matches, axis=1)
+        if len(np.unique(mapping)) != len(mapping):
+            return None, None
+
+        offsets = integer[np.arange(len(mapping)), mapping].astype(int)
+        return mapping, offsets
+
+    @staticmethod
+    def _bonds_are_mapped(bonds, mapping, offsets, relative_rotation, rotation, atol):
+        r"""
+        Whether every bond is mapped onto the bond of the Hamiltonian with the
+        transformed exchange matrix.
+        """
+
+        for (i, j, R), J in bonds.items():
+            R_image = tuple(np.array(R) @ relative_rotation + offsets[j] - offsets[i])
+            J_image = bonds.get((int(mapping[i]), int(mapping[j]), R_image))
+            if J_image is None or not np.allclose(
+                rotation @ J @ rotation.T, J_image, atol=atol, rtol=0
+            ):
+                return False
+        return True
+
+    def grid(self, n1, n2, n3, shift=(0, 0, 0), symmetry=True):
+        r"""
+        Regular grid of k points in the Brillouin zone.
+
+        Parameters
+        ----------
+        n1 : int
+            Amount of points along the first reciprocal lattice vector.
+        n2 : int
+            Amount of points along the second reciprocal lattice vector.
+        n3 : int
+            Amount of points along the third reciprocal lattice vector.
+        shift : (3,) |array-like|_, default (0, 0, 0)
+            Shift of the grid in the units of the grid step. See :py:class:`.KGrid`.
+        symmetry : bool, default True
+            Whether to reduce the grid to the irreducible points using
+            :py:meth:`.MagnonDispersion.symmetry_operations`.
+
+        Returns
+        -------
+        grid : :py:class:`.KGrid`
+            Grid of k points. Pass it to :py:meth:`.MagnonDispersion.omegas` to
+            compute the energies at the irreducible points only.
+
+        Examples
+        --------
+
+        .. doctest::
+
+            >>> grid = dispersion.grid(10, 10, 10) # doctest: +SKIP
+            >>> omegas = grid.unfold(dispersion.omegas(grid)) # doctest: +SKIP
+        """
+
+        operations = None
+        if symmetry:
+            operations = self.symmetry_operations()
+
+        return KGrid(
+            self._reciprocal_cell, n1, n2, n3, shift=shift, operations=operations
+        )
 
     def __call__(self, *args, **kwargs):
         return self.omegas(*args, **kwargs)
@@ -0,0 +1,350 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from magnopy import _chunking
+from magnopy.magnons.dispersion import MagnonDispersion
+
+__all__ = ["MagnonDOS"]
+
+# Six tetrahedra, that share the main diagonal 0-7 of the cube.
+# Corners of the cube are indexed as 4 * dx + 2 * dy + dz.
+_TETRAHEDRA = np.array(
+    [
+        [0, 1, 3, 7],
+        [0, 1, 5, 7],
+        [0, 2, 3, 7],
+        [0, 2, 6, 7],
+        [0, 4, 5, 7],
+        [0, 4, 6, 7],
+    ],
+    dtype=int,
+)
+
+
+class MagnonDOS:
+    r"""
+    Magnon density of states.
+
+    Density of states is computed on the regular grid of k points
+
+    .. math::
+
+        g(E) = \dfrac{1}{M}\sum_{\boldsymbol{k}}\sum_{n}\delta(E - \omega_n(\boldsymbol{k}))
+
+    where :math:`M` is the amount of k points, thus it is normalized to the amount
+    of magnon bands :math:`N`.
+
+    The grid is processed plane by plane (along the first reciprocal lattice
+    vector), therefore the memory consumption is defined by the size of one plane
+    of the grid and not by the full grid.
+
+    Parameters
+    ----------
+    dispersion : :py:class:`.MagnonDispersion`
+        Magnon dispersion.
+    n1 : int
+        Amount of points along the first reciprocal lattice vector.
+    n2 : int
+        Amount of points along the second reciprocal lattice vector.
+    n3 : int
+        Amount of points along the third reciprocal lattice vector.
+    shift : (3,) |array-like|_, default (0, 0, 0)
+        Shift of the grid in the units of the grid step. See :py:class:`.KGrid`.
+    """
+
+    def __init__(self, dispersion: MagnonDispersion, n1, n2, n3, shift=(0, 0, 0)):
+        self.dispersion = dispersion
+        self.size = (int(n1), int(n2), int(n3))
+        if min(self.size) < 1:
+            raise ValueError(f"Size of the grid has to be positive, got {self.size}")
+
+        self.shift = np.array(shift, dtype=float)
+        if self.shift.shape != (3,):
+            raise ValueError(
+                f"Shift has to have the shape (3,), got {self.shift.shape}"
+            )
+
+    def _planes(self):
+        r"""
+        Iterate over the planes of the grid.
+
+        Yields
+        ------
+        omegas : (N, n2, n3) :numpy:`ndarray`
+            Magnon energies of one plane of the grid.
+        """
+
+        n1, n2, n3 = self.size
+        reciprocal_cell = self.dispersion._reciprocal_cell
+
+        y, z = np.meshgrid(
+            (np.arange(n2) + self.shift[1]) / n2,
+            (np.arange(n3) + self.shift[2]) / n3,
+            indexing="ij",
+        )
+        relative = np.stack((np.zeros(y.size), y.flatten(), z.flatten()), axis=1)
+
+        for i in range(n1):
+            relative[:, 0] = (i + self.shift[0]) / n1
+            yield self.dispersion.omegas(relative @ reciprocal_cell).reshape(
+                (-1, n2, n3)
+            )
+
+    def _smearing(self, energies, function):
+        energies = np.array(energies, dtype=float).reshape(-1)
+        dos = np.zeros(energies.shape, dtype=float)
+
+        chunk_size = _chunking.chunk_size(len(energies))
+
+        for omegas in self._planes():
+            omegas = omegas.flatten()
+            for start in range(0, len(omegas), chunk_size):
+                dos += function(
+                    energies[np.newaxis, :]
+                    - omegas[start : start + chunk_size, np.newaxis]
+                ).sum(axis=0)
+
+        return dos / len(self)
+
+    def __len__(self):
+        return self.size[0] * self.size[1] * self.size[2]
+
+    def gaussian(self, energies, sigma):
+        r"""
+        Density of states with the Gaussian smearing.
+
+        .. math::
+
+            \delta(x) \rightarrow \dfrac{1}{\sigma\sqrt{2\pi}}e^{-\frac{x^2}{2\sigma^2}}
+
+        Parameters
+        ----------
+        energies : (E,) |array-like|_
+            Energies, for which the density of states is computed.
+        sigma : float
+            Standard deviation of the Gaussian, in the units of energy.
+
+        Returns
+        -------
+        dos : (E,) :numpy:`ndarray`
+            Density of states.
+        """
+
+        sigma = float(sigma)
+        if sigma <= 0:
+            raise ValueError(f"sigma has to be positive, got {sigma}")
+
+        return self._smearing(
+            energies,
+            lambda x: np.exp(-(x**2) / 2 / sigma**2) / sigma / np.sqrt(2 * np.pi),
+        )
+
+    def lorentzian(self, energies, gamma):
+        r"""
+        Density of states with the Lorentzian smearing.
+
+        .. math::
+
+            \delta(x) \rightarrow \dfrac{1}{\pi}\dfrac{\gamma}{x^2 + \gamma^2}
+
+        Parameters
+        ----------
+        energies : (E,) |array-like|_
+            Energies, for which the density of states is computed.
+        gamma : float
+            Half width at half maximum of the Lorentzian, in the units of energy.
+
+        Returns
+        -------
+        dos : (E,) :numpy:`ndarray`
+            Density of states.
+        """
+
+        gamma = float(gamma)
+        if gamma <= 0:
+            raise ValueError(f"gamma has to be positive, got {gamma}")
+
+        return self._smearing(energies, lambda x: gamma / np.pi / (x**2 + gamma**2))
+
+    def _tetrahedra(self):
+        r"""
+        Tetrahedra of one cube of the grid, which share its shortest main diagonal.
+
+        Returns
+        -------
+        tetrahedra : (6, 4) :numpy:`ndarray` of int
+            Corners of each tetrahedron (4 * dx + 2 * dy + dz).
+        """
+
+        steps = self.dispersion._reciprocal_cell / np.array(self.size)[:, None]
+
+        # Main diagonals start at the corners 0, 1, 2, 3 and end at the opposite ones
+        lengths = []
+        for corner in range(4):
+            start = np.array([corner >> 2 & 1, corner >> 1 & 1, corner & 1])
+            lengths.append(np.linalg.norm((1 - 2 * start) @ steps))
+
+        # Relabel the corners, so the tetrahedra share the shortest diagonal
+        return _TETRAHEDRA ^ int(np.argmin(lengths))
+
+    def tetrahedron(self, energies):
+        r"""
+        Density of states with the linear tetrahedron method [1]_.
+
+        Each cube of the grid is divided into six tetrahedra and the energies are
+        linearly interpolated inside each tetrahedron.
+
+        Parameters
+        ----------
+        energies : (E,) |array-like|_
+            Energies, for which the density of states is computed.
+
+        Returns
+        -------
+        dos : (E,) :numpy:`ndarray`
+            Density of states.
+
+        References
+        ----------
+        .. [1] Blöchl, P.E., Jepsen, O. and Andersen, O.K., 1994.
+            Improved tetrahedron method for Brillouin-zone integrations.
+            Physical Review B, 49(23), p.16223.
+        """
+
+        energies = np.array(energies, dtype=float).reshape(-1)
+        dos = np.zeros(energies.shape, dtype=float)
+
+        tetrahedra = self._tetrahedra()
+
+        planes = self._planes()
+        first = next(planes)
+        current = first
+        for i in range(self.size[0]):
+            # Last plane is connected to the first one
+            following = next(planes) if i < self.size[0] - 1 else first
+
+            # Energies at the eight corners of all cubes between two planes
+            corners = []
+            for plane in [current, following]:
+                for dy in range(2):
+                    for dz in range(2):
+                        corners.append(
+                            np.roll(plane, shift=(-dy, -dz), axis=(1, 2)).flatten()
+                        )
+            corners = np.array(corners)
+
+            # (6 * N * n2 * n3, 4) sorted energies at the corners of the tetrahedra
+            vertices = np.sort(
+                np.transpose(corners[tetrahedra], (0, 2, 1)).reshape((-1, 4)), axis=1
+            )
+            dos += self._tetrahedra_dos(energies, vertices)
+
+            current = following
+
+        return dos / (6 * len(self))
+
+    @staticmethod
+    def _tetrahedra_dos(energies, vertices):
+        r"""
+        Sum of the density of states of the tetrahedra, each one normalized to one.
+
+        Only the pairs (tetrahedron, energy) with the energy inside the span of the
+        tetrahedron are evaluated.
+
+        Parameters
+        ----------
+        energies : (E,) :numpy:`ndarray`
+        vertices : (T, 4) :numpy:`ndarray`
+            Sorted energies at the corners of each tetrahedron.
+
+        Returns
+        -------
+        dos : (E,) :numpy:`ndarray`
+        """
+
+        order = np.argsort(energies)
+        sorted_energies = energies[order]
+
+        # Range of energies [lower, upper) inside each tetrahedron
+        lower = np.searchsorted(sorted_energies, vertices[:, 0], side="left")
+        upper = np.searchsorted(sorted_energies, vertices[:, 3], side="left")
+        counts = upper - lower
+
+        # Split tetrahedra in chunks with bounded amount of pairs
+        boundaries = np.searchsorted(
+            np.cumsum(counts),
+            np.arange(_chunking.MAX_ELEMENTS, counts.sum(), _chunking.MAX_ELEMENTS),
+            side="right",
+        )
+        boundaries = np.concatenate(([0], boundaries, [len(vertices)]))
+
+        dos = np.zeros(energies.shape, dtype=float)
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            chunk_counts = counts[start:end]
+            tetrahedra = np.repeat(np.arange(start, end), chunk_counts)
+            indices = (
+                np.arange(chunk_counts.sum())
+                - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+                + lower[tetrahedra]
+            )
+
+            e = sorted_energies[indices]
+            e1, e2, e3, e4 = vertices[tetrahedra].T
+
+            result = np.zeros(e.shape, dtype=float)
+
+            region = e < e2
+            x = e[region] - e1[region]
+            result[region] = (
+                3
+                * x**2
+                / (
+                    (e2[region] - e1[region])
+                    * (e3[region] - e1[region])
+                    * (e4[region] - e1[region])
+                )
+            )
+
+            region = (e2 <= e) & (e < e3)
+            x = e[region] - e2[region]
+            e21 = e2[region] - e1[region]
+            e31 = e3[region] - e1[region]
+            e41 = e4[region] - e1[region]
+            e32 = e3[region] - e2[region]
+            e42 = e4[region] - e2[region]
+            result[region] = (
+                3 * e21 + 6 * x - 3 * (e31 + e42) * x**2 / (e32 * e42)
+            ) / (e31 * e41)
+
+            region = e3 <= e
+            x = e4[region] - e[region]
+            result[region] = (
+                3
+                * x**2
+                / (
+                    (e4[region] - e1[region])
+                    * (e4[region] - e2[region])
+                    * (e4[region] - e3[region])
+                )
+            )
+
+            dos[order] += np.bincount(indices, weights=result, minlength=len(energies))
+
+        return dos
@@ -0,0 +1,246 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from scipy.ndimage import map_coordinates, spline_filter
+
+from magnopy import _chunking
+from magnopy.magnons.diagonalization import (
+    COLPA_FAILED,
+    COLPA_UNSTABLE,
+    solve_via_colpa_classified,
+)
+
+__all__ = ["DispersionInterpolator"]
+
+
+class DispersionInterpolator:
+    r"""
+    Fourier interpolation of the magnon dispersion.
+
+    Exchange matrices are written as
+
+    .. math::
+
+        \boldsymbol{J}_{i,j}(\boldsymbol{k})
+        = e^{-i\boldsymbol{k}(\boldsymbol{r}_j - \boldsymbol{r}_i)}
+        \sum_{\boldsymbol{R}}\boldsymbol{J}_{i,j}(\boldsymbol{R})e^{-i\boldsymbol{k}\boldsymbol{R}}
+        = e^{-i\boldsymbol{k}(\boldsymbol{r}_j - \boldsymbol{r}_i)}
+        \boldsymbol{P}_{i,j}(\boldsymbol{k})
+
+    where :math:`\boldsymbol{P}_{i,j}(\boldsymbol{k})` is periodic in the
+    reciprocal space. Real-space tables :math:`\boldsymbol{J}_{i,j}(\boldsymbol{R})`
+    are transformed by one FFT to a regular grid of k points and
+    :math:`\boldsymbol{P}_{i,j}(\boldsymbol{k})` is interpolated by the periodic
+    splines for any k point. The cost of the evaluation does not depend on the
+    amount of bonds.
+
+    Usually created by :py:meth:`.MagnonDispersion.interpolator`.
+
+    Parameters
+    ----------
+    dispersion : :py:class:`.MagnonDispersion`
+        Magnon dispersion.
+    size : (3,) tuple of int, optional
+        Size of the regular grid. By default it is ``oversampling`` times the
+        minimal size, that resolves all cell vectors of the bonds.
+    oversampling : int, default 4
+        Ratio between the default size of the grid and the minimal one.
+    order : int, default 3
+        Order of the splines, from 1 to 5.
+
+    Attributes
+    ----------
+    size : (3,) tuple of int
+        Size of the regular grid.
+    """
+
+    def __init__(self, dispersion, size=None, oversampling=4, order=3):
+        self.dispersion = dispersion
+        self.order = int(order)
+        if not 1 <= self.order <= 5:
+            raise ValueError(f"Order of the splines has to be from 1 to 5, got {order}")
+
+        cell_vectors = dispersion._cell_vectors
+        if size is None:
+            span = 2 * np.max(np.abs(cell_vectors), axis=0, initial=0) + 1
+            size = tuple(int(oversampling) * span)
+        self.size = tuple(int(n) for n in size)
+        if len(self.size) != 3 or min(self.size) < 1:
+            raise ValueError(
+                f"Size of the grid has to be three positive integers, got {size}"
+            )
+
+        self._reciprocal_cell = dispersion._reciprocal_cell
+        self._positions = dispersion._positions
+
+        # P(k) = sum_R J(R) e^{-2 pi i kappa R}, kappa in relative coordinates
+        self._pair_i = dispersion._pair_i
+        self._pair_j = dispersion._pair_j
+        tables = dispersion._mesh_transform(
+            dispersion.J_matrices, self.size, np.zeros(3), sign=-1, phases=False
+        )[:, self._pair_i, self._pair_j]
+        tables = np.moveaxis(tables, 0, -1).reshape((-1,) + self.size)
+
+        # Spline coefficients of the real and imaginary parts
+        self._coefficients = [
+            [
+                spline_filter(part, order=self.order, mode="grid-wrap")
+                for part in [table.real, table.imag]
+            ]
+            for table in tables
+        ]
+
+    def J_batch(self, kpoints):
+        r"""
+        Interpolates J(k) matrix for a set of k points.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        J : (M, N, N, 3, 3) :numpy:`ndarray`
+            J(k) matrix for each k point. See :py:meth:`.MagnonDispersion.J_batch`.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.dispersion.N
+
+        result = np.zeros((len(kpoints), N, N, 3, 3), dtype=complex)
+
+        if len(self._pair_i) == 0:
+            return result
+
+        # Coordinates on the grid, in the units of the grid step
+        relative = kpoints @ np.linalg.inv(self._reciprocal_cell)
+        coordinates = np.mod(relative * self.size, self.size).T
+
+        values = np.zeros((len(self._coefficients), len(kpoints)), dtype=complex)
+        for index, (real, imag) in enumerate(self._coefficients):
+            for part, coefficients in [(1, real), (1j, imag)]:
+                values[index] += part * map_coordinates(
+                    coefficients,
+                    coordinates,
+                    order=self.order,
+                    mode="grid-wrap",
+                    prefilter=False,
+                )
+
+        # Restore the phases between the atoms
+        phases = np.exp(
+            -1j
+            * (
+                kpoints
+                @ (self._positions[self._pair_j] - self._positions[self._pair_i]).T
+            )
+        )
+        values = values.reshape((len(self._pair_i), 3, 3, len(kpoints)))
+        result[:, self._pair_i, self._pair_j] = (
+            np.transpose(values, (3, 0, 1, 2)) * phases[:, :, np.newaxis, np.newaxis]
+        )
+
+        return result
+
+    def h_batch(self, kpoints):
+        r"""
+        Interpolates h(k) matrix for a set of k points.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            Reciprocal vectors.
+            In absolute coordinates.
+
+        Returns
+        -------
+        h : (M, 2N, 2N) :numpy:`ndarray`
+            h(k) matrix for each k point. See :py:meth:`.MagnonDispersion.h`.
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.dispersion.N
+
+        result = np.zeros((len(kpoints), 2 * N, 2 * N), dtype=complex)
+
+        # J(k) of the points and of the opposite ones is computed for each chunk
+        chunk_size = _chunking.chunk_size(18 * N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            points = kpoints[start:end]
+            J = self.J_batch(np.concatenate((points, -points), axis=0))
+            result[start:end] = self.dispersion._h(J[: len(points)], J[len(points) :])
+
+        return result
+
+    def omegas(self, kpoints, zeros_to_none=False, return_status=False):
+        r"""
+        Interpolated dispersion spectra.
+
+        Parameters
+        ----------
+        kpoints : (M, 3) |array-like|_
+            K points in absolute coordinates.
+        zeros_to_none : bool, default=False
+            If True, then return ``None`` instead of 0 if Colpa fails.
+        return_status : bool, default False
+            Whether to return the status of the diagonalization for each k point.
+
+        Returns
+        -------
+        omegas : (N, M) :numpy:`ndarray`
+            Magnon energies for each k point.
+        status : (M,) :numpy:`ndarray` of int
+            Status code of h(k) for each k point. Returned only if
+            ``return_status`` is ``True``.
+
+        See Also
+        --------
+        MagnonDispersion.omegas
+        """
+
+        kpoints = np.array(kpoints, dtype=float).reshape((-1, 3))
+        N = self.dispersion.N
+
+        omegas = np.zeros((len(kpoints), N), dtype=float)
+        status = np.zeros(len(kpoints), dtype=int)
+
+        chunk_size = _chunking.chunk_size(18 * N**2)
+
+        for start in range(0, len(kpoints), chunk_size):
+            end = start + chunk_size
+            E, _, status[start:end] = solve_via_colpa_classified(
+                self.h_batch(kpoints[start:end])
+            )
+            omegas[start:end] = E[:, :N]
+
+        if not zeros_to_none:
+            omegas[(status == COLPA_UNSTABLE) | (status == COLPA_FAILED)] = 0
+
+        omegas[np.abs(omegas) <= 1e-8] = 0
+
+        if return_status:
+            return omegas.T, status
+        return omegas.T
+
+    def __call__(self, *args, **kwargs):
+        return self.omegas(*args, **kwargs)
@@ -0,0 +1,314 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+__all__ = ["DispersionKernel"]
+
+
+def span_orthonormal_set(vec):
+    r"""
+    Span orthonormal set of vectors.
+
+    Parameters
+    ----------
+    vec : (3,) |array-like|_
+        Vector, which serves as :math:`e_3`
+
+    Returns
+    -------
+    e1 : (3,) :numpy:`ndarray`
+    e2 : (3,) :numpy:`ndarray`
+    e3 : (3,) :numpy:`ndarray`
+    """
+
+    vec = np.array(vec) / np.linalg.norm(vec)
+
+    if np.allclose(vec, [0, 0, 1]):
+        return (
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, 1.0, 0.0]),
+            np.array([0.0, 0.0, 1.0]),
+        )
+
+    if np.allclose(vec, [0, 0, -1]):
+        return (
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, -1.0, 0.0]),
+            np.array([0.0, 0.0, -1.0]),
+        )
+
+    z_dir = [0, 0, 1]
+    n = (
+        np.cross(vec, z_dir)
+        / np.linalg.norm(np.cross(vec, z_dir))
+        * np.arccos(np.dot(vec, z_dir) / np.linalg.norm(vec))
+    )
+    rotation_matrix = Rotation.from_rotvec(n).as_matrix()
+
+    return rotation_matrix
+
+
+class DispersionKernel:
+    r"""
+    Immutable k-independent data of the magnon dispersion.
+
+    It holds the exchange parameters of the spin Hamiltonian in the notation of
+    SpinW, bond arrays, local spin frames and the constant C matrix. Once created it
+    can be shared between any amount of :py:class:`.MagnonDispersion` instances and
+    sent to the worker processes, since it is cheap to copy and to pickle.
+
+    Parameters
+    ----------
+    model : :py:class:`.SpinHamiltonian`
+        Spin Hamiltonian. It is not modified and is not stored. The parameters are
+        converted to the notation of SpinW arithmetically, without the copy of the
+        Hamiltonian.
+
+    Attributes
+    ----------
+    N : int
+        Number of magnetic atoms.
+    J_matrices : (B, 3, 3) :numpy:`ndarray`
+        Exchange parameters in the notation of SpinW.
+    indices_i : (B,) :numpy:`ndarray` of int32
+        Indices of the first atom in the exchange pair.
+    indices_j : (B,) :numpy:`ndarray` of int32
+        Indices of the second atom in the exchange pair.
+    dis_vectors : (B, 3) :numpy:`ndarray`
+        Vectors from the first atom to the second atom in the exchange pair.
+    cell_vectors : (B, 3) :numpy:`ndarray` of int
+        Lattice vectors of the bonds in relative coordinates.
+    pair_offsets : (P,) :numpy:`ndarray` of int
+        Start of each segment of bonds with the same pair of atoms.
+    pair_i : (P,) :numpy:`ndarray` of int32
+        Index of the first atom of each pair.
+    pair_j : (P,) :numpy:`ndarray` of int32
+        Index of the second atom of each pair.
+    reciprocal_cell : (3, 3) :numpy:`ndarray`
+        Reciprocal cell of the model, rows are the vectors.
+    positions : (N, 3) :numpy:`ndarray`
+        Absolute positions of the magnetic atoms.
+    S : (N, 3) :numpy:`ndarray`
+        Spin vectors.
+    u : (N, 3) :numpy:`ndarray`
+        Defined from local spin directions.
+    v : (N, 3) :numpy:`ndarray`
+        Defined from local spin directions.
+    spin_norms : (N,) :numpy:`ndarray`
+        Spin values :math:`S_i`.
+    sqrt_spins : (N, N) :numpy:`ndarray`
+        :math:`\sqrt{S_iS_j}`.
+    u_conj : (N, 3) :numpy:`ndarray`
+        Complex conjugate of :math:`\boldsymbol{u}`.
+    C : (N, N) :numpy:`ndarray`
+        C matrix, see :py:meth:`.MagnonDispersion.C`.
+
+    Notes
+    -----
+    All arrays are read-only and attributes can not be reassigned. Bonds are grouped
+    by the pair of atoms :math:`(i, j)`.
+    """
+
+    __slots__ = (
+        "N",
+        "J_matrices",
+        "indices_i",
+        "indices_j",
+        "dis_vectors",
+        "cell_vectors",
+        "pair_offsets",
+        "pair_i",
+        "pair_j",
+        "reciprocal_cell",
+        "positions",
+        "S",
+        "u",
+        "v",
+        "spin_norms",
+        "sqrt_spins",
+        "u_conj",
+        "C",
+    )
+
+    def __init__(self, model: SpinHamiltonian):
+        magnetic_atoms = model.magnetic_atoms
+        atom_indices = dict([(atom, i) for i, atom in enumerate(magnetic_atoms)])
+
+        # Scale factors of the conversion to the notation of SpinW:
+        # (True, False, 1, 1). Undefined interpretation is not converted,
+        # as in SpinHamiltonian.notation
+        exchange_scale = 1.0
+        on_site_scale = 1.0
+        if model._exchange_factor is not None:
+            exchange_scale = model._exchange_factor
+        if model._on_site_factor is not None:
+            on_site_scale = model._on_site_factor
+        if model._double_counting is not None and not model._double_counting:
+            exchange_scale *= 0.5
+        spin_normalized = bool(model._spin_normalized)
+
+        # On-site terms first, then exchange terms, then missing mirrored bonds
+        bonds = []
+        for atom, parameter in model.on_site:
+            scale = on_site_scale
+            if spin_normalized:
+                scale /= atom.spin**2
+            bonds.append((atom, atom, (0, 0, 0), parameter.matrix * scale))
+
+        mirrored = []
+        for atom1, atom2, (i, j, k), parameter in model.exchange:
+            scale = exchange_scale
+            if spin_normalized:
+                scale /= atom1.spin * atom2.spin
+            matrix = parameter.matrix * scale
+            bonds.append((atom1, atom2, (i, j, k), matrix))
+            if (atom2, atom1, (-i, -j, -k)) not in model:
+                mirrored.append((atom2, atom1, (-i, -j, -k), matrix.T))
+        bonds.extend(mirrored)
+
+        N = len(magnetic_atoms)
+        n_bonds = len(bonds)
+        J_matrices = np.zeros((n_bonds, 3, 3), dtype=float)
+        indices_i = np.zeros(n_bonds, dtype=np.int32)
+        indices_j = np.zeros(n_bonds, dtype=np.int32)
+        dis_vectors = np.zeros((n_bonds, 3), dtype=float)
+        cell_vectors = np.zeros((n_bonds, 3), dtype=int)
+
+        for index, (atom1, atom2, R, J) in enumerate(bonds):
+            indices_i[index] = atom_indices[atom1]
+            indices_j[index] = atom_indices[atom2]
+            dis_vectors[index] = model.get_vector(atom1, atom2, R)
+            cell_vectors[index] = R
+            J_matrices[index] = J
+
+        # Group bonds by the pair of atoms (i, j)
+        pairs = indices_i.astype(int) * N + indices_j
+        order = np.argsort(pairs, kind="stable")
+        _, pair_offsets = np.unique(pairs[order], return_index=True)
+
+        # Absolute positions of the magnetic atoms
+        positions = np.array(
+            [
+                model.get_atom_coordinates(atom, relative=False)
+                for atom in magnetic_atoms
+            ],
+            dtype=float,
+        ).reshape((N, 3))
+
+        # Get spin vectors and compute u and v vectors from local spin directions
+        S = np.zeros((N, 3), dtype=float)
+        u = np.zeros((N, 3), dtype=complex)
+        v = np.zeros((N, 3), dtype=complex)
+        for a_i, atom in enumerate(magnetic_atoms):
+            try:
+                S[a_i] = atom.spin_vector
+                e1, e2, e3 = span_orthonormal_set(S[a_i])
+                v[a_i] = e3
+                u[a_i] = e1 + 1j * e2
+            except ValueError:
+                raise ValueError(
+                    f"Spin vector is not defined for {atom.fullname} atom."
+                )
+
+        self._freeze(
+            N=N,
+            J_matrices=J_matrices[order],
+            indices_i=indices_i[order],
+            indices_j=indices_j[order],
+            dis_vectors=dis_vectors[order],
+            cell_vectors=cell_vectors[order],
+            pair_offsets=pair_offsets,
+            reciprocal_cell=np.array(model.reciprocal_cell, dtype=float),
+            positions=positions,
+            S=S,
+            u=u,
+            v=v,
+        )
+
+    def _freeze(self, **arrays):
+        r"""
+        Sets the attributes, computes the derived ones and makes them read-only.
+        """
+
+        N = arrays["N"]
+        J_matrices = arrays["J_matrices"]
+        indices_i = arrays["indices_i"]
+        indices_j = arrays["indices_j"]
+        v = arrays["v"]
+
+        arrays["pair_i"] = indices_i[arrays["pair_offsets"]]
+        arrays["pair_j"] = indices_j[arrays["pair_offsets"]]
+
+        spin_norms = np.linalg.norm(arrays["S"], axis=1)
+        arrays["spin_norms"] = spin_norms
+        arrays["sqrt_spins"] = np.sqrt(np.outer(spin_norms, spin_norms))
+        arrays["u_conj"] = np.conjugate(arrays["u"])
+
+        # J(0), then C matrix, note: sum over l is hidden here
+        J_zero = np.zeros((N, N, 3, 3), dtype=float)
+        np.add.at(J_zero, (indices_i, indices_j), J_matrices)
+        arrays["C"] = np.diag(
+            np.einsum("ix,ilxy,ly,l->i", v, J_zero, v, spin_norms, optimize=True)
+        )
+
+        for name, value in arrays.items():
+            if isinstance(value, np.ndarray):
+                value = np.ascontiguousarray(value)
+                value.setflags(write=False)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"DispersionKernel is immutable, can not set {name}.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"DispersionKernel is immutable, can not delete {name}.")
+
+    def __getstate__(self):
+        # Only the primary data are pickled, the derived ones are recomputed
+        return dict(
+            [
+                (name, getattr(self, name))
+                for name in (
+                    "N",
+                    "J_matrices",
+                    "indices_i",
+                    "indices_j",
+                    "dis_vectors",
+                    "cell_vectors",
+                    "pair_offsets",
+                    "reciprocal_cell",
+                    "positions",
+                    "S",
+                    "u",
+                    "v",
+                )
+            ]
+        )
+
+    def __setstate__(self, state):
+        self._freeze(**state)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
@@ -0,0 +1,267 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from itertools import product
+
+import numpy as np
+
+__all__ = ["KGrid", "lattice_point_group"]
+
+
+def lattice_point_group(reciprocal_cell, rel_tol=1e-4):
+    r"""
+    Point group of the lattice.
+
+    Computes all integer matrices :math:`\boldsymbol{W}` with the elements from
+    :math:`\{-1, 0, 1\}`, that preserve the metric of the reciprocal lattice:
+
+    .. math::
+
+        \boldsymbol{W}\boldsymbol{g}\boldsymbol{W}^T = \boldsymbol{g},
+        \quad
+        \boldsymbol{g} = \boldsymbol{B}\boldsymbol{B}^T
+
+    where :math:`\boldsymbol{B}` is the reciprocal cell (rows are vectors).
+
+    Parameters
+    ----------
+    reciprocal_cell : (3, 3) |array-like|_
+        Reciprocal cell, rows are vectors.
+    rel_tol : float, default 1e-4
+        Relative tolerance for the comparison of the metric tensors.
+
+    Returns
+    -------
+    operations : (n, 3, 3) :numpy:`ndarray` of int
+        Operations acting on the relative coordinates of the k points,
+        written as row vectors: :math:`\boldsymbol{k}^{\prime} = \boldsymbol{k}\boldsymbol{W}`.
+        Identity is always the first one.
+
+    Notes
+    -----
+    Elements from :math:`\{-1, 0, 1\}` are sufficient for the reduced cells
+    (for example, the ones produced by the standardization of wulfric). For other
+    cells some of the operations might be missed, which reduces the efficiency of
+    the symmetry reduction, but not its correctness.
+    """
+
+    reciprocal_cell = np.array(reciprocal_cell, dtype=float)
+    metric = reciprocal_cell @ reciprocal_cell.T
+
+    candidates = np.array(list(product([-1, 0, 1], repeat=9)), dtype=int).reshape(
+        (-1, 3, 3)
+    )
+    candidates = candidates[np.abs(np.round(np.linalg.det(candidates))) == 1]
+
+    transformed = np.einsum("nij,jk,nlk->nil", candidates, metric, candidates)
+    mask = np.all(
+        np.abs(transformed - metric) <= rel_tol * np.abs(metric).max(), axis=(1, 2)
+    )
+    operations = candidates[mask]
+
+    # Put identity first
+    identity = np.all(operations == np.eye(3, dtype=int), axis=(1, 2))
+    return np.concatenate((operations[identity], operations[~identity]), axis=0)
+
+
+class KGrid:
+    r"""
+    Regular grid of k points in the Brillouin zone.
+
+    Monkhorst-Pack grid with the points
+
+    .. math::
+
+        \boldsymbol{k}_{n_1,n_2,n_3} = \sum_{i=1}^3 \dfrac{n_i + s_i}{N_i}\boldsymbol{b}_i,
+        \quad n_i = 0, \dots, N_i - 1
+
+    where :math:`\boldsymbol{b}_i` are the reciprocal lattice vectors and
+    :math:`s_i` is the shift in the units of the grid step (:math:`s_i = 0` gives
+    :math:`\Gamma`-centred grid, :math:`s_i=1/2` gives the original Monkhorst-Pack
+    grid for even :math:`N_i`).
+
+    If symmetry operations are given, then the grid is reduced to the irreducible
+    points. Each point of the full grid is mapped to one of the irreducible points
+    and the values computed for the irreducible points can be unfolded back to the
+    full grid with :py:meth:`.KGrid.unfold`.
+
+    Parameters
+    ----------
+    reciprocal_cell : (3, 3) |array-like|_
+        Reciprocal cell, rows are vectors.
+    n1 : int
+        Amount of points along the first reciprocal lattice vector.
+    n2 : int
+        Amount of points along the second reciprocal lattice vector.
+    n3 : int
+        Amount of points along the third reciprocal lattice vector.
+    shift : (3,) |array-like|_, default (0, 0, 0)
+        Shift of the grid in the units of the grid step.
+    operations : (n, 3, 3) |array-like|_, optional
+        Symmetry operations acting on the relative coordinates of the k points,
+        written as row vectors. See :py:func:`.lattice_point_group`. Operations, that
+        do not map the grid onto itself are ignored. By default no reduction is made.
+
+    Attributes
+    ----------
+    size : tuple of three int
+        Amount of points along each reciprocal lattice vector.
+    shift : (3,) :numpy:`ndarray`
+        Shift of the grid in the units of the grid step.
+    reciprocal_cell : (3, 3) :numpy:`ndarray`
+        Reciprocal cell, rows are vectors.
+    operations : (n, 3, 3) :numpy:`ndarray` of int
+        Symmetry operations, that were used for the reduction.
+    mapping : (M,) :numpy:`ndarray` of int
+        Index of the irreducible point for each point of the full grid.
+    weights : (K,) :numpy:`ndarray`
+        Weight of each irreducible point. Sum of the weights is equal to one.
+    """
+
+    def __init__(self, reciprocal_cell, n1, n2, n3, shift=(0, 0, 0), operations=None):
+        self.reciprocal_cell = np.array(reciprocal_cell, dtype=float)
+        self.size = (int(n1), int(n2), int(n3))
+        if min(self.size) < 1:
+            raise ValueError(f"Size of the grid has to be positive, got {self.size}")
+
+        self.shift = np.array(shift, dtype=float)
+        if self.shift.shape != (3,):
+            raise ValueError(
+                f"Shift has to have the shape (3,), got {self.shift.shape}"
+            )
+
+        if operations is None:
+            operations = np.eye(3, dtype=int)[np.newaxis]
+        operations = np.array(operations, dtype=int).reshape((-1, 3, 3))
+
+        # Find the representative of every orbit, as the smallest index in it
+        representative = np.arange(len(self), dtype=int)
+        relative = self.relative
+        used = np.zeros(len(operations), dtype=bool)
+        images = []
+        for index, operation in enumerate(operations):
+            image = self._indices(relative @ operation)
+            if image is not None:
+                used[index] = True
+                images.append(image)
+        self.operations = operations[used]
+
+        # The closure of the set of operations is treated by repetition
+        changed = True
+        while changed:
+            changed = False
+            for image in images:
+                new = np.minimum(representative, representative[image])
+                new = new[new]
+                if (new != representative).any():
+                    representative = new
+                    changed = True
+
+        self._irreducible_indices, self.mapping, counts = np.unique(
+            representative, return_inverse=True, return_counts=True
+        )
+        self.mapping = self.mapping.reshape(-1)
+        self.weights = counts / len(self)
+
+    def __len__(self):
+        return self.size[0] * self.size[1] * self.size[2]
+
+    def _indices(self, relative):
+        # Flat indices of the points of the grid, given in relative coordinates.
+        # None if at least one of the points is not on the grid.
+        indices = relative * self.size - self.shift
+        rounded = np.round(indices)
+        if not np.allclose(indices, rounded, atol=1e-6):
+            return None
+        rounded = rounded.astype(int) % self.size
+        return (rounded[:, 0] * self.size[1] + rounded[:, 1]) * self.size[2] + rounded[
+            :, 2
+        ]
+
+    @property
+    def relative(self):
+        r"""
+        Points of the full grid in relative coordinates.
+
+        Returns
+        -------
+        relative : (M, 3) :numpy:`ndarray`
+            Points are ordered as :math:`(n_1, n_2, n_3)` with :math:`n_3`
+            changing the fastest.
+        """
+
+        axes = [
+            (np.arange(self.size[i]) + self.shift[i]) / self.size[i] for i in range(3)
+        ]
+        return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape((-1, 3))
+
+    @property
+    def points(self):
+        r"""
+        Points of the full grid in absolute coordinates.
+
+        Returns
+        -------
+        points : (M, 3) :numpy:`ndarray`
+            Same order as in :py:attr:`.KGrid.relative`.
+        """
+
+        return self.relative @ self.reciprocal_cell
+
+    @property
+    def irreducible_relative(self):
+        r"""
+        Irreducible points in relative coordinates.
+
+        Returns
+        -------
+        irreducible_relative : (K, 3) :numpy:`ndarray`
+        """
+
+        return self.relative[self._irreducible_indices]
+
+    @property
+    def irreducible(self):
+        r"""
+        Irreducible points in absolute coordinates.
+
+        Returns
+        -------
+        irreducible : (K, 3) :numpy:`ndarray`
+        """
+
+        return self.irreducible_relative @ self.reciprocal_cell
+
+    def unfold(self, values, axis=-1):
+        r"""
+        Unfold the values from the irreducible points to the full grid.
+
+        Parameters
+        ----------
+        values : (..., K, ...) |array-like|_
+            Values computed for the irreducible points.
+        axis : int, default -1
+            Axis of ``values``, that corresponds to the irreducible points.
+
+        Returns
+        -------
+        values : (..., M, ...) :numpy:`ndarray`
+            Values for each point of the full grid.
+        """
+
+        return np.take(np.array(values), self.mapping, axis=axis)
@@ -0,0 +1,264 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from magnopy import _chunking
+from magnopy.magnons.diagonalization import COLPA_FAILED, COLPA_UNSTABLE
+from magnopy.magnons.dispersion import MagnonDispersion
+
+__all__ = ["SQW"]
+
+
+class SQW:
+    r"""
+    Dynamical structure factor :math:`S(\boldsymbol{q}, \omega)` of magnons.
+
+    Only the creation of magnons (:math:`\omega > 0`) at zero temperature is
+    considered. Correlation functions of each magnon mode are
+
+    .. math::
+
+        S^{\alpha\beta}_n(\boldsymbol{q}) = \overline{W^{\alpha}_n(\boldsymbol{q})}W^{\beta}_n(\boldsymbol{q}),
+        \quad
+        W^{\alpha}_n(\boldsymbol{q}) = \sum_{i}F_i(\vert\boldsymbol{q}\vert)\sqrt{\dfrac{S_i}{2}}
+        \left(\overline{u}^{\alpha}_i(G^{-1})_{i,N+n} + u^{\alpha}_i(G^{-1})_{N+i,N+n}\right)
+
+    where :math:`G` diagonalizes :math:`h(-\boldsymbol{q})`, :math:`F_i` is the
+    magnetic form factor of the atom :math:`i` and the mode :math:`N+n` of
+    :math:`h(-\boldsymbol{q})` has the energy :math:`\omega_n(\boldsymbol{q})`.
+    The phases :math:`e^{i\boldsymbol{q}\boldsymbol{r}_i}` are already included in
+    h(k), since bond vectors are measured between the atoms.
+
+    Intensity for the unpolarized neutrons is
+
+    .. math::
+
+        I_n(\boldsymbol{q}) = \sum_{\alpha,\beta}\left(\delta_{\alpha\beta}
+        - \hat{q}_{\alpha}\hat{q}_{\beta}\right)S^{\alpha\beta}_n(\boldsymbol{q})
+
+    Parameters
+    ----------
+    dispersion : :py:class:`.MagnonDispersion`
+        Magnon dispersion.
+    form_factor : callable or list of callable, optional
+        Magnetic form factor as a function of :math:`\vert\boldsymbol{q}\vert`. It
+        has to accept an array of :math:`\vert\boldsymbol{q}\vert` and return an
+        array of the same shape. Either one function for all atoms or one function
+        for each magnetic atom. By default :math:`F_i = 1`.
+    polarization : bool, default True
+        Whether to apply the polarization factor
+        :math:`\delta_{\alpha\beta} - \hat{q}_{\alpha}\hat{q}_{\beta}`.
+    """
+
+    def __init__(
+        self, dispersion: MagnonDispersion, form_factor=None, polarization=True
+    ):
+        self.dispersion = dispersion
+        self.polarization = polarization
+
+        if form_factor is None or callable(form_factor):
+            self._form_factors = [form_factor] * dispersion.N
+        else:
+            self._form_factors = list(form_factor)
+            if len(self._form_factors) != dispersion.N:
+                raise ValueError(
+                    f"Expected {dispersion.N} form factors, "
+                    f"got {len(self._form_factors)}"
+                )
+
+    def _form_factor(self, qpoints):
+        # (M, N) form factors of each atom
+        q = np.linalg.norm(qpoints, axis=1)
+        result = np.ones((len(qpoints), self.dispersion.N), dtype=float)
+        for i, function in enumerate(self._form_factors):
+            if function is not None:
+                result[:, i] = function(q)
+        return result
+
+    def _amplitudes(self, qpoints):
+        r"""
+        Computes energies and amplitudes :math:`W^{\alpha}_n(\boldsymbol{q})`.
+
+        Parameters
+        ----------
+        qpoints : (M, 3) :numpy:`ndarray`
+
+        Returns
+        -------
+        omegas : (M, N) :numpy:`ndarray`
+        W : (M, N, 3) :numpy:`ndarray`
+        """
+
+        dispersion = self.dispersion
+        N = dispersion.N
+
+        E, G, status = dispersion._diagonalize(-qpoints)
+
+        # Columns N+n of G^-1 = g G^dagger g, their g-sign is dropped
+        g = np.concatenate((np.ones(N), -np.ones(N)))
+        G_inv = g[:, np.newaxis] * np.conjugate(np.transpose(G[:, N:], (0, 2, 1)))
+
+        weights = np.sqrt(dispersion._spin_norms / 2) * self._form_factor(qpoints)
+        W = np.einsum(
+            "mi,ix,min->mnx",
+            weights,
+            dispersion._u_conj,
+            G_inv[:, :N],
+            optimize=True,
+        ) + np.einsum(
+            "mi,ix,min->mnx",
+            weights,
+            dispersion.u,
+            G_inv[:, N:],
+            optimize=True,
+        )
+
+        failed = (status == COLPA_UNSTABLE) | (status == COLPA_FAILED)
+        W[failed] = 0
+
+        # Last N energies are in the ascending order, reverse them to match omegas
+        omegas = np.where(failed[:, np.newaxis], 0.0, E[:, N:])
+        return omegas[:, ::-1], W[:, ::-1]
+
+    def correlations(self, qpoints):
+        r"""
+        Correlation functions of each magnon mode.
+
+        Parameters
+        ----------
+        qpoints : (M, 3) |array-like|_
+            Scattering vectors in absolute coordinates.
+
+        Returns
+        -------
+        omegas : (N, M) :numpy:`ndarray`
+            Magnon energies.
+        correlations : (N, M, 3, 3) :numpy:`ndarray`
+            :math:`S^{\alpha\beta}_n(\boldsymbol{q})` for each mode and q point.
+            Form factor is included, polarization factor is not.
+        """
+
+        qpoints = np.array(qpoints, dtype=float).reshape((-1, 3))
+        omegas, W = self._amplitudes(qpoints)
+
+        correlations = np.conjugate(W)[..., :, np.newaxis] * W[..., np.newaxis, :]
+
+        return omegas.T, np.transpose(correlations, (1, 0, 2, 3))
+
+    def intensities(self, qpoints):
+        r"""
+        Intensities of each magnon mode.
+
+        Parameters
+        ----------
+        qpoints : (M, 3) |array-like|_
+            Scattering vectors in absolute coordinates.
+
+        Returns
+        -------
+        omegas : (N, M) :numpy:`ndarray`
+            Magnon energies.
+        intensities : (N, M) :numpy:`ndarray`
+            :math:`I_n(\boldsymbol{q})` for each mode and q point.
+        """
+
+        qpoints = np.array(qpoints, dtype=float).reshape((-1, 3))
+        omegas, W = self._amplitudes(qpoints)
+
+        intensities = np.sum(np.abs(W) ** 2, axis=2)
+
+        if self.polarization:
+            norms = np.linalg.norm(qpoints, axis=1)
+            directions = np.divide(
+                qpoints,
+                norms[:, np.newaxis],
+                out=np.zeros(qpoints.shape, dtype=float),
+                where=norms[:, np.newaxis] > 0,
+            )
+            intensities -= (
+                np.abs(np.einsum("mnx,mx->mn", W, directions, optimize=True)) ** 2
+            )
+
+        return omegas.T, intensities.T
+
+    def __call__(self, qpoints, energies, width, broadening="gaussian"):
+        r"""
+        Computes :math:`S(\boldsymbol{q}, \omega)` on the (q, :math:`\omega`) grid.
+
+        .. math::
+
+            S(\boldsymbol{q}, \omega) = \sum_nI_n(\boldsymbol{q})
+            f(\omega - \omega_n(\boldsymbol{q}))
+
+        Parameters
+        ----------
+        qpoints : (M, 3) |array-like|_
+            Scattering vectors in absolute coordinates.
+        energies : (E,) |array-like|_
+            Energy transfers.
+        width : float
+            Standard deviation of the Gaussian or half width at half maximum of
+            the Lorentzian, in the units of energy.
+        broadening : str, default "gaussian"
+            Profile :math:`f`, either "gaussian" or "lorentzian".
+
+        Returns
+        -------
+        sqw : (M, E) :numpy:`ndarray`
+            Structure factor for each q point and energy.
+        """
+
+        width = float(width)
+        if width <= 0:
+            raise ValueError(f"Width has to be positive, got {width}")
+
+        broadening = broadening.lower()
+        if broadening == "gaussian":
+
+            def profile(x):
+                return np.exp(-(x**2) / 2 / width**2) / width / np.sqrt(2 * np.pi)
+
+        elif broadening == "lorentzian":
+
+            def profile(x):
+                return width / np.pi / (x**2 + width**2)
+
+        else:
+            raise ValueError(
+                f'Broadening has to be "gaussian" or "lorentzian", got "{broadening}"'
+            )
+
+        qpoints = np.array(qpoints, dtype=float).reshape((-1, 3))
+        energies = np.array(energies, dtype=float).reshape(-1)
+
+        result = np.zeros((len(qpoints), len(energies)), dtype=float)
+
+        chunk_size = _chunking.chunk_size(self.dispersion.N * len(energies))
+
+        for start in range(0, len(qpoints), chunk_size):
+            end = start + chunk_size
+            omegas, intensities = self.intensities(qpoints[start:end])
+            result[start:end] = np.einsum(
+                "nm,nme->me",
+                intensities,
+                profile(energies - omegas[..., np.newaxis]),
+                optimize=True,
+            )
+
+        return result
@@ -0,0 +1,278 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from magnopy import _chunking
+from magnopy.magnons.diagonalization import (
+    COLPA_POSITIVE_DEFINITE,
+    COLPA_POSITIVE_SEMIDEFINITE,
+)
+from magnopy.magnons.dispersion import MagnonDispersion
+from magnopy.units.inside import ENERGY, TEMPERATURE
+from magnopy.units.si import K_BOLTZMANN
+
+__all__ = ["MagnonThermodynamics"]
+
+# Boltzmann constant in the internal units (meV / K)
+_K_B = K_BOLTZMANN * TEMPERATURE / ENERGY
+
+
+class MagnonThermodynamics:
+    r"""
+    Thermodynamics of the non-interacting magnons.
+
+    Magnon energies and transformation matrices are computed once on the regular
+    grid of k points and reused for any amount of temperatures.
+
+    Modes with zero energy (i.e. Goldstone modes) and k points, where the ground
+    state is not stable, are excluded from the sums.
+
+    Parameters
+    ----------
+    dispersion : :py:class:`.MagnonDispersion`
+        Magnon dispersion.
+    n1 : int
+        Amount of points along the first reciprocal lattice vector.
+    n2 : int
+        Amount of points along the second reciprocal lattice vector.
+    n3 : int
+        Amount of points along the third reciprocal lattice vector.
+    shift : (3,) |array-like|_, default (0, 0, 0)
+        Shift of the grid in the units of the grid step. See :py:class:`.KGrid`.
+    symmetry : bool, default False
+        Whether to compute only the irreducible k points. Symmetry operations are
+        the ones of the magnon Hamiltonian (see
+        :py:meth:`.MagnonDispersion.symmetry_operations`), they map h(k) onto
+        h(kW) up to the permutation of the atoms. Therefore, the energies and the
+        total magnetization are exact, but for the atoms, that are permuted by the
+        operations (i.e. equivalent by symmetry), only the average of their
+        magnetizations is exact (the exact values are equal). Use
+        ``symmetry=False`` if the magnetization of each atom is needed.
+    tolerance : float, default 1e-8
+        Modes with energies below ``tolerance`` are treated as zero modes.
+
+    Attributes
+    ----------
+    grid : :py:class:`.KGrid`
+        Grid of k points.
+    omegas : (K, 2N) :numpy:`ndarray`
+        Energies of the modes at the irreducible k points. First :math:`N` are the
+        energies at :math:`\boldsymbol{k}`, last :math:`N` - at
+        :math:`-\boldsymbol{k}`.
+    """
+
+    def __init__(
+        self,
+        dispersion: MagnonDispersion,
+        n1,
+        n2,
+        n3,
+        shift=(0, 0, 0),
+        symmetry=False,
+        tolerance=1e-8,
+    ):
+        self.grid = dispersion.grid(n1, n2, n3, shift=shift, symmetry=symmetry)
+        self.N = dispersion.N
+
+        E, G, status = dispersion._diagonalize(self.grid.irreducible)
+
+        stable = (status == COLPA_POSITIVE_DEFINITE) | (
+            status == COLPA_POSITIVE_SEMIDEFINITE
+        )
+        self.omegas = np.where(stable[:, np.newaxis], E, 0.0)
+
+        # Weight of each mode, zero for the excluded ones
+        self._weights = np.where(
+            self.omegas > tolerance, self.grid.weights[:, np.newaxis], 0.0
+        )
+
+        # a = G^-1 c, G^-1 = g G^dagger g
+        g = np.concatenate((np.ones(self.N), -np.ones(self.N)))
+        G_inv = g[:, np.newaxis] * np.conjugate(np.transpose(G, (0, 2, 1))) * g
+
+        # |G^-1_{im}|^2 for the atoms i, shape (K, 2N, N)
+        self._occupations = np.transpose(np.abs(G_inv[:, : self.N]) ** 2, (0, 2, 1))
+        self._occupations *= stable[:, np.newaxis, np.newaxis]
+
+        # <b b^dagger> = n + 1 for the last N modes
+        self._zero_point = np.einsum(
+            "k,kmi->i",
+            self.grid.weights,
+            self._occupations[:, self.N :],
+        )
+
+    def compute(self, temperatures):
+        r"""
+        Computes all thermodynamic quantities in one pass.
+
+        Parameters
+        ----------
+        temperatures : (T,) |array-like|_
+            Temperatures, in Kelvin.
+
+        Returns
+        -------
+        internal_energy : (T,) :numpy:`ndarray`
+            See :py:meth:`.MagnonThermodynamics.internal_energy`.
+        free_energy : (T,) :numpy:`ndarray`
+            See :py:meth:`.MagnonThermodynamics.free_energy`.
+        specific_heat : (T,) :numpy:`ndarray`
+            See :py:meth:`.MagnonThermodynamics.specific_heat`.
+        magnetization_reduction : (T, N) :numpy:`ndarray`
+            See :py:meth:`.MagnonThermodynamics.magnetization_reduction`.
+        """
+
+        temperatures = np.array(temperatures, dtype=float).reshape(-1)
+        if np.any(temperatures < 0):
+            raise ValueError(
+                f"Temperatures have to be non-negative, got {temperatures.min()}"
+            )
+
+        internal_energy = np.zeros(temperatures.shape, dtype=float)
+        free_energy = np.zeros(temperatures.shape, dtype=float)
+        specific_heat = np.zeros(temperatures.shape, dtype=float)
+        thermal_reduction = np.zeros((len(temperatures), self.N), dtype=float)
+
+        # Zero temperature does not contribute
+        positive = temperatures > 0
+        kT = _K_B * temperatures[positive]
+
+        # Flatten the modes: energies only from the first N, spins from all 2N
+        omegas = self.omegas.reshape(-1)
+        weights = self._weights.reshape(-1)
+        is_upper = np.tile(np.arange(2 * self.N) < self.N, len(self.omegas))
+        occupations = self._occupations.reshape((-1, self.N))
+
+        chunk_size = _chunking.chunk_size(len(kT))
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            for start in range(0, len(omegas), chunk_size):
+                end = start + chunk_size
+                nonzero = weights[start:end] != 0
+                omega = omegas[start:end][nonzero, np.newaxis]
+                weight = weights[start:end][nonzero]
+                upper = weight * is_upper[start:end][nonzero]
+
+                x = omega / kT
+                # Bose-Einstein distribution
+                n = 1 / np.expm1(x)
+
+                internal_energy[positive] += upper @ (omega * n)
+                free_energy[positive] += upper @ np.log(-np.expm1(-x)) * kT
+                specific_heat[positive] += (
+                    upper @ np.nan_to_num(x**2 * n * (n + 1), nan=0.0) * _K_B
+                )
+                thermal_reduction[positive] += n.T @ (
+                    weight[:, np.newaxis] * occupations[start:end][nonzero]
+                )
+
+        return (
+            internal_energy,
+            free_energy,
+            specific_heat,
+            thermal_reduction + self._zero_point,
+        )
+
+    def internal_energy(self, temperatures):
+        r"""
+        Internal energy of magnons per unit cell.
+
+        .. math::
+
+            U(T) = \dfrac{1}{M}\sum_{\boldsymbol{k}, n}\omega_n(\boldsymbol{k})n_B(\omega_n(\boldsymbol{k}), T)
+
+        Parameters
+        ----------
+        temperatures : (T,) |array-like|_
+            Temperatures, in Kelvin.
+
+        Returns
+        -------
+        internal_energy : (T,) :numpy:`ndarray`
+            In meV.
+        """
+
+        return self.compute(temperatures)[0]
+
+    def free_energy(self, temperatures):
+        r"""
+        Free energy of magnons per unit cell.
+
+        .. math::
+
+            F(T) = \dfrac{k_BT}{M}\sum_{\boldsymbol{k}, n}\ln\left(1 - e^{-\omega_n(\boldsymbol{k})/k_BT}\right)
+
+        Parameters
+        ----------
+        temperatures : (T,) |array-like|_
+            Temperatures, in Kelvin.
+
+        Returns
+        -------
+        free_energy : (T,) :numpy:`ndarray`
+            In meV.
+        """
+
+        return self.compute(temperatures)[1]
+
+    def specific_heat(self, temperatures):
+        r"""
+        Specific heat of magnons per unit cell.
+
+        .. math::
+
+            C(T) = \dfrac{k_B}{M}\sum_{\boldsymbol{k}, n}x^2n_B(n_B + 1),
+            \quad x = \dfrac{\omega_n(\boldsymbol{k})}{k_BT}
+
+        Parameters
+        ----------
+        temperatures : (T,) |array-like|_
+            Temperatures, in Kelvin.
+
+        Returns
+        -------
+        specific_heat : (T,) :numpy:`ndarray`
+            In meV / Kelvin.
+        """
+
+        return self.compute(temperatures)[2]
+
+    def magnetization_reduction(self, temperatures):
+        r"""
+        Spin-wave reduction of the spin of each atom.
+
+        .. math::
+
+            \Delta S_i(T) = \dfrac{1}{M}\sum_{\boldsymbol{k}}
+            \langle a_i^{\dagger}(\boldsymbol{k})a_i(\boldsymbol{k})\rangle
+
+        It includes the zero-point reduction, which is present in the
+        non-collinear and antiferromagnetic states at zero temperature.
+
+        Parameters
+        ----------
+        temperatures : (T,) |array-like|_
+            Temperatures, in Kelvin.
+
+        Returns
+        -------
+        reduction : (T, N) :numpy:`ndarray`
+            Reduction of the spin length of each atom.
+        """
+
+        return self.compute(temperatures)[3]
@@ -20,7 +20,6 @@ import logging
 import os
 from argparse import ArgumentParser
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from magnopy._osfix import _winwait
@@ -42,6 +41,8 @@ def manager(
     interactive=False,
     verbose=False,
     join_output=False,
+    connect_bands=False,
+    adaptive_points=None,
 ):
     head, _ = os.path.split(spinham)
     out_head, out_tail = os.path.split(output_seedname)
@@ -90,9 +91,24 @@ def manager(
     # Get the magnon dispersion
     dispersion = MagnonDispersion(spinham)
 
+    # Imported here, so the parser of the script does not load matplotlib
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
 
-    omegas = dispersion(kp)
+    if adaptive_points is not None:
+        flatten_points, points, omegas = dispersion.adaptive_path(
+            kp, max_points=adaptive_points
+        )
+        if connect_bands:
+            omegas = np.take_along_axis(
+                omegas, dispersion.connect_bands(points), axis=0
+            )
+    else:
+        flatten_points = kp.flatten_points()
+        points = kp.points()
+        omegas = dispersion(kp, connect_bands=connect_bands)
+    relative_points = points @ np.linalg.inv(np.array([kp.b1, kp.b2, kp.b3]))
 
     ax.set_xticks(kp.ticks(), kp.labels, fontsize=15)
     ax.set_ylabel("E, meV", fontsize=15)
@@ -109,10 +125,10 @@ def manager(
     colors = ["#174FD5", "#F8AB00", "#0CE1A2", "#FF003C", "#46EC00", "#9823C9"]
     i = 0
     for omega in omegas:
-        ax.plot(kp.flatten_points(), omega, color=colors[i % len(colors)])
+        ax.plot(flatten_points, omega, color=colors[i % len(colors)])
         i += 1
 
-    ax.set_xlim(kp.flatten_points()[0], kp.flatten_points()[-1])
+    ax.set_xlim(flatten_points[0], flatten_points[-1])
 
     if save_txt:
         main_separator = "=" * 80 + "\n"
@@ -181,10 +197,10 @@ def manager(
             filename,
             np.concatenate(
                 (
-                    [kp.flatten_points()],
+                    [flatten_points],
                     omegas,
-                    kp.points(relative=True).T,
-                    kp.points(relative=False).T,
+                    relative_points.T,
+                    points.T,
                 ),
                 axis=0,
             ).T,
@@ -278,6 +294,22 @@ def create_parser():
         action="store_true",
         help="Whether to join the output files into a single file.",
     )
+    parser.add_argument(
+        "-cb",
+        "--connect-bands",
+        default=False,
+        action="store_true",
+        help="Whether to order the bands by their connectivity along the path "
+        "instead of by energy.",
+    )
+    parser.add_argument(
+        "-ap",
+        "--adaptive-points",
+        default=None,
+        type=int,
+        help="Maximum amount of k points for the adaptive sampling of the path. "
+        "By default the points are equidistant.",
+    )
 
     return parser
 
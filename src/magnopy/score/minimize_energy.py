@@ -25,11 +25,44 @@ from magnopy._osfix import _winwait
 from magnopy._pinfo import logo
 from magnopy.io import load_spinham
 from magnopy.spinham.energy import Energy
+from magnopy.spinham.luttinger_tisza import LuttingerTisza
 
 _logger = logging.getLogger(__name__)
 
 
-def _minimize_ferro(energy: Energy, spinham, seedname, output_file):
+def _predict(spinham, output_file):
+    output_file.write(
+        "Start to predict the ground state type with Luttinger-Tisza method.\n"
+    )
+    case, energy, spin_orientation, cone_axis, spiral_vector, exact = LuttingerTisza(
+        spinham
+    ).solve()
+    output_file.write(
+        f"Predicted ground state type is: {case}\n"
+        f"Lower bound of the energy is: {energy:.8f}\n"
+        f"Spiral vector is: {spiral_vector[0]:.8f} {spiral_vector[1]:.8f} "
+        f"{spiral_vector[2]:.8f}\n"
+    )
+    if exact:
+        output_file.write("Strong constraint is satisfied, the prediction is exact.\n")
+    else:
+        output_file.write(
+            "Strong constraint is not satisfied, all ground state types are "
+            "minimized. The prediction is used as the initial guess for the "
+            "predicted one.\n"
+        )
+
+    if case == "ferro":
+        initial_guess = spin_orientation
+    elif case == "antiferro":
+        initial_guess = (spin_orientation, cone_axis)
+    else:
+        initial_guess = (spin_orientation, cone_axis, spiral_vector)
+
+    return case, initial_guess, spiral_vector, exact
+
+
+def _minimize_ferro(energy: Energy, spinham, seedname, output_file, initial_guess=None):
     output_file.write(
         f"Start to minimize assuming ferromagnetic ground state type.\n"
         f"History of the minimization is written in the file\n"
@@ -37,6 +70,7 @@ def _minimize_ferro(energy: Energy, spinham, seedname, output_file):
     )
     spin_orientation = energy.optimize(
         case="ferro",
+        initial_guess=initial_guess,
         save_history=True,
         history_filename=f"{seedname}-ferro-history",
     )[0]
@@ -58,44 +92,55 @@ def _minimize_ferro(energy: Energy, spinham, seedname, output_file):
     return energy.ferro(spin_orientation)
 
 
-def _minimize_antiferro(energy: Energy, spinham, seedname, output_file):
+def _minimize_antiferro(
+    energy: Energy,
+    spinham,
+    seedname,
+    output_file,
+    initial_guess=None,
+    antiferro_qs=None,
+):
+    if antiferro_qs is None:
+        qrels = (np.indices((3, 3, 3)) - 1).transpose((1, 2, 3, 0)).reshape(27, 3)
+        antiferro_qs = [
+            qrel @ spinham.reciprocal_cell / 2 for qrel in qrels if (qrel != 0).any()
+        ]
+
     output_file.write(
         f"Start to minimize assuming antiferromagnetic ground state type.\n"
-        f"History of the minimization is written in the 26 files\n"
+        f"History of the minimization is written in the {len(antiferro_qs)} files\n"
     )
 
     i = 0
     energies = []
-    for qrel in (np.indices((3, 3, 3)) - 1).transpose((1, 2, 3, 0)).reshape(27, 3):
+    for q in antiferro_qs:
         i += 1
-        print(qrel)
         history_file = f"{seedname}-antiferro-history-{i}"
-        if (qrel == [0, 0, 0]).all():
-            continue
-
-        q = qrel @ spinham.reciprocal_cell / 2
+        qrel = 2 * q @ np.linalg.inv(spinham.reciprocal_cell)
         output_file.write(
             f"History for the q_rel = ({qrel[0]:2.0f}, {qrel[1]:2.0f}, {qrel[2]:2.0f}) "
-            f"is written to the file {history_file}"
+            f"is written to the file {history_file}\n"
         )
 
         spin_orientation, cone_axis, _ = energy.optimize(
             case="antiferro",
+            initial_guess=initial_guess,
             save_history=True,
             history_filename=history_file,
             antiferro_q=q,
         )
         output_file.write(
-            f"Minimization for the antiferro case is done {i} out of 26.\n"
+            f"Minimization for the antiferro case is done {i} out of "
+            f"{len(antiferro_qs)}.\n"
             "Spin orientations in the minimum configuration:\n"
         )
         output_file.write(
             f"  {'name':>5} {'r1':>11} {'r2':>11} {'r3':>11} {'sx':>11} {'sy':>11} {'sz':>11}\n"
         )
-        for i, spin in enumerate(spin_orientation):
-            pos = spinham.magnetic_atoms[i].position
+        for j, spin in enumerate(spin_orientation):
+            pos = spinham.magnetic_atoms[j].position
             output_file.write(
-                f"  {spinham.magnetic_atoms[i].name:>5} "
+                f"  {spinham.magnetic_atoms[j].name:>5} "
                 f"{pos[0]:11.8f} {pos[1]:11.8f} {pos[2]:11.8f} "
                 f"{spin[0]:11.8f} {spin[1]:11.8f} {spin[2]:11.8f}\n"
             )
@@ -109,7 +154,9 @@ def _minimize_antiferro(energy: Energy, spinham, seedname, output_file):
     return energies
 
 
-def _minimize_spiral(energy: Energy, spinham, seedname, output_file):
+def _minimize_spiral(
+    energy: Energy, spinham, seedname, output_file, initial_guess=None
+):
     output_file.write(
         f"Start to minimize assuming spiral ground state type.\n"
         f"History of the minimization is written in the file\n"
@@ -118,6 +165,7 @@ def _minimize_spiral(energy: Energy, spinham, seedname, output_file):
 
     spin_orientation, cone_axis, spiral_vector = energy.optimize(
         case="spiral",
+        initial_guess=initial_guess,
         save_history=True,
         history_filename=f"{seedname}-spiral-history",
     )
@@ -168,8 +216,26 @@ def manager(
         energy.magnetic_field = magnetic_field
 
     # Decide which ground state types to minimize
-    if "all" in ground_state_type:
+    initial_guesses = {}
+    antiferro_qs = None
+    if ground_state_type is None or "all" in ground_state_type:
+        gs_to_minimize = ["ferro", "antiferro", "spiral"]
+    elif "auto" in ground_state_type and magnetic_field is not None:
+        output_file.write(
+            "Luttinger-Tisza method does not account for the magnetic field, "
+            "all ground state types are minimized.\n"
+        )
         gs_to_minimize = ["ferro", "antiferro", "spiral"]
+    elif "auto" in ground_state_type:
+        case, initial_guess, spiral_vector, exact = _predict(spinham, output_file)
+        initial_guesses[case] = initial_guess
+        if exact:
+            # Go directly to the ground state type predicted by Luttinger-Tisza
+            gs_to_minimize = [case]
+            if case == "antiferro":
+                antiferro_qs = [spiral_vector]
+        else:
+            gs_to_minimize = ["ferro", "antiferro", "spiral"]
     else:
         gs_to_minimize = ground_state_type
 
@@ -182,6 +248,7 @@ def manager(
                     spinham=spinham,
                     seedname=output_seedname,
                     output_file=output_file,
+                    initial_guess=initial_guesses.get("ferro"),
                 )
             )
         elif gs == "antiferro":
@@ -191,6 +258,8 @@ def manager(
                     spinham=spinham,
                     seedname=output_seedname,
                     output_file=output_file,
+                    initial_guess=initial_guesses.get("antiferro"),
+                    antiferro_qs=antiferro_qs,
                 )
             )
         elif gs == "spiral":
@@ -200,6 +269,7 @@ def manager(
                     spinham=spinham,
                     seedname=output_seedname,
                     output_file=output_file,
+                    initial_guess=initial_guesses.get("spiral"),
                 )
             )
 
@@ -209,8 +279,8 @@ def manager(
             output_file.write(f"Ferromagnetic energy : {energies[i]:.8f}\n")
         if gs_to_minimize[i] == "antiferro":
             output_file.write(f"Antiferromagnetic energies :\n")
-            for i in range(26):
-                output_file.write(f"  {i+1} {energies[i]:.8f}\n")
+            for j in range(len(energies[i])):
+                output_file.write(f"  {j+1} {energies[i][j]:.8f}\n")
         if gs_to_minimize[i] == "spiral":
             output_file.write(f"Spiral energy : {energies[i]:.8f}\n")
 
@@ -238,9 +308,13 @@ def create_parser():
         "--ground-state-type",
         nargs="*",
         type=str,
-        choices=["all", "ferro", "antiferro", "spiral"],
+        choices=["auto", "all", "ferro", "antiferro", "spiral"],
         default="all",
-        help="Type of the ground state to be assumed for the minimization.",
+        help="Type of the ground state to be assumed for the minimization. "
+        "'all' minimizes every type. 'auto' predicts the type with "
+        "Luttinger-Tisza method and minimizes only the predicted one if the "
+        "prediction is exact. If it is not exact or the magnetic field is given, "
+        "then 'auto' falls back to 'all'.",
     )
     parser.add_argument(
         "-mf",
@@ -18,9 +18,11 @@
 
 from .energy import *
 from .hamiltonian import *
+from .luttinger_tisza import *
 from .parameter import *
 
 __all__ = []
 __all__.extend(hamiltonian.__all__)
 __all__.extend(parameter.__all__)
 __all__.extend(energy.__all__)
+__all__.extend(luttinger_tisza.__all__)
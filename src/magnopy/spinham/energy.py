@@ -22,6 +22,7 @@ from typing import Iterable, Tuple
 import numpy as np
 from wulfric import TORADIANS, absolute_to_relative
 
+from magnopy import _chunking, _numba
 from magnopy.spinham.hamiltonian import SpinHamiltonian
 from magnopy.units.inside import ENERGY
 from magnopy.units.si import BOHR_MAGNETON
@@ -33,6 +34,10 @@ __all__ = ["Energy"]
 # Convert to the internal units of energy
 BOHR_MAGNETON /= ENERGY
 
+# Default size of the mesh of spiral vectors, that is used for the initial guess of
+# the spiral case.
+_SPIRAL_MESH = (12, 12, 12)
+
 ################################################################################
 #                  Functions that check or make initial guess                  #
 #                                                                              #
@@ -305,7 +310,8 @@ def _update_x_spiral(x, search_direction, step=1):
             + (1 - np.cos(theta)) * r * (r @ x_0[i])
         )
 
-    x_1 += search_direction[-3:] * step
+    # Spins are rotated against the search direction, so is the spiral vector
+    x_1 -= search_direction[-3:] * step
 
     return [x_0, x_1]
 
@@ -522,6 +528,159 @@ def _default_history_processor_spiral(history, filename=None, nspins=None):
                 file.write("\n" + "\n".join(history))
 
 
+################################################################################
+#                  Terms of the exchange matrix of the cone states             #
+################################################################################
+# Cross product matrices of the Cartesian unit vectors, i.e. derivatives of K with
+# respect to the components of the cone axis: _CROSS[a] @ v = e_a x v
+_CROSS = np.array(
+    [
+        [[0, 0, 0], [0, 0, -1], [0, 1, 0]],
+        [[0, 0, 1], [0, 0, 0], [-1, 0, 0]],
+        [[0, -1, 0], [1, 0, 0], [0, 0, 0]],
+    ],
+    dtype=float,
+)
+
+
+def _cone_matrices(cone_axis):
+    r"""
+    Matrices of the cone axis.
+
+    Parameters
+    ----------
+    cone_axis : (3,) :numpy:`ndarray`
+        Cone axis :math:`\boldsymbol{n}`.
+
+    Returns
+    -------
+    K : (3, 3) :numpy:`ndarray`
+        Cross product matrix :math:`K\boldsymbol{v} = \boldsymbol{n}\times\boldsymbol{v}`.
+    K_sq : (3, 3) :numpy:`ndarray`
+        :math:`K^2`.
+    IK_sq : (3, 3) :numpy:`ndarray`
+        :math:`I + K^2`.
+    dK : (3, 3, 3) :numpy:`ndarray`
+        Derivatives of :math:`K` with respect to :math:`n_{\alpha}`, first index is
+        :math:`\alpha`.
+    dK_sq : (3, 3, 3) :numpy:`ndarray`
+        Derivatives of :math:`K^2` (and of :math:`I + K^2`) with respect to
+        :math:`n_{\alpha}`, first index is :math:`\alpha`.
+    """
+
+    K = np.einsum("a,axy->xy", cone_axis, _CROSS)
+    K_sq = K @ K
+    dK_sq = _CROSS @ K + K @ _CROSS
+
+    return K, K_sq, np.eye(3, dtype=float) + K_sq, _CROSS, dK_sq
+
+
+def _antiferro_terms(K, K_sq, IK_sq):
+    r"""
+    Terms of the exchange matrix of the antiferro cone state in the form of
+    :py:meth:`.Energy._bond_sum`.
+
+    .. math::
+
+        \boldsymbol{C}_{\boldsymbol{d}} =
+        (I + K^2)J(I + K^2)
+        + K^2JK^2\cos(\boldsymbol{q}\boldsymbol{d})
+        - K^2JK\sin(\boldsymbol{q}\boldsymbol{d})
+
+    Returns
+    -------
+    left : (3, 3, 3) list
+    right : (3, 3, 3) list
+    coefficients : (3, 3) list
+    """
+
+    return (
+        [IK_sq, K_sq, K_sq],
+        [IK_sq, K_sq, K],
+        [[1, 0, 0], [0, 1, 0], [0, 0, -1]],
+    )
+
+
+def _spiral_terms(K, K_sq, IK_sq):
+    r"""
+    Terms of the exchange matrix of the spiral cone state in the form of
+    :py:meth:`.Energy._bond_sum`.
+
+    .. math::
+
+        \boldsymbol{C}_{\boldsymbol{d}} =
+        (I + K^2)J(I + K^2)
+        - \dfrac{KJK - K^2JK^2}{2}\cos(\boldsymbol{q}\boldsymbol{d})
+        - \dfrac{KJK^2 + K^2JK}{2}\sin(\boldsymbol{q}\boldsymbol{d})
+
+    Returns
+    -------
+    left : (5, 3, 3) list
+    right : (5, 3, 3) list
+    coefficients : (5, 3) list
+    """
+
+    return (
+        [IK_sq, K, K_sq, K, K_sq],
+        [IK_sq, K, K_sq, K_sq, K],
+        [[1, 0, 0], [0, -0.5, 0], [0, 0.5, 0], [0, 0, -0.5], [0, 0, -0.5]],
+    )
+
+
+def _fill_torques(spin_orientation, spin_gradient, gradient_vector, torques):
+    r"""
+    Fills the torques on the spins and the corresponding part of the gradient vector
+    in place.
+
+    Parameters
+    ----------
+    spin_orientation : (I, 3) :numpy:`ndarray`
+        Orientation of the spin vectors.
+    spin_gradient : (I, 3) :numpy:`ndarray`
+        Derivatives of the energy with respect to the components of the spin
+        orientations.
+    gradient_vector : (M,) :numpy:`ndarray`
+        First 3I elements are filled as [ t_0z, -t_0y, t_0x, ... ].
+    torques : (I, 3) or (I+1, 3) :numpy:`ndarray`
+        First I rows are filled.
+    """
+
+    I = len(spin_orientation)
+    t = np.cross(spin_orientation, spin_gradient)
+    torques[:I] = t
+    gradient_vector[0 : 3 * I : 3] = t[:, 2]
+    gradient_vector[1 : 3 * I : 3] = -t[:, 1]
+    gradient_vector[2 : 3 * I : 3] = t[:, 0]
+
+
+def _antiferro_terms_derivatives(dK, dK_sq):
+    r"""
+    Derivatives of the terms of :py:func:`._antiferro_terms` with respect to the
+    components of the cone axis.
+
+    Returns
+    -------
+    left : (3, 3, 3, 3) list
+    right : (3, 3, 3, 3) list
+    """
+
+    return [dK_sq, dK_sq, dK_sq], [dK_sq, dK_sq, dK]
+
+
+def _spiral_terms_derivatives(dK, dK_sq):
+    r"""
+    Derivatives of the terms of :py:func:`._spiral_terms` with respect to the
+    components of the cone axis.
+
+    Returns
+    -------
+    left : (5, 3, 3, 3) list
+    right : (5, 3, 3, 3) list
+    """
+
+    return [dK_sq, dK, dK_sq, dK, dK_sq], [dK_sq, dK, dK_sq, dK_sq, dK]
+
+
 ################################################################################
 #                                 Energy class                                 #
 #                                                                              #
@@ -561,20 +720,43 @@ class Energy:
         previous_dc = spinham.double_counting
         spinham.double_counting = True
 
-        # Get all bonds of the Hamiltonian.
-        self._bonds = []
-        for atom1, atom2, R, J in spinham.exchange_like:
-            i = self._atom_indices[atom1]
-            j = self._atom_indices[atom2]
-            d = R @ spinham.cell
-            self._bonds.append([i, j, d, J])
-
-        # Return original noatation of SpinHamiltonian
+        # Freeze all bonds of the Hamiltonian into the stacked arrays
+        n_bonds = len(spinham.exchange_like)
+        self._indices_i = np.zeros(n_bonds, dtype=int)
+        self._indices_j = np.zeros(n_bonds, dtype=int)
+        self._dis_vectors = np.zeros((n_bonds, 3), dtype=float)
+        self._J_matrices = np.zeros((n_bonds, 3, 3), dtype=float)
+        for index, (atom1, atom2, R, J) in enumerate(spinham.exchange_like):
+            self._indices_i[index] = self._atom_indices[atom1]
+            self._indices_j[index] = self._atom_indices[atom2]
+            self._dis_vectors[index] = R @ spinham.cell
+            self._J_matrices[index] = J.matrix
+
+        # Return original notation of SpinHamiltonian
         spinham.double_counting = previous_dc
 
+        # For the default mesh of the spiral vectors
+        self._reciprocal_cell = np.array(spinham.reciprocal_cell, dtype=float)
+
+        # Group bonds by the pair of atoms (i, j) for the sums over the pairs
+        n_spins = len(self._spins)
+        pairs = self._indices_i * n_spins + self._indices_j
+        order = np.argsort(pairs, kind="stable")
+        self._indices_i = self._indices_i[order]
+        self._indices_j = self._indices_j[order]
+        self._dis_vectors = self._dis_vectors[order]
+        self._J_matrices = self._J_matrices[order]
+        _, self._pair_offsets = np.unique(pairs[order], return_index=True)
+
+        # factor * S_i * S_j for each bond
+        self._update_spin_products()
+
         # Minimisation settings, exposed to public as properties
         self._m = 10
 
+        # Gradients by finite differences, for verification only
+        self._numerical_gradient = False
+
         # Parameters for Wolfe conditions
         self._wolfe_iter_max = 10000
         self._wolfe_c1 = 1e-4
@@ -686,6 +868,37 @@ class Energy:
             )
         self._wolfe_c2 = new_c2
 
+    @property
+    def numerical_gradient(self) -> bool:
+        r"""
+        Whether to compute the torques by central finite differences of the energy.
+
+        By default (``False``) the torques are computed analytically from
+
+        .. math::
+
+            \dfrac{\partial E}{\partial\boldsymbol{s}_i}
+            =
+            \sum_{j,\boldsymbol{d}}S_iS_j\boldsymbol{C}_{\boldsymbol{d}ij}\boldsymbol{s}_j
+            +
+            \sum_{j,\boldsymbol{d}}S_jS_i\boldsymbol{C}_{\boldsymbol{d}ji}^T\boldsymbol{s}_j
+
+        and from the derivatives of :math:`\boldsymbol{C}_{\boldsymbol{d}ij}` with
+        respect to the cone axis. Finite differences require six evaluations of the
+        energy per spin and are meant for the verification of the analytic
+        implementation.
+
+        Returns
+        -------
+        numerical_gradient : bool
+        """
+
+        return self._numerical_gradient
+
+    @numerical_gradient.setter
+    def numerical_gradient(self, new_value):
+        self._numerical_gradient = bool(new_value)
+
     ################################################################################
     #                         External physical conditions                         #
     ################################################################################
@@ -784,6 +997,102 @@ class Energy:
                     f"One of the new spins (index {i}) is not " f"an integer:{spin}."
                 )
         self._spins = new_value
+        self._update_spin_products()
+
+    def _update_spin_products(self):
+        # Prefactors of the bonds, have to be updated if the spins are changed
+        spins = np.array(self._spins, dtype=float)
+        self._spin_products = (
+            self._factor * spins[self._indices_i] * spins[self._indices_j]
+        )
+        # Sum of the weighted exchange matrices over the bonds of each pair
+        self._pair_sum = self._fourier_sums(np.zeros((1, 3), dtype=float))[0][0]
+
+    def _fourier_sums(self, spiral_vectors):
+        r"""
+        Sums of the weighted exchange matrices over the bonds of each pair of atoms
+
+        .. math::
+
+            \boldsymbol{J}^c_{ij}(\boldsymbol{q}) =
+            \sum_{\boldsymbol{d}}S_iS_j\boldsymbol{J}_{\boldsymbol{d}ij}
+            \cos(\boldsymbol{q}\boldsymbol{d})
+            \qquad
+            \boldsymbol{J}^s_{ij}(\boldsymbol{q}) =
+            \sum_{\boldsymbol{d}}S_iS_j\boldsymbol{J}_{\boldsymbol{d}ij}
+            \sin(\boldsymbol{q}\boldsymbol{d})
+
+        (including the exchange factor).
+
+        Parameters
+        ----------
+        spiral_vectors : (M, 3) :numpy:`ndarray`
+            Spiral vectors :math:`\boldsymbol{q}`.
+
+        Returns
+        -------
+        cos_sums : (M, I, I, 3, 3) :numpy:`ndarray`
+        sin_sums : (M, I, I, 3, 3) :numpy:`ndarray`
+        """
+
+        I = len(self._spins)
+        M = len(spiral_vectors)
+        cos_sums = np.zeros((M, I, I, 3, 3), dtype=float)
+        sin_sums = np.zeros((M, I, I, 3, 3), dtype=float)
+
+        if len(self._J_matrices) == 0:
+            return cos_sums, sin_sums
+
+        weighted = (
+            self._spin_products[:, np.newaxis, np.newaxis] * self._J_matrices
+        ).reshape((-1, 9))
+        segments = np.append(self._pair_offsets, len(weighted))
+
+        # Split spiral vectors in chunks to keep the (M, B) phases of reasonable size
+        chunk_size = _chunking.chunk_size(len(weighted))
+        for start in range(0, M, chunk_size):
+            end = start + chunk_size
+            phases = spiral_vectors[start:end] @ self._dis_vectors.T
+            cos = np.cos(phases)
+            sin = np.sin(phases)
+            for p in range(len(self._pair_offsets)):
+                segment = slice(segments[p], segments[p + 1])
+                i = self._indices_i[segments[p]]
+                j = self._indices_j[segments[p]]
+                cos_sums[start:end, i, j] = (
+                    cos[:, segment] @ weighted[segment]
+                ).reshape((-1, 3, 3))
+                sin_sums[start:end, i, j] = (
+                    sin[:, segment] @ weighted[segment]
+                ).reshape((-1, 3, 3))
+
+        return cos_sums, sin_sums
+
+    def _lower_bound_matrices(self, spiral_vectors):
+        r"""
+        Hermitian matrices of the Luttinger-Tisza method.
+
+        .. math::
+
+            \boldsymbol{J}_{ij}(\boldsymbol{q}) =
+            \boldsymbol{J}^c_{ij}(\boldsymbol{q}) + i\boldsymbol{J}^s_{ij}(\boldsymbol{q})
+
+        Parameters
+        ----------
+        spiral_vectors : (M, 3) :numpy:`ndarray`
+            Spiral vectors :math:`\boldsymbol{q}`.
+
+        Returns
+        -------
+        J : (M, 3I, 3I) :numpy:`ndarray`
+            The element :math:`(3i + \alpha, 3j + \beta)` is
+            :math:`J_{ij}^{\alpha\beta}(\boldsymbol{q})`.
+        """
+
+        I = len(self._spins)
+        cos_sums, sin_sums = self._fourier_sums(spiral_vectors)
+        matrices = (cos_sums + 1j * sin_sums).transpose((0, 1, 3, 2, 4))
+        return matrices.reshape((-1, 3 * I, 3 * I))
 
     ################################################################################
     #                              Gradients of energy                             #
@@ -795,7 +1104,288 @@ class Energy:
     # intact.                                                                      #
     ################################################################################
 
+    def _bond_gradients(
+        self,
+        spin_orientation,
+        left,
+        right,
+        coefficients,
+        left_derivatives=None,
+        right_derivatives=None,
+        spiral_vector=None,
+    ):
+        r"""
+        Analytic derivatives of the exchange and single-ion-like anisotropy energy.
+
+        Exchange matrix of each bond is written as (see
+        :py:meth:`.Energy._bond_sum`)
+
+        .. math::
+
+            \boldsymbol{C}_b = \sum_{t}\left(c_t^0 + c_t^c\cos(\boldsymbol{q}\boldsymbol{d}_b)
+            + c_t^s\sin(\boldsymbol{q}\boldsymbol{d}_b)\right)
+            \boldsymbol{L}_t\boldsymbol{J}_b\boldsymbol{R}_t
+
+        Parameters
+        ----------
+        spin_orientation : (I, 3) :numpy:`ndarray`
+            Normalized orientation of the spin vectors.
+        left : (T, 3, 3) |array-like|_
+            Matrices :math:`\boldsymbol{L}_t`.
+        right : (T, 3, 3) |array-like|_
+            Matrices :math:`\boldsymbol{R}_t`.
+        coefficients : (T, 3) |array-like|_
+            Coefficients :math:`(c_t^0, c_t^c, c_t^s)`.
+        left_derivatives : (T, 3, 3, 3) |array-like|_, optional
+            Derivatives of :math:`\boldsymbol{L}_t` with respect to the components
+            of the cone axis.
+        right_derivatives : (T, 3, 3, 3) |array-like|_, optional
+            Derivatives of :math:`\boldsymbol{R}_t` with respect to the components
+            of the cone axis.
+        spiral_vector : (3,) :numpy:`ndarray`, optional
+            Spiral vector :math:`\boldsymbol{q}`.
+
+        Returns
+        -------
+        spin_gradient : (I, 3) :numpy:`ndarray`
+            Derivatives with respect to the components of each spin orientation.
+        cone_gradient : (3,) :numpy:`ndarray`
+            Derivative with respect to the cone axis. Zero if the derivatives of the
+            terms are not given.
+        spiral_gradient : (3,) :numpy:`ndarray`
+            Derivative with respect to the spiral vector.
+        """
+
+        left = np.array(left, dtype=float)
+        right = np.array(right, dtype=float)
+        coefficients = np.array(coefficients, dtype=float)
+        if spiral_vector is None:
+            spiral_vector = np.zeros(3, dtype=float)
+
+        weights = self._spin_products
+
+        # (B, T) prefactors of each term and their derivatives over q d
+        phases = self._dis_vectors @ spiral_vector
+        cos = np.cos(phases)[:, np.newaxis]
+        sin = np.sin(phases)[:, np.newaxis]
+        factors = weights[:, np.newaxis] * (
+            coefficients[:, 0] + coefficients[:, 1] * cos + coefficients[:, 2] * sin
+        )
+        phase_factors = weights[:, np.newaxis] * (
+            coefficients[:, 2] * cos - coefficients[:, 1] * sin
+        )
+
+        s_i = spin_orientation[self._indices_i]
+        s_j = spin_orientation[self._indices_j]
+        # s_i^T L_t and R_t s_j for each bond, (T, B, 3)
+        l_i = np.einsum("by,tyx->tbx", s_i, left)
+        r_j = np.einsum("txy,by->tbx", right, s_j)
+        # J_b R_t s_j and s_i^T L_t J_b
+        Jr = np.einsum("bxy,tby->tbx", self._J_matrices, r_j)
+        lJ = np.einsum("tbx,bxy->tby", l_i, self._J_matrices)
+
+        spin_gradient = np.zeros(spin_orientation.shape, dtype=float)
+        np.add.at(
+            spin_gradient,
+            self._indices_i,
+            np.einsum("bt,txy,tby->bx", factors, left, Jr),
+        )
+        np.add.at(
+            spin_gradient,
+            self._indices_j,
+            np.einsum("bt,tyx,tby->bx", factors, right, lJ),
+        )
+
+        forms = np.einsum("tbx,tbx->bt", l_i, Jr)
+        spiral_gradient = np.einsum(
+            "bt,bt,bx->x", phase_factors, forms, self._dis_vectors
+        )
+
+        cone_gradient = np.zeros(3, dtype=float)
+        if left_derivatives is not None:
+            # Derivatives of the energy with respect to L_t and R_t
+            G = np.einsum("bt,bx,tby->txy", factors, s_i, Jr)
+            H = np.einsum("bt,tbx,by->txy", factors, lJ, s_j)
+            cone_gradient = np.einsum(
+                "taxy,txy->a", np.array(left_derivatives, dtype=float), G
+            ) + np.einsum("taxy,txy->a", np.array(right_derivatives, dtype=float), H)
+
+        return spin_gradient, cone_gradient, spiral_gradient
+
     def _ferro_grad(self, spin_orientation, gradient_vector=None, torques=None):
+        r"""
+        Gradient of the ferro case, see :py:meth:`.Energy._ferro_grad_numerical` for
+        the format. Computed analytically, unless :py:attr:`.Energy.numerical_gradient`
+        is ``True``.
+        """
+
+        if self._numerical_gradient:
+            return self._ferro_grad_numerical(
+                spin_orientation, gradient_vector=gradient_vector, torques=torques
+            )
+
+        if gradient_vector is None or torques is None:
+            gradient_vector = np.zeros((self._gradient_size), dtype=float)
+            torques = np.zeros((len(self._spins), 3), dtype=float)
+            return_results = True
+        else:
+            return_results = False
+
+        spin_gradient = self._bond_gradients(
+            spin_orientation, [np.eye(3)], [np.eye(3)], [[1, 0, 0]]
+        )[0]
+
+        # Zeeman term
+        if self.magnetic_field is not None:
+            spin_gradient += BOHR_MAGNETON * np.outer(
+                self._g_factors, self.magnetic_field
+            )
+
+        _fill_torques(spin_orientation, spin_gradient, gradient_vector, torques)
+
+        if return_results:
+            return gradient_vector, torques
+
+    def _antiferro_grad(
+        self,
+        spin_orientation,
+        cone_axis,
+        spiral_vector,
+        gradient_vector=None,
+        torques=None,
+    ):
+        r"""
+        Gradient of the antiferro case, see
+        :py:meth:`.Energy._antiferro_grad_numerical` for the format. Computed
+        analytically, unless :py:attr:`.Energy.numerical_gradient` is ``True``.
+        """
+
+        if self._numerical_gradient:
+            return self._antiferro_grad_numerical(
+                spin_orientation,
+                cone_axis,
+                spiral_vector,
+                gradient_vector=gradient_vector,
+                torques=torques,
+            )
+
+        if gradient_vector is None or torques is None:
+            gradient_vector = np.zeros((self._gradient_size), dtype=float)
+            torques = np.zeros((self._torque_size, 3), dtype=float)
+            return_results = True
+        else:
+            return_results = False
+
+        K, K_sq, IK_sq, dK, dK_sq = _cone_matrices(cone_axis)
+
+        spin_gradient, cone_gradient, _ = self._bond_gradients(
+            spin_orientation,
+            *_antiferro_terms(K, K_sq, IK_sq),
+            *_antiferro_terms_derivatives(dK, dK_sq),
+            spiral_vector,
+        )
+
+        # Zeeman term
+        if self.magnetic_field is not None:
+            spin_gradient, cone_gradient = self._add_cone_zeeman_gradient(
+                spin_orientation, K_sq, dK_sq, spin_gradient, cone_gradient
+            )
+
+        _fill_torques(spin_orientation, spin_gradient, gradient_vector, torques)
+
+        t = np.cross(cone_axis, cone_gradient)
+        torques[-1] = t
+        gradient_vector[-3] = t[2]
+        gradient_vector[-2] = -t[1]
+        gradient_vector[-1] = t[0]
+
+        if return_results:
+            return gradient_vector, torques
+
+    def _spiral_grad(
+        self,
+        spin_orientation,
+        cone_axis,
+        spiral_vector,
+        gradient_vector=None,
+        torques=None,
+    ):
+        r"""
+        Gradient of the spiral case, see :py:meth:`.Energy._spiral_grad_numerical`
+        for the format. Computed analytically, unless
+        :py:attr:`.Energy.numerical_gradient` is ``True``.
+        """
+
+        if self._numerical_gradient:
+            return self._spiral_grad_numerical(
+                spin_orientation,
+                cone_axis,
+                spiral_vector,
+                gradient_vector=gradient_vector,
+                torques=torques,
+            )
+
+        if gradient_vector is None or torques is None:
+            gradient_vector = np.zeros((self._gradient_size), dtype=float)
+            torques = np.zeros((self._torque_size, 3), dtype=float)
+            return_results = True
+        else:
+            return_results = False
+
+        K, K_sq, IK_sq, dK, dK_sq = _cone_matrices(cone_axis)
+
+        spin_gradient, cone_gradient, spiral_gradient = self._bond_gradients(
+            spin_orientation,
+            *_spiral_terms(K, K_sq, IK_sq),
+            *_spiral_terms_derivatives(dK, dK_sq),
+            spiral_vector,
+        )
+
+        # Zeeman term
+        if self.magnetic_field is not None:
+            spin_gradient, cone_gradient = self._add_cone_zeeman_gradient(
+                spin_orientation, K_sq, dK_sq, spin_gradient, cone_gradient
+            )
+
+        _fill_torques(spin_orientation, spin_gradient, gradient_vector, torques)
+
+        t = np.cross(cone_axis, cone_gradient)
+        torques[-1] = t
+        gradient_vector[-6] = t[2]
+        gradient_vector[-5] = -t[1]
+        gradient_vector[-4] = t[0]
+
+        gradient_vector[-3:] = spiral_gradient
+
+        if return_results:
+            return gradient_vector, torques
+
+    def _add_cone_zeeman_gradient(
+        self, spin_orientation, K_sq, dK_sq, spin_gradient, cone_gradient
+    ):
+        r"""
+        Adds the derivatives of the Zeeman energy of the cone states
+
+        .. math::
+
+            E_Z = \mu_B\sum_{i}g_i\boldsymbol{H}^T(2I + K^2)\boldsymbol{s}_i
+        """
+
+        field = BOHR_MAGNETON * self.magnetic_field
+        g_factors = np.array(self._g_factors, dtype=float)
+
+        spin_gradient = spin_gradient + np.outer(
+            g_factors, (2 * np.eye(3, dtype=float) + K_sq).T @ field
+        )
+        cone_gradient = cone_gradient + np.einsum(
+            "i,x,axy,iy->a", g_factors, field, dK_sq, spin_orientation
+        )
+
+        return spin_gradient, cone_gradient
+
+    def _ferro_grad_numerical(
+        self, spin_orientation, gradient_vector=None, torques=None
+    ):
         r"""
         Gradient of the ferro case looks like:
 
@@ -840,7 +1430,7 @@ class Energy:
         if return_results:
             return gradient_vector, torques
 
-    def _antiferro_grad(
+    def _antiferro_grad_numerical(
         self,
         spin_orientation,
         cone_axis,
@@ -908,14 +1498,14 @@ class Energy:
         t = np.cross(cone_axis, gradient)
         for j in range(0, 3):
             torques[-1][j] = t[j]
-        gradient_vector[-6] = t[2]
-        gradient_vector[-5] = -t[1]
-        gradient_vector[-4] = t[0]
+        gradient_vector[-3] = t[2]
+        gradient_vector[-2] = -t[1]
+        gradient_vector[-1] = t[0]
 
         if return_results:
             return gradient_vector, torques
 
-    def _spiral_grad(
+    def _spiral_grad_numerical(
         self,
         spin_orientation,
         cone_axis,
@@ -999,21 +1589,11 @@ class Energy:
         )
         K_sq = K @ K
 
-        gradient = np.zeros(3, dtype=float)
-
-        for i, j, d, J in self._bonds:
-            C = -np.cos(spiral_vector @ d) / 2 * (
-                K @ J.matrix @ K_sq + K_sq @ J.matrix @ K
-            ) + np.sin(spiral_vector @ d) / 2 * (
-                K @ J.matrix @ K - K_sq @ J.matrix @ K_sq
-            )
-            gradient += d * (
-                self._factor
-                * self._spins[i]
-                * self._spins[j]
-                * np.einsum("i,ij,j", spin_orientation[i], C, spin_orientation[j])
-            )
-        # print(f"\n\n{gradient}\n\n")
+        gradient = self._bond_sum(
+            spin_orientation,
+            *_spiral_terms(K, K_sq, np.eye(3, dtype=float) + K_sq),
+            spiral_vector,
+        )[1]
 
         gradient_vector[-3:] = gradient
 
@@ -1024,6 +1604,95 @@ class Energy:
     #                                    Energy                                    #
     ################################################################################
 
+    def _bond_sum(
+        self, spin_orientation, left, right, coefficients, spiral_vector=None
+    ):
+        r"""
+        Exchange and single-ion-like anisotropy energy as one batched contraction
+        over the bonds.
+
+        Exchange matrix of each bond is replaced by
+
+        .. math::
+
+            \boldsymbol{C}_b = \sum_{t}\left(c_t^0 + c_t^c\cos(\boldsymbol{q}\boldsymbol{d}_b)
+            + c_t^s\sin(\boldsymbol{q}\boldsymbol{d}_b)\right)
+            \boldsymbol{L}_t\boldsymbol{J}_b\boldsymbol{R}_t
+
+        The compiled backend is used if it is enabled (see ``magnopy._numba``).
+
+        Parameters
+        ----------
+        spin_orientation : (I, 3) :numpy:`ndarray`
+            Normalized orientation of the spin vectors.
+        left : (T, 3, 3) |array-like|_
+            Matrices :math:`\boldsymbol{L}_t`.
+        right : (T, 3, 3) |array-like|_
+            Matrices :math:`\boldsymbol{R}_t`.
+        coefficients : (T, 3) |array-like|_
+            Coefficients :math:`(c_t^0, c_t^c, c_t^s)`.
+        spiral_vector : (3,) :numpy:`ndarray`, optional
+            Spiral vector :math:`\boldsymbol{q}`.
+
+        Returns
+        -------
+        energy : float
+            Exchange and single-ion-like anisotropy energy.
+        gradient : (3,) :numpy:`ndarray`
+            Derivative of the energy with respect to the spiral vector.
+        """
+
+        if spiral_vector is None:
+            spiral_vector = np.zeros(3, dtype=float)
+        spiral_vector = np.array(spiral_vector, dtype=float)
+        coefficients = np.array(coefficients, dtype=float)
+
+        # s_i^T L_t and R_t s_j for each atom, (T, I, 3)
+        left = np.einsum("iy,tyx->tix", spin_orientation, np.array(left, dtype=float))
+        right = np.einsum("txy,iy->tix", np.array(right, dtype=float), spin_orientation)
+
+        if _numba.ENABLED:
+            return _numba.bilinear_sum(
+                left,
+                right,
+                coefficients,
+                self._spin_products,
+                spiral_vector,
+                self._dis_vectors,
+                self._J_matrices,
+                self._indices_i,
+                self._indices_j,
+            )
+
+        # (B, T) bilinear forms of all bonds and terms
+        forms = np.einsum(
+            "tbx,bxy,tby->bt",
+            left[:, self._indices_i],
+            self._J_matrices,
+            right[:, self._indices_j],
+            optimize=True,
+        )
+        phases = self._dis_vectors @ spiral_vector
+        cos = np.cos(phases)[:, np.newaxis]
+        sin = np.sin(phases)[:, np.newaxis]
+
+        energy = np.einsum(
+            "b,bt->",
+            self._spin_products,
+            forms
+            * (
+                coefficients[:, 0] + coefficients[:, 1] * cos + coefficients[:, 2] * sin
+            ),
+        )
+        gradient = np.einsum(
+            "b,bt,bx->x",
+            self._spin_products,
+            forms * (coefficients[:, 2] * cos - coefficients[:, 1] * sin),
+            self._dis_vectors,
+        )
+
+        return energy, gradient
+
     def ferro(self, spin_orientation):
         r"""
         Computes energy of the generalized ferromagnetic state for given
@@ -1068,18 +1737,10 @@ class Energy:
         for i in range(len(spin_orientation)):
             spin_orientation[i] /= np.linalg.norm(spin_orientation[i])
 
-        energy = 0
-
         # Compute exchange and single-ion-like anisotropy energy
-        for i, j, _, J in self._bonds:
-            energy += (
-                self._factor
-                * self._spins[i]
-                * self._spins[j]
-                * np.einsum(
-                    "i,ij,j", spin_orientation[i], J.matrix, spin_orientation[j]
-                )
-            )
+        energy = self._bond_sum(
+            spin_orientation, [np.eye(3)], [np.eye(3)], [[1, 0, 0]]
+        )[0]
 
         # Compute zeeman energy
         if self.magnetic_field is not None:
@@ -1179,22 +1840,10 @@ class Energy:
         K_sq = K @ K
         IK_sq = np.eye(3, dtype=float) + K_sq
 
-        energy = 0
-
         # Compute exchange and single-ion-like anisotropy energy
-        for i, j, d, J in self._bonds:
-            C_dij = (
-                IK_sq @ J.matrix @ IK_sq
-                + K_sq @ J.matrix @ K_sq * np.cos(spiral_vector @ d)
-                - K_sq @ J.matrix @ K * np.sin(spiral_vector @ d)
-            )
-
-            energy += (
-                self._factor
-                * self._spins[i]
-                * self._spins[j]
-                * np.einsum("i,ij,j", spin_orientation[i], C_dij, spin_orientation[j])
-            )
+        energy = self._bond_sum(
+            spin_orientation, *_antiferro_terms(K, K_sq, IK_sq), spiral_vector
+        )[0]
 
         # Compute zeeman energy
         if self.magnetic_field is not None:
@@ -1293,29 +1942,10 @@ class Energy:
         K_sq = K @ K
         IK_sq = np.eye(3, dtype=float) + K_sq
 
-        energy = 0
-
         # Compute exchange and single-ion-like anisotropy energy
-        for i, j, d, J in self._bonds:
-            # print(
-            #     spiral_vector @ d, np.sin(spiral_vector @ d), np.cos(spiral_vector @ d)
-            # )
-            C_dij = (
-                IK_sq @ J.matrix @ IK_sq
-                - (K @ J.matrix @ K - K_sq @ J.matrix @ K_sq)
-                / 2
-                * np.cos(spiral_vector @ d)
-                - (K @ J.matrix @ K_sq + K_sq @ J.matrix @ K)
-                / 2
-                * np.sin(spiral_vector @ d)
-            )
-
-            energy += (
-                self._factor
-                * self._spins[i]
-                * self._spins[j]
-                * np.einsum("i,ij,j", spin_orientation[i], C_dij, spin_orientation[j])
-            )
+        energy = self._bond_sum(
+            spin_orientation, *_spiral_terms(K, K_sq, IK_sq), spiral_vector
+        )[0]
 
         # Compute zeeman energy
         if self.magnetic_field is not None:
@@ -1328,6 +1958,384 @@ class Energy:
 
         return energy
 
+    def _check_batch(self, spin_orientations, cone_axes=None, spiral_vectors=None):
+        r"""
+        Checks and normalizes the input of the batched energies.
+
+        Returns
+        -------
+        spin_orientations : (M, I, 3) :numpy:`ndarray`
+        cone_axes : (M, 3) :numpy:`ndarray`
+            Only if ``cone_axes`` is given.
+        spiral_vectors : (M, 3) :numpy:`ndarray`
+            Only if ``spiral_vectors`` is given.
+        """
+
+        I = len(self._spins)
+
+        try:
+            spin_orientations = np.array(spin_orientations, dtype=float)
+        except:
+            raise ValueError(
+                f"spin_orientations is not array-like: {spin_orientations}"
+            )
+
+        # Make the input array have (M, I, 3) shape for I = 1
+        if I == 1 and spin_orientations.ndim == 2:
+            spin_orientations = spin_orientations[:, np.newaxis]
+
+        if spin_orientations.ndim not in [2, 3] or spin_orientations.shape[-2:] != (
+            I,
+            3,
+        ):
+            raise ValueError(
+                f"spin_orientations has to have the shape of (M, {I}, 3) or ({I}, 3), "
+                f"got {spin_orientations.shape}"
+            )
+
+        arrays = [spin_orientations]
+        for name, array in [
+            ("cone_axes", cone_axes),
+            ("spiral_vectors", spiral_vectors),
+        ]:
+            if array is None:
+                continue
+            try:
+                array = np.array(array, dtype=float)
+            except:
+                raise ValueError(f"{name} is not array-like: {array}")
+            if array.shape[-1:] != (3,) or array.ndim > 2:
+                raise ValueError(
+                    f"{name} has to have the shape of (M, 3) or (3,), got {array.shape}"
+                )
+            arrays.append(array)
+
+        # Single configurations are broadcasted: (I, 3) and (3,)
+        try:
+            M = np.broadcast_shapes(
+                spin_orientations.shape[:-2],
+                *[array.shape[:-1] for array in arrays[1:]],
+            )
+        except ValueError:
+            raise ValueError(
+                "Amounts of spin_orientations, cone_axes and spiral_vectors do not "
+                f"match: {[array.shape for array in arrays]}"
+            )
+        M = M[0] if len(M) == 1 else 1
+        arrays[0] = np.broadcast_to(spin_orientations, (M, I, 3))
+        for index in range(1, len(arrays)):
+            arrays[index] = np.broadcast_to(arrays[index], (M, 3))
+
+        # Normalize spin orientations and cone axes
+        arrays[0] = arrays[0] / np.linalg.norm(arrays[0], axis=2)[:, :, np.newaxis]
+        if cone_axes is not None:
+            arrays[1] = arrays[1] / np.linalg.norm(arrays[1], axis=1)[:, np.newaxis]
+
+        return arrays
+
+    def ferro_batch(self, spin_orientations):
+        r"""
+        Computes energies of the generalized ferromagnetic state for a set of
+        ``spin_orientations`` at once.
+
+        Parameters
+        ----------
+        spin_orientations : (M, I, 3) |array-like|_
+            Orientations of the spin vectors for each of the M configurations.
+            If ``I = 1``, then ``(M, 3)`` shaped input is accepted as well.
+            The vectors are normalized to one.
+
+        Returns
+        -------
+        energies : (M,) :numpy:`ndarray`
+            Energy of each configuration, the same as :py:meth:`.Energy.ferro`.
+
+        See Also
+        --------
+        ferro
+        """
+
+        (spin_orientations,) = self._check_batch(spin_orientations)
+
+        energies = np.einsum(
+            "mix,ijxy,mjy->m",
+            spin_orientations,
+            self._pair_sum,
+            spin_orientations,
+            optimize=True,
+        )
+
+        # Compute zeeman energy
+        if self.magnetic_field is not None:
+            energies += BOHR_MAGNETON * np.einsum(
+                "i,j,mij->m", self._g_factors, self.magnetic_field, spin_orientations
+            )
+
+        return energies
+
+    def antiferro_batch(self, spin_orientations, cone_axes, spiral_vectors):
+        r"""
+        Computes energies of the antiferro cone state for a set of configurations at
+        once.
+
+        Parameters
+        ----------
+        spin_orientations : (M, I, 3) or (I, 3) |array-like|_
+            Orientations of the spin vectors for each of the M configurations.
+            If ``I = 1``, then ``(M, 3)`` shaped input is accepted as well.
+            The vectors are normalized to one.
+        cone_axes : (M, 3) or (3,) |array-like|_
+            Cone axis of each configuration, only the direction is important.
+        spiral_vectors : (M, 3) or (3,) |array-like|_
+            Spiral vector of each configuration.
+
+        Returns
+        -------
+        energies : (M,) :numpy:`ndarray`
+            Energy of each configuration, the same as :py:meth:`.Energy.antiferro`.
+
+        Notes
+        -----
+        Single spin orientation, cone axis or spiral vector is used for all
+        configurations.
+
+        See Also
+        --------
+        antiferro
+        """
+
+        return self._cone_batch(
+            _antiferro_terms,
+            *self._check_batch(spin_orientations, cone_axes, spiral_vectors),
+        )
+
+    def spiral_batch(self, spin_orientations, cone_axes, spiral_vectors):
+        r"""
+        Computes energies of the spiral cone state for a set of configurations at
+        once.
+
+        Parameters
+        ----------
+        spin_orientations : (M, I, 3) or (I, 3) |array-like|_
+            Orientations of the spin vectors for each of the M configurations.
+            If ``I = 1``, then ``(M, 3)`` shaped input is accepted as well.
+            The vectors are normalized to one.
+        cone_axes : (M, 3) or (3,) |array-like|_
+            Cone axis of each configuration, only the direction is important.
+        spiral_vectors : (M, 3) or (3,) |array-like|_
+            Spiral vector of each configuration.
+
+        Returns
+        -------
+        energies : (M,) :numpy:`ndarray`
+            Energy of each configuration, the same as :py:meth:`.Energy.spiral`.
+
+        Notes
+        -----
+        Single spin orientation, cone axis or spiral vector is used for all
+        configurations.
+
+        See Also
+        --------
+        spiral
+        """
+
+        return self._cone_batch(
+            _spiral_terms,
+            *self._check_batch(spin_orientations, cone_axes, spiral_vectors),
+        )
+
+    def _cone_batch(self, terms, spin_orientations, cone_axes, spiral_vectors):
+        r"""
+        Batched energy of the cone states.
+
+        The sum over the bonds is reduced to the sums over the pairs of atoms
+        (see :py:meth:`.Energy._fourier_sums`), that are contracted with the
+        projections of the spin orientations on the terms of the exchange matrix.
+        """
+
+        K = np.einsum("ma,axy->mxy", cone_axes, _CROSS)
+        K_sq = K @ K
+        IK_sq = np.eye(3, dtype=float) + K_sq
+        left, right, coefficients = terms(K, K_sq, IK_sq)
+        coefficients = np.array(coefficients, dtype=float)
+
+        # s_i^T L_t and R_t s_j, (M, T, I, 3)
+        left = np.einsum("miy,tmyx->mtix", spin_orientations, np.array(left))
+        right = np.einsum("tmxy,miy->mtix", np.array(right), spin_orientations)
+
+        cos_sums, sin_sums = self._fourier_sums(spiral_vectors)
+
+        energies = (
+            np.einsum(
+                "mtix,ijxy,mtjy,t->m",
+                left,
+                self._pair_sum,
+                right,
+                coefficients[:, 0],
+                optimize=True,
+            )
+            + np.einsum(
+                "mtix,mijxy,mtjy,t->m",
+                left,
+                cos_sums,
+                right,
+                coefficients[:, 1],
+                optimize=True,
+            )
+            + np.einsum(
+                "mtix,mijxy,mtjy,t->m",
+                left,
+                sin_sums,
+                right,
+                coefficients[:, 2],
+                optimize=True,
+            )
+        )
+
+        # Compute zeeman energy
+        if self.magnetic_field is not None:
+            so_prime = np.einsum(
+                "mjk,mik->mij", np.eye(3, dtype=float) + IK_sq, spin_orientations
+            )
+            energies += BOHR_MAGNETON * np.einsum(
+                "i,j,mij->m", self._g_factors, self.magnetic_field, so_prime
+            )
+
+        return energies
+
+    def scan_spiral(
+        self, q_mesh, cone_axis=(0, 0, 1), spin_orientation=None, lower_bound=False
+    ):
+        r"""
+        Computes energy of the spiral state on the mesh of spiral vectors.
+
+        Parameters
+        ----------
+        q_mesh : (..., 3) |array-like|_
+            Spiral vectors :math:`\boldsymbol{q}`, any amount of leading dimensions
+            is accepted (i.e. ``(M, 3)`` or ``(N1, N2, N3, 3)``).
+        cone_axis : (3,) |array-like|_, default (0, 0, 1)
+            Orientation of the cone axis, only the direction is important.
+            Ignored if ``lower_bound = True``.
+        spin_orientation : (I, 3) or (3,) |array-like|_, optional
+            Orientation of the spin vectors. By default all spins are perpendicular
+            to the ``cone_axis`` and parallel to each other (flat spiral).
+            Ignored if ``lower_bound = True``.
+        lower_bound : bool, default False
+            Whether to compute the Luttinger-Tisza lower bound of the energy instead
+            of the energy of the spiral state.
+
+        Returns
+        -------
+        energies : (...) :numpy:`ndarray`
+            Energy for each spiral vector, the shape is ``q_mesh.shape[:-1]``.
+
+        Notes
+        -----
+        Luttinger-Tisza lower bound is computed from the lowest eigenvalue
+        :math:`\lambda_{min}(\boldsymbol{q})` of the :math:`3I \times 3I` hermitian
+        matrix
+
+        .. math::
+
+            \boldsymbol{J}_{ij}(\boldsymbol{q}) =
+            \sum_{\boldsymbol{d}}S_iS_j\boldsymbol{J}_{\boldsymbol{d}ij}
+            e^{i\boldsymbol{q}\boldsymbol{d}}
+
+        as :math:`I\lambda_{min}(\boldsymbol{q})`. It ignores Zeeman energy. Its
+        minimum over all :math:`\boldsymbol{q}` is the lower bound for the energy of
+        any state.
+
+        See Also
+        --------
+        spiral_batch
+        """
+
+        try:
+            q_mesh = np.array(q_mesh, dtype=float)
+        except:
+            raise ValueError(f"q_mesh is not array-like: {q_mesh}")
+
+        if q_mesh.ndim == 0 or q_mesh.shape[-1] != 3:
+            raise ValueError(
+                f"q_mesh has to have the last dimension of size 3, got {q_mesh.shape}"
+            )
+
+        shape = q_mesh.shape[:-1]
+        spiral_vectors = q_mesh.reshape((-1, 3))
+
+        if lower_bound:
+            matrices = self._lower_bound_matrices(spiral_vectors)
+            energies = len(self._spins) * np.linalg.eigvalsh(matrices)[:, 0]
+            return energies.reshape(shape)
+
+        if spin_orientation is None:
+            try:
+                cone_axis = np.array(cone_axis, dtype=float)
+            except:
+                raise ValueError(f"cone_axis is not array-like: {cone_axis}")
+            if cone_axis.shape != (3,):
+                raise ValueError(
+                    f"cone_axis must have the shape of (3,) got {cone_axis.shape}"
+                )
+            # Any vector perpendicular to the cone axis
+            spin_orientation = np.cross(
+                cone_axis, np.eye(3)[np.argmin(np.abs(cone_axis))]
+            )
+            spin_orientation = np.tile(spin_orientation, (len(self._spins), 1))
+
+        return self.spiral_batch(spin_orientation, cone_axis, spiral_vectors).reshape(
+            shape
+        )
+
+    def _starting_spiral_vector(self, spiral_mesh=None):
+        r"""
+        Spiral vector with the lowest Luttinger-Tisza bound on the mesh.
+
+        Parameters
+        ----------
+        spiral_mesh : tuple of three int, optional
+            Size of the mesh along the reciprocal lattice vectors.
+
+        Returns
+        -------
+        spiral_vector : (3,) :numpy:`ndarray`
+        """
+
+        q_mesh = self._spiral_mesh(spiral_mesh)
+
+        energies = self.scan_spiral(q_mesh, lower_bound=True)
+
+        return q_mesh[np.argmin(energies)]
+
+    def _spiral_mesh(self, spiral_mesh=None):
+        r"""
+        Regular mesh of the spiral vectors in the unit cell of the reciprocal lattice.
+
+        Parameters
+        ----------
+        spiral_mesh : tuple of three int, optional
+            Size of the mesh along the reciprocal lattice vectors.
+
+        Returns
+        -------
+        q_mesh : (M, 3) :numpy:`ndarray`
+            Spiral vectors in absolute coordinates.
+        """
+
+        if spiral_mesh is None:
+            spiral_mesh = _SPIRAL_MESH
+
+        if len(spiral_mesh) != 3 or min(spiral_mesh) < 1:
+            raise ValueError(
+                f"spiral_mesh has to be three positive integers, got {spiral_mesh}"
+            )
+
+        axes = [np.arange(n) / n for n in spiral_mesh]
+        relative = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+        return relative.reshape((-1, 3)) @ self._reciprocal_cell
+
     ################################################################################
     #                             Optimization routines                            #
     ################################################################################
@@ -1342,6 +2350,7 @@ class Energy:
         history_filename=None,
         history_step=1000,
         antiferro_q=None,
+        spiral_mesh=None,
     ):
         r"""
         Find the minima of the energy assuming the type of the ground state based on
@@ -1433,6 +2442,11 @@ class Energy:
 
         antiferro_q : (3,) |array-like|_
             One of the 26 possible q vectors of the sntiferromagnetic case.
+        spiral_mesh : tuple of three int, default (12, 12, 12)
+            Size of the mesh of spiral vectors along the reciprocal lattice vectors.
+            If no initial guess for the spiral vector is given, then the optimization
+            of the spiral case starts from the minimum of the Luttinger-Tisza lower
+            bound on this mesh (see :py:meth:`.Energy.scan_spiral`).
 
 
         Returns
@@ -1495,6 +2509,15 @@ class Energy:
                     f"Expected tuple of three floats for tolerance, got {tolerance}"
                 )
         elif case in [2, "spiral"]:
+            # Start from the global minimum on the mesh of spiral vectors
+            if initial_guess is None or initial_guess[2] is None:
+                if initial_guess is None:
+                    initial_guess = (None, None, None)
+                initial_guess = (
+                    initial_guess[0],
+                    initial_guess[1],
+                    self._starting_spiral_vector(spiral_mesh),
+                )
             x = _starting_spiral(len(self._spins), initial_guess)
 
             self._gradient_size = 3 * len(self._spins) + 6
@@ -0,0 +1,392 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from scipy.optimize import least_squares, minimize
+
+from magnopy.spinham.energy import Energy
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+__all__ = ["LuttingerTisza"]
+
+
+class LuttingerTisza:
+    r"""
+    Luttinger-Tisza method for the classical ground state of the spin Hamiltonian.
+
+    The classical energy of the spin Hamiltonian (in the units and conventions of
+    :py:class:`.Energy`) is written in terms of the Fourier transform of the exchange
+
+    .. math::
+
+        \boldsymbol{J}_{ij}(\boldsymbol{q}) =
+        \sum_{\boldsymbol{d}}S_iS_j\boldsymbol{J}_{\boldsymbol{d}ij}
+        e^{i\boldsymbol{q}\boldsymbol{d}}
+
+    which is a hermitian :math:`3I \times 3I` matrix. If the strong constraint
+    :math:`\vert\boldsymbol{s}_i\vert = 1` is relaxed to the weak one
+    :math:`\sum_i\vert\boldsymbol{s}_i\vert^2 = I`, then the minimal energy is
+    :math:`I\lambda_{min}`, where :math:`\lambda_{min}` is the lowest eigenvalue of
+    :math:`\boldsymbol{J}(\boldsymbol{q})` over all :math:`\boldsymbol{q}`. It is a
+    lower bound for the energy of the classical ground state. If a combination of the
+    eigenvectors of :math:`\lambda_{min}` satisfies the strong constraint, then the
+    bound is reached and the ground state is exact.
+
+    Zeeman energy is not included.
+
+    Parameters
+    ----------
+    spinham : :py:class:`.SpinHamiltonian`
+        Spin Hamiltonian. The instance of :py:class:`.LuttingerTisza` is independent
+        from it.
+
+    Attributes
+    ----------
+    I : int
+        Amount of the magnetic atoms in the unit cell.
+
+    See Also
+    --------
+    Energy.scan_spiral
+    """
+
+    def __init__(self, spinham: SpinHamiltonian):
+        # Frozen bonds, Fourier sums and the mesh of the spiral vectors
+        self._energy = Energy(spinham)
+        self.I = len(spinham.magnetic_atoms)
+
+    def _bound_and_gradient(self, spiral_vector):
+        r"""
+        Luttinger-Tisza bound and its gradient at one spiral vector.
+
+        The gradient follows from the Hellmann-Feynman theorem,
+        :math:`\nabla_{\boldsymbol{q}}\lambda_{min} = \boldsymbol{u}^{\dagger}
+        \nabla_{\boldsymbol{q}}\boldsymbol{J}(\boldsymbol{q})\boldsymbol{u}`.
+
+        Parameters
+        ----------
+        spiral_vector : (3,) :numpy:`ndarray`
+
+        Returns
+        -------
+        energy : float
+        gradient : (3,) :numpy:`ndarray`
+        """
+
+        energy = self._energy
+        J = energy._lower_bound_matrices(spiral_vector.reshape((1, 3)))[0]
+        eigenvalues, eigenvectors = np.linalg.eigh(J)
+        u = eigenvectors[:, 0].reshape((self.I, 3))
+
+        # u_i^+ J_b u_j i e^{iqd} for each bond
+        forms = np.einsum(
+            "bx,b,bxy,by->b",
+            np.conjugate(u[energy._indices_i]),
+            energy._spin_products,
+            energy._J_matrices,
+            u[energy._indices_j],
+            optimize=True,
+        )
+        forms = 1j * forms * np.exp(1j * energy._dis_vectors @ spiral_vector)
+        gradient = forms.real @ energy._dis_vectors
+
+        return self.I * eigenvalues[0], self.I * gradient
+
+    def J(self, spiral_vectors):
+        r"""
+        Fourier transform of the exchange.
+
+        Parameters
+        ----------
+        spiral_vectors : (M, 3) or (3,) |array-like|_
+            Spiral vectors :math:`\boldsymbol{q}` in absolute coordinates.
+
+        Returns
+        -------
+        J : (M, 3I, 3I) or (3I, 3I) :numpy:`ndarray`
+            Hermitian matrices :math:`\boldsymbol{J}(\boldsymbol{q})`, the element
+            :math:`(3i + \alpha, 3j + \beta)` is
+            :math:`J_{ij}^{\alpha\beta}(\boldsymbol{q})`.
+        """
+
+        spiral_vectors = np.array(spiral_vectors, dtype=float)
+        if spiral_vectors.shape[-1:] != (3,) or spiral_vectors.ndim > 2:
+            raise ValueError(
+                "spiral_vectors has to have the shape of (M, 3) or (3,), "
+                f"got {spiral_vectors.shape}"
+            )
+
+        J = self._energy._lower_bound_matrices(spiral_vectors.reshape((-1, 3)))
+        if spiral_vectors.ndim == 1:
+            return J[0]
+        return J
+
+    def lowest(self, spiral_vectors):
+        r"""
+        Luttinger-Tisza bound and the corresponding eigenvector for each
+        :math:`\boldsymbol{q}`.
+
+        Parameters
+        ----------
+        spiral_vectors : (M, 3) |array-like|_
+            Spiral vectors :math:`\boldsymbol{q}` in absolute coordinates.
+
+        Returns
+        -------
+        energies : (M,) :numpy:`ndarray`
+            :math:`I\lambda_{min}(\boldsymbol{q})`.
+        eigenvectors : (M, 3I) :numpy:`ndarray`
+            Eigenvectors of :math:`\lambda_{min}(\boldsymbol{q})`, normalized to one.
+        """
+
+        spiral_vectors = np.array(spiral_vectors, dtype=float).reshape((-1, 3))
+        eigenvalues, eigenvectors = np.linalg.eigh(
+            self._energy._lower_bound_matrices(spiral_vectors)
+        )
+
+        return self.I * eigenvalues[:, 0], eigenvectors[:, :, 0]
+
+    def minimum(self, mesh=(12, 12, 12), candidates=4, tolerance=1e-8):
+        r"""
+        Global minimum of the Luttinger-Tisza bound.
+
+        The bound is computed on the mesh of the reciprocal cell, then the lowest
+        points of the mesh are refined by the quasi-Newton (BFGS) minimization with
+        the analytic gradient
+        :math:`\boldsymbol{u}^{\dagger}\nabla_{\boldsymbol{q}}
+        \boldsymbol{J}(\boldsymbol{q})\boldsymbol{u}`.
+
+        Parameters
+        ----------
+        mesh : (3,) tuple of int, default (12, 12, 12)
+            Size of the mesh along each reciprocal lattice vector.
+        candidates : int, default 4
+            Amount of the lowest points of the mesh, that are refined.
+        tolerance : float, default 1e-8
+            Tolerance for the norm of the gradient of the local minimization.
+
+        Returns
+        -------
+        energy : float
+            Minimal value of the bound.
+        spiral_vector : (3,) :numpy:`ndarray`
+            Spiral vector of the minimum, in absolute coordinates. It is brought to
+            the unit cell of the reciprocal lattice.
+        """
+
+        q_mesh = self._energy._spiral_mesh(mesh)
+        energies = self._energy.scan_spiral(q_mesh, lower_bound=True)
+
+        best = np.argmin(energies)
+        energy, q = energies[best], q_mesh[best]
+        for start in np.argsort(energies, kind="stable")[:candidates]:
+            result = minimize(
+                self._bound_and_gradient,
+                q_mesh[start],
+                jac=True,
+                method="BFGS",
+                options=dict(gtol=tolerance),
+            )
+            # Points of the mesh are kept for the ties (often the symmetric ones)
+            if result.fun < energy - tolerance:
+                energy, q = result.fun, result.x
+
+        # Bring spiral vector to the unit cell of the reciprocal lattice
+        reciprocal_cell = self._energy._reciprocal_cell
+        relative = np.mod(q @ np.linalg.inv(reciprocal_cell), 1)
+        relative[np.isclose(relative, 1)] = 0
+
+        return float(energy), relative @ reciprocal_cell
+
+    def case(self, spiral_vector, tolerance=1e-6):
+        r"""
+        Type of the ground state for the given spiral vector.
+
+        Parameters
+        ----------
+        spiral_vector : (3,) |array-like|_
+            Spiral vector in absolute coordinates.
+        tolerance : float, default 1e-6
+            Tolerance for the relative coordinates of the spiral vector.
+
+        Returns
+        -------
+        case : str
+            * ``"ferro"`` if :math:`\boldsymbol{q}` is a reciprocal lattice vector.
+            * ``"antiferro"`` if :math:`2\boldsymbol{q}` is a reciprocal lattice
+              vector.
+            * ``"spiral"`` otherwise.
+
+            Same as the cases of :py:meth:`.Energy.optimize`.
+        """
+
+        relative = np.array(spiral_vector, dtype=float) @ np.linalg.inv(
+            self._energy._reciprocal_cell
+        )
+
+        if np.allclose(relative, np.round(relative), atol=tolerance):
+            return "ferro"
+        if np.allclose(2 * relative, np.round(2 * relative), atol=tolerance):
+            return "antiferro"
+        return "spiral"
+
+    def solve(self, mesh=(12, 12, 12), candidates=4, tolerance=1e-6):
+        r"""
+        Predicts the classical ground state.
+
+        The spiral vector is found by :py:meth:`.LuttingerTisza.minimum`. Then the
+        combination of the eigenvectors of :math:`\lambda_{min}`, that satisfies the
+        strong constraint is searched for. For the ``"ferro"`` and ``"antiferro"``
+        cases it is real and :math:`\vert\boldsymbol{u}_i\vert = 1`, for the
+        ``"spiral"`` case
+        :math:`\boldsymbol{s}_i(\boldsymbol{R}) = \sqrt{2}\,\text{Re}(\boldsymbol{u}_i
+        e^{i\boldsymbol{q}\boldsymbol{R}})` and
+        :math:`\vert\boldsymbol{u}_i\vert = 1`,
+        :math:`\boldsymbol{u}_i\cdot\boldsymbol{u}_i = 0`.
+
+        Parameters
+        ----------
+        mesh : (3,) tuple of int, default (12, 12, 12)
+            Size of the mesh along each reciprocal lattice vector.
+        candidates : int, default 4
+            Amount of the lowest points of the mesh, that are refined.
+        tolerance : float, default 1e-6
+            Tolerance for the degeneracy of the eigenvalues and for the strong
+            constraint.
+
+        Returns
+        -------
+        case : str
+            Type of the ground state, see :py:meth:`.LuttingerTisza.case`.
+        energy : float
+            Luttinger-Tisza bound of the energy.
+        spin_orientation : (I, 3) :numpy:`ndarray`
+            Orientation of the spins in the unit cell at :math:`\boldsymbol{R} = 0`.
+        cone_axis : (3,) :numpy:`ndarray`
+            Cone axis, that is perpendicular to the spins for the ``"antiferro"``
+            and ``"spiral"`` cases.
+        spiral_vector : (3,) :numpy:`ndarray`
+            Spiral vector in absolute coordinates.
+        exact : bool
+            Whether the strong constraint is satisfied, i.e. whether the classical
+            ground state is exact. If not, then ``spin_orientation`` and
+            ``cone_axis`` are an approximation, suitable as an initial guess for
+            :py:meth:`.Energy.optimize`.
+        """
+
+        energy, spiral_vector = self.minimum(
+            mesh=mesh, candidates=candidates, tolerance=tolerance**2
+        )
+        case = self.case(spiral_vector, tolerance=tolerance)
+
+        J = self._energy._lower_bound_matrices(spiral_vector.reshape((1, 3)))[0]
+
+        # Commensurate spiral vectors give real matrices
+        if case != "spiral":
+            J = J.real
+        eigenvalues, eigenvectors = np.linalg.eigh(J)
+        # Subspace of the lowest eigenvalue
+        degenerate = eigenvalues <= eigenvalues[0] + tolerance * max(
+            1, abs(eigenvalues[0])
+        )
+        V = eigenvectors[:, degenerate].reshape((self.I, 3, -1))
+
+        u, residual = self._strong_constraint(V, real=case != "spiral")
+        exact = residual < tolerance
+
+        if case == "spiral":
+            a, b = u.real, u.imag
+            spin_orientation = a
+            # s(R) rotates from a to -b, i.e. around b x a
+            cone_axis = np.cross(b, a).sum(axis=0)
+        else:
+            spin_orientation = u.real
+            # Direction, that is the most perpendicular to all spins
+            cone_axis = np.linalg.svd(spin_orientation)[2][-1]
+
+        spin_orientation = (
+            spin_orientation / np.linalg.norm(spin_orientation, axis=1)[:, np.newaxis]
+        )
+        cone_axis = cone_axis / np.linalg.norm(cone_axis)
+
+        return case, energy, spin_orientation, cone_axis, spiral_vector, exact
+
+    def _strong_constraint(self, V, real):
+        r"""
+        Combination of the basis vectors of the degenerate subspace, that is the
+        closest to the strong constraint.
+
+        Parameters
+        ----------
+        V : (I, 3, g) :numpy:`ndarray`
+            Basis vectors of the subspace.
+        real : bool
+            Whether the combination is real.
+
+        Returns
+        -------
+        u : (I, 3) :numpy:`ndarray`
+            Best combination, normalized as :math:`\sum_i\vert\boldsymbol{u}_i\vert^2
+            = I`.
+        residual : float
+            Maximum violation of the strong constraint.
+        """
+
+        g = V.shape[2]
+
+        def combination(x):
+            if real:
+                return V @ x
+            return V @ (x[:g] + 1j * x[g:])
+
+        def residuals(x):
+            u = combination(x)
+            norms = np.sum(np.abs(u) ** 2, axis=1) - 1
+            if real:
+                return norms
+            squares = np.sum(u * u, axis=1)
+            return np.concatenate((norms, squares.real, squares.imag))
+
+        # Deterministic set of the starting points: basis vectors and
+        # pairs of them with the phase shift of pi / 2
+        starts = []
+        for a in range(g):
+            x = np.zeros(g if real else 2 * g, dtype=float)
+            x[a] = np.sqrt(self.I)
+            starts.append(x)
+            if not real:
+                for b in range(g):
+                    if a != b:
+                        x = np.zeros(2 * g, dtype=float)
+                        x[a] = np.sqrt(self.I / 2)
+                        x[g + b] = np.sqrt(self.I / 2)
+                        starts.append(x)
+
+        best, residual = None, np.inf
+        for x in starts:
+            result = least_squares(residuals, x, xtol=1e-12, ftol=1e-12, gtol=1e-12)
+            current = np.abs(result.fun).max()
+            if current < residual:
+                best, residual = result.x, current
+            if residual < 1e-10:
+                break
+
+        u = combination(best)
+        u *= np.sqrt(self.I / np.sum(np.abs(u) ** 2))
+
+        return u, residual
@@ -0,0 +1,48 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import importlib
+import subprocess
+import sys
+
+import magnopy
+
+
+def test_lazy_names():
+    for module, names in magnopy._LAZY_NAMES.items():
+        assert set(names) == set(importlib.import_module(f"magnopy.{module}").__all__)
+
+
+def test_lazy_access():
+    from magnopy.magnons.dispersion import MagnonDispersion
+
+    assert magnopy.MagnonDispersion is MagnonDispersion
+    assert magnopy.si is magnopy.units.si
+    assert "MagnonDispersion" in dir(magnopy)
+
+
+def test_import_is_light():
+    # Fresh interpreter, since the modules are already imported by the tests
+    code = (
+        "import sys, magnopy; "
+        "print(any(m in sys.modules for m in ['h5py', 'scipy', 'magnopy.io']))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
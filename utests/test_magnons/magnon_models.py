@@ -0,0 +1,112 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+r"""
+Small collinear models shared by the tests of the magnons subpackage.
+"""
+
+import numpy as np
+from wulfric import Atom
+
+from magnopy.magnons.dispersion import MagnonDispersion
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+
+def ferromagnet(cell=None, iso=(-1.0, -1.0, -1.0)):
+    r"""
+    Simple cubic ferromagnet with the spins along z and an easy-axis anisotropy.
+
+    Parameters
+    ----------
+    cell : (3, 3) |array-like|_, optional
+        Unit cell. Cubic with unit lattice parameter by default.
+    iso : (3,) tuple of float, default (-1, -1, -1)
+        Isotropic exchange along the three lattice vectors.
+
+    Returns
+    -------
+    model : :py:class:`.SpinHamiltonian`
+    """
+
+    if cell is None:
+        cell = np.eye(3)
+    model = SpinHamiltonian(notation="SpinW", cell=cell)
+    Fe = Atom("Fe", (0, 0, 0), spin=1.5)
+    Fe.spin_vector = (0, 0, 1.5)
+    model.add_atom(Fe)
+    for R, J in zip([(1, 0, 0), (0, 1, 0), (0, 0, 1)], iso):
+        model.add_exchange(Fe, Fe, R, iso=J)
+    model.add_on_site(Fe, matrix=np.diag([0, 0, -0.1]))
+    return model
+
+
+def antiferromagnet(iso=-0.2, dmi=(0, 0, 0.05), second=None):
+    r"""
+    Two-sublattice antiferromagnet with the spins along :math:`\pm z`.
+
+    Parameters
+    ----------
+    iso : float or None, default -0.2
+        Isotropic exchange between the atoms of the same sublattice along
+        :math:`\boldsymbol{a}_1`. If ``None``, then the bond is not added.
+    dmi : (3,) tuple of float, default (0, 0, 0.05)
+        DMI vector of the same bond.
+    second : float, optional
+        Isotropic exchange between the atoms of the same sublattice along
+        :math:`2\boldsymbol{a}_1`. If ``None``, then the bond is not added.
+
+    Returns
+    -------
+    model : :py:class:`.SpinHamiltonian`
+    """
+
+    model = SpinHamiltonian(notation="SpinW", cell=np.diag([1.0, 1.0, 2.0]))
+    Cr1 = Atom("Cr1", (0, 0, 0), spin=1.5)
+    Cr2 = Atom("Cr2", (0.5, 0.5, 0.5), spin=1.5)
+    Cr1.spin_vector = (0, 0, 1.5)
+    Cr2.spin_vector = (0, 0, -1.5)
+    model.add_atom(Cr1)
+    model.add_atom(Cr2)
+    for R in [(0, 0, 0), (-1, 0, 0), (0, -1, 0), (-1, -1, 0)]:
+        model.add_exchange(Cr1, Cr2, R, iso=1.0)
+    for atom in [Cr1, Cr2]:
+        if iso is not None:
+            model.add_exchange(atom, atom, (1, 0, 0), iso=iso, dmi=dmi)
+        if second is not None:
+            model.add_exchange(atom, atom, (2, 0, 0), iso=second)
+        model.add_on_site(atom, matrix=np.diag([0, 0, -0.05]))
+    return model
+
+
+def magnon_dispersion(model, **kwargs):
+    r"""
+    Magnon dispersion of one of the models.
+
+    Parameters
+    ----------
+    model : callable
+        Either :py:func:`ferromagnet` or :py:func:`antiferromagnet`.
+    **kwargs
+        Passed to ``model``.
+
+    Returns
+    -------
+    dispersion : :py:class:`.MagnonDispersion`
+    """
+
+    return MagnonDispersion(model(**kwargs))
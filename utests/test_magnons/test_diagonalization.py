@@ -0,0 +1,121 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+from magnopy.exceptions import ColpaFailed
+from magnopy.magnons.diagonalization import (
+    COLPA_NEGATIVE_DEFINITE,
+    COLPA_POSITIVE_DEFINITE,
+    COLPA_POSITIVE_SEMIDEFINITE,
+    COLPA_UNSTABLE,
+    solve_via_colpa,
+    solve_via_colpa_batch,
+    solve_via_colpa_classified,
+)
+
+
+def _random_grand_dynamical_matrix(N, shift=3.0):
+    # Hermitian matrix of the bosonic form, positive-defined for large shift
+    A = np.random.random((N, N)) + 1j * np.random.random((N, N))
+    A = (A + np.conjugate(A).T) / 2 + shift * N * np.eye(N)
+    B = np.random.random((N, N)) + 1j * np.random.random((N, N))
+    B = (B + B.T) / 2
+    return np.block([[A, B], [np.conjugate(B), np.conjugate(A)]])
+
+
+@pytest.mark.parametrize("N", [1, 2, 5])
+def test_solve_via_colpa_batch(N):
+    D = np.array([_random_grand_dynamical_matrix(N) for _ in range(10)])
+    E, G, success = solve_via_colpa_batch(D)
+
+    assert E.shape == (10, 2 * N)
+    assert G.shape == (10, 2 * N, 2 * N)
+    assert success.all()
+
+    for i in range(10):
+        E_single, G_single = solve_via_colpa(D[i])
+        assert np.allclose(E[i], E_single)
+        # E = (G^dag)^-1 D G^-1
+        G_inv = np.linalg.inv(G[i])
+        assert np.allclose(np.conjugate(G_inv).T @ D[i] @ G_inv, np.diag(E[i]))
+
+
+def test_solve_via_colpa_batch_failed():
+    D = np.array([_random_grand_dynamical_matrix(3) for _ in range(4)])
+    D[1] = -D[1]
+    E, G, success = solve_via_colpa_batch(D)
+
+    assert (success == [True, False, True, True]).all()
+    assert np.isnan(E[1]).all()
+    assert np.isnan(G[1]).all()
+    assert not np.isnan(E[success]).any()
+
+    with pytest.raises(ColpaFailed):
+        solve_via_colpa(D[1])
+
+
+@pytest.mark.parametrize("failed", [[5], [0, 17, 18, 63]])
+def test_solve_via_colpa_batch_bisection(failed, monkeypatch):
+    D = np.array([_random_grand_dynamical_matrix(2) for _ in range(64)])
+    D[failed] = -D[failed]
+
+    calls = []
+    cholesky = np.linalg.cholesky
+
+    def counted(matrices):
+        calls.append(len(matrices))
+        return cholesky(matrices)
+
+    monkeypatch.setattr(np.linalg, "cholesky", counted)
+    E, G, success = solve_via_colpa_batch(D)
+
+    assert (np.nonzero(~success)[0] == failed).all()
+    # Failed matrices are found by bisection, not one by one
+    assert len(calls) <= 1 + 2 * len(failed) * np.log2(len(D))
+    for i in np.nonzero(success)[0]:
+        assert np.allclose(E[i], solve_via_colpa(D[i])[0])
+
+
+def test_solve_via_colpa_classified():
+    D = np.array([_random_grand_dynamical_matrix(3) for _ in range(5)])
+    # Negative defined
+    D[1] = -D[1]
+    # Positive semidefinite
+    eigenvalues, eigenvectors = np.linalg.eigh(D[2])
+    eigenvalues[0] = -1e-10
+    D[2] = eigenvectors @ np.diag(eigenvalues) @ np.conjugate(eigenvectors).T
+    # Indefinite
+    D[3] = np.diag([1, -1, 1, 1, 1, 1])
+
+    E, G, status = solve_via_colpa_classified(D)
+
+    assert (
+        status
+        == [
+            COLPA_POSITIVE_DEFINITE,
+            COLPA_NEGATIVE_DEFINITE,
+            COLPA_POSITIVE_SEMIDEFINITE,
+            COLPA_UNSTABLE,
+            COLPA_POSITIVE_DEFINITE,
+        ]
+    ).all()
+    assert np.allclose(E[1], -solve_via_colpa(-D[1])[0])
+    assert np.isnan(E[3]).all()
+    assert not np.isnan(E[[0, 1, 2, 4]]).any()
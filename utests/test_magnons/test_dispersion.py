@@ -0,0 +1,378 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from magnon_models import antiferromagnet, ferromagnet
+from wulfric import Atom, Kpoints
+
+from magnopy import _chunking, _numba
+from magnopy.magnons.diagonalization import (
+    COLPA_POSITIVE_DEFINITE,
+    COLPA_POSITIVE_SEMIDEFINITE,
+)
+from magnopy.magnons.dispersion import MagnonDispersion
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+MODELS = [ferromagnet, antiferromagnet]
+
+
+def _spinw(model):
+    model = model.copy()
+    model.notation = "SpinW"
+    return model
+
+
+def _reference_J(model, k):
+    model = _spinw(model)
+    atom_indices = dict([(atom, i) for i, atom in enumerate(model.magnetic_atoms)])
+    N = len(atom_indices)
+    result = np.zeros((N, N, 3, 3), dtype=complex)
+    for atom1, atom2, R, J in model.exchange_like:
+        i = atom_indices[atom1]
+        j = atom_indices[atom2]
+        d = model.get_vector(atom1, atom2, R)
+        result[i][j] += J.matrix * np.exp(-1j * (k @ d))
+    return result
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_J_batch(model):
+    model = model()
+    dispersion = MagnonDispersion(model)
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(20, 3))
+    J = dispersion.J_batch(kpoints)
+    assert J.shape == (20, dispersion.N, dispersion.N, 3, 3)
+    for k, J_k in zip(kpoints, J):
+        assert np.allclose(J_k, _reference_J(model, k))
+        assert np.allclose(dispersion.J(k), J_k)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_h_batch(model):
+    dispersion = MagnonDispersion(model())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(10, 3))
+    h = dispersion.h_batch(kpoints)
+    N = dispersion.N
+    assert h.shape == (10, 2 * N, 2 * N)
+    C = dispersion.C()
+    for k, h_k in zip(kpoints, h):
+        assert np.allclose(h_k[:N, :N], 2 * dispersion.A(k) - 2 * C)
+        assert np.allclose(h_k[:N, N:], 2 * dispersion.B(k))
+        assert np.allclose(h_k[N:, :N], 2 * np.conjugate(dispersion.B(k)).T)
+        assert np.allclose(h_k[N:, N:], 2 * np.conjugate(dispersion.A(-k)) - 2 * C)
+        # h(k) is Hermitian
+        assert np.allclose(h_k, np.conjugate(h_k).T)
+
+
+def test_omegas_status():
+    # Goldstone mode at Gamma
+    model = ferromagnet()
+    model.remove_on_site(model.get_atom("Fe"))
+    dispersion = MagnonDispersion(model)
+    omegas, status = dispersion.omegas([[0, 0, 0], [0.1, 0, 0]], return_status=True)
+    assert omegas.shape == (1, 2)
+    assert np.allclose(omegas[0, 0], 0)
+    assert omegas[0, 1] > 0
+    assert (status == [COLPA_POSITIVE_SEMIDEFINITE, COLPA_POSITIVE_DEFINITE]).all()
+    assert np.allclose(dispersion.omega([0.1, 0, 0]), omegas[:, 1])
+
+
+def test_omega_imaginary():
+    # Spins along the intermediate axis of the anisotropy: unstable at Gamma
+    model = ferromagnet()
+    model.remove_on_site(model.get_atom("Fe"))
+    model.add_on_site(model.get_atom("Fe"), matrix=np.diag([-0.5, 0.5, 0]))
+    dispersion = MagnonDispersion(model)
+
+    omegas, G = dispersion.omega([0, 0, 0], return_imaginary=True, return_G=True)
+    assert np.allclose(omegas.real, 0)
+    assert omegas[0].imag > 0
+    assert np.allclose(np.sort(omegas.imag), np.sort(-omegas.imag))
+    assert np.allclose(G, 0)
+
+    # Stable point has no imaginary part
+    omegas = dispersion.omega([np.pi, np.pi, np.pi], return_imaginary=True)
+    assert np.allclose(omegas.imag, 0)
+    assert np.allclose(omegas.real, dispersion.omega([np.pi, np.pi, np.pi]))
+
+
+def test_omegas_parallel():
+    dispersion = MagnonDispersion(antiferromagnet())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(50, 3))
+    serial = dispersion.omegas(kpoints)
+    assert np.allclose(dispersion.omegas(kpoints, n_workers=2), serial)
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        assert np.allclose(dispersion.omegas(kpoints, executor=executor), serial)
+
+
+def test_omegas_parallel_spawned(monkeypatch):
+    # Processes are spawned once the threads of the compiled kernels are started
+    dispersion = MagnonDispersion(antiferromagnet())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(20, 3))
+    monkeypatch.setattr(_numba, "THREADS_STARTED", True)
+    assert np.allclose(
+        dispersion.omegas(kpoints, n_workers=2), dispersion.omegas(kpoints)
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_bond_tables(model):
+    model = model()
+    dispersion = MagnonDispersion(model)
+    n_bonds = len(_spinw(model).exchange_like)
+    assert dispersion.J_matrices.shape == (n_bonds, 3, 3)
+    assert dispersion.J_matrices.dtype == np.float64
+    assert dispersion.indices_i.shape == (n_bonds,)
+    assert dispersion.indices_i.dtype == np.int32
+    assert dispersion.indices_j.dtype == np.int32
+    assert dispersion.dis_vectors.shape == (n_bonds, 3)
+    # Bonds are grouped by the pair of atoms
+    pairs = dispersion.indices_i * dispersion.N + dispersion.indices_j
+    assert (np.diff(pairs) >= 0).all()
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_grid(model):
+    dispersion = MagnonDispersion(model())
+    grid = dispersion.grid(6, 6, 6)
+    assert len(grid.weights) < len(grid)
+    assert np.allclose(
+        grid.unfold(dispersion.omegas(grid)), dispersion.omegas(grid.points)
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_symmetry_operations(model):
+    dispersion = MagnonDispersion(model())
+    reciprocal_cell = dispersion.kernel.reciprocal_cell
+    operations = dispersion.symmetry_operations()
+    assert (operations[0] == np.eye(3)).all()
+
+    kpoints = np.random.uniform(0, 1, size=(5, 3))
+    for W in operations:
+        assert np.allclose(
+            dispersion.omegas(kpoints @ reciprocal_cell),
+            dispersion.omegas(kpoints @ W @ reciprocal_cell),
+        )
+
+
+def test_symmetry_operations_axial_spins():
+    # Spins along z: only the operations, that keep the axial vector z, are left
+    # (4/m), even though the mirrors m_x, m_y keep the energies as well.
+    operations = MagnonDispersion(ferromagnet()).symmetry_operations()
+    assert len(operations) == 8
+    assert not np.all(operations == np.diag([-1, 1, 1]), axis=(1, 2)).any()
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_velocity(model):
+    dispersion = MagnonDispersion(model())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(20, 3))
+    velocity = dispersion.velocity(kpoints)
+    assert velocity.shape == (dispersion.N, 20, 3)
+
+    step = 1e-6
+    finite_differences = np.stack(
+        [
+            (
+                dispersion.omegas(kpoints + step * e)
+                - dispersion.omegas(kpoints - step * e)
+            )
+            / 2
+            / step
+            for e in np.eye(3)
+        ],
+        axis=-1,
+    )
+    assert np.allclose(velocity, finite_differences, atol=1e-6)
+
+
+@pytest.mark.parametrize("model", MODELS)
+@pytest.mark.parametrize("shift", [(0, 0, 0), (0.5, 0.5, 0.5), (0.3, 0.1, 0.7)])
+def test_J_mesh(model, shift):
+    dispersion = MagnonDispersion(model())
+    grid = dispersion.grid(5, 4, 3, shift=shift, symmetry=False)
+    J = dispersion.J_mesh(5, 4, 3, shift=shift)
+    assert J.shape == (60, dispersion.N, dispersion.N, 3, 3)
+    assert np.allclose(J, dispersion.J_batch(grid.points))
+    # FFT path of omegas
+    assert np.allclose(dispersion.omegas(grid), dispersion.omegas(grid.points))
+
+
+def _honeycomb(D):
+    # Ferromagnet on the honeycomb lattice with the DMI between the second neighbours
+    model = SpinHamiltonian(
+        notation="SpinW", cell=[[1, 0, 0], [-0.5, np.sqrt(3) / 2, 0], [0, 0, 10]]
+    )
+    A = Atom("A", (1 / 3, 2 / 3, 0), spin=1)
+    B = Atom("B", (2 / 3, 1 / 3, 0), spin=1)
+    for atom in [A, B]:
+        atom.spin_vector = (0, 0, 1)
+        model.add_atom(atom)
+        model.add_on_site(atom, matrix=np.diag([0, 0, -0.1]))
+    for R in [(0, 0, 0), (-1, 0, 0), (0, 1, 0)]:
+        model.add_exchange(A, B, R, iso=-1.0)
+    for R in [(1, 0, 0), (0, 1, 0), (-1, -1, 0)]:
+        model.add_exchange(A, A, R, dmi=(0, 0, D))
+        model.add_exchange(B, B, R, dmi=(0, 0, -D))
+    return MagnonDispersion(model)
+
+
+@pytest.mark.parametrize("mesh", [(6, 6), (10, 7), (30, 30)])
+def test_chern_numbers(mesh):
+    dispersion = _honeycomb(D=0.1)
+    assert (dispersion.chern_numbers(mesh) == [-1, 1]).all()
+    assert (dispersion.chern_numbers(mesh, plane=(1, 0)) == [1, -1]).all()
+    assert (_honeycomb(D=-0.1).chern_numbers(mesh) == [1, -1]).all()
+
+
+def test_berry_curvature():
+    dispersion = _honeycomb(D=0.1)
+    curvature = dispersion.berry_curvature((20, 20))
+    assert curvature.shape == (2, 20, 20)
+    # Area of the Brillouin zone
+    area = np.linalg.norm(np.cross(*dispersion.kernel.reciprocal_cell[:2]))
+    assert np.allclose(curvature.sum(axis=(1, 2)) * area / 400, [-2 * np.pi, 2 * np.pi])
+
+    with pytest.raises(ValueError):
+        dispersion.berry_curvature((1, 20))
+    with pytest.raises(ValueError):
+        dispersion.berry_curvature((20, 20), plane=(1, 1))
+
+
+def _chains():
+    # Two decoupled chains with crossing bands
+    model = SpinHamiltonian(notation="SpinW", cell=np.eye(3))
+    A = Atom("A", (0, 0, 0), spin=1)
+    B = Atom("B", (0.5, 0.5, 0), spin=1)
+    for atom in [A, B]:
+        atom.spin_vector = (0, 0, 1)
+        model.add_atom(atom)
+    model.add_exchange(A, A, (1, 0, 0), iso=-1.0)
+    model.add_exchange(B, B, (1, 0, 0), iso=-0.3)
+    model.add_on_site(A, matrix=np.diag([0, 0, -0.1]))
+    model.add_on_site(B, matrix=np.diag([0, 0, -1.0]))
+    return MagnonDispersion(model)
+
+
+def test_connect_bands():
+    dispersion = _chains()
+    kpoints = np.linspace(0, np.pi, 101)[:, np.newaxis] * [1, 0, 0]
+    k = kpoints[:, 0]
+
+    omegas = dispersion.omegas(kpoints, connect_bands=True)
+    assert np.allclose(omegas[0], 1.2 * (1 - np.cos(k)) + 2)
+    assert np.allclose(omegas[1], 4 * (1 - np.cos(k)) + 0.2)
+
+    order = dispersion.connect_bands(kpoints)
+    assert np.allclose(
+        np.take_along_axis(dispersion.omegas(kpoints), order, axis=0), omegas
+    )
+
+    with pytest.raises(ValueError):
+        dispersion.omegas(dispersion.grid(2, 2, 2), connect_bands=True)
+
+
+def test_minimum():
+    dispersion = _chains()
+    assert np.allclose(dispersion.minimum(band=0)[0], 0.2)
+    assert np.allclose(dispersion.minimum(band=1)[0], 2.0)
+    omega, k = dispersion.gap()
+    assert np.allclose(omega, 0.2)
+    assert np.allclose(k, 0)
+
+    # Minimum is shifted from Gamma by the DMI
+    dispersion = MagnonDispersion(antiferromagnet())
+    omega, k = dispersion.minimum(band=0, mesh=(4, 4, 4))
+    scan = np.linspace(-0.2, 0.2, 401)[:, np.newaxis] * [1, 0, 0]
+    assert omega <= dispersion.omegas(scan).min() + 1e-8
+    assert np.allclose(dispersion.omegas([k])[-1], omega)
+
+    with pytest.raises(ValueError):
+        dispersion.minimum(band=2)
+
+
+def test_adaptive_path():
+    dispersion = _chains()
+
+    def path(n):
+        return Kpoints(
+            *dispersion.kernel.reciprocal_cell,
+            coordinates=[[0, 0, 0], [0.5, 0, 0], [0.5, 0.5, 0]],
+            names=["G", "X", "M"],
+            path="G-X-M-G",
+            n=n,
+        )
+
+    kpoints = path(400)
+    flat, points, omegas = dispersion.adaptive_path(kpoints, max_points=200)
+    assert len(flat) <= 200
+    assert np.all(np.diff(flat) >= 0)
+    assert np.allclose(flat[-1], kpoints.ticks()[-1])
+    assert np.allclose(dispersion.omegas(points), omegas)
+
+    # Adaptive sampling is more accurate than the equidistant one
+    reference = dispersion.omegas(kpoints)
+
+    def error(flat, omegas):
+        return np.max(
+            np.abs(
+                [np.interp(kpoints.flatten_points(), flat, band) for band in omegas]
+                - reference
+            )
+        )
+
+    uniform = path(len(flat) // 3 - 2)
+    assert error(flat, omegas) < error(
+        uniform.flatten_points(), dispersion.omegas(uniform)
+    )
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_compiled_backend(model, monkeypatch):
+    # Kernels are plain Python functions if numba is not installed,
+    # so the logic of the compiled backend is checked in any case
+    dispersion = MagnonDispersion(model())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(5, 3))
+    monkeypatch.setattr(_numba, "ENABLED", False)
+    expected = dispersion.J_batch(kpoints)
+    monkeypatch.setattr(_numba, "ENABLED", True)
+    # Several calls of the kernel
+    monkeypatch.setattr(_chunking, "MAX_ELEMENTS", 9 * dispersion.N**2 * 2)
+    assert np.allclose(dispersion.J_batch(kpoints), expected)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_compiled_kernels(model, monkeypatch):
+    # Runs the kernels compiled by numba, skipped if it is not installed
+    pytest.importorskip("numba")
+    dispersion = MagnonDispersion(model())
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(20, 3))
+    monkeypatch.setattr(_numba, "ENABLED", False)
+    expected = dispersion.J_batch(kpoints)
+    monkeypatch.setattr(_numba, "ENABLED", True)
+    monkeypatch.setattr(_chunking, "MAX_ELEMENTS", 9 * dispersion.N**2 * 3)
+    monkeypatch.setattr(_numba, "THREADS_STARTED", False)
+    assert np.allclose(dispersion.J_batch(kpoints), expected)
+    assert _numba.THREADS_STARTED
@@ -0,0 +1,79 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from magnon_models import ferromagnet, magnon_dispersion
+
+from magnopy import _chunking
+from magnopy.magnons.dos import MagnonDOS
+
+# Orthorhombic ferromagnet
+MODEL = dict(cell=np.diag([1.0, 1.2, 1.5]), iso=(-1.0, -0.7, -0.4))
+
+ENERGIES = np.linspace(-1, 30, 3101)
+
+
+@pytest.mark.parametrize(
+    "method, args", [("gaussian", (0.1,)), ("lorentzian", (0.01,)), ("tetrahedron", ())]
+)
+def test_normalization(method, args):
+    dos = MagnonDOS(magnon_dispersion(ferromagnet, **MODEL), 8, 8, 8)
+    values = getattr(dos, method)(ENERGIES, *args)
+
+    assert values.shape == ENERGIES.shape
+    assert np.all(values >= 0)
+    assert np.sum(values) * (ENERGIES[1] - ENERGIES[0]) == pytest.approx(1, abs=5e-3)
+
+
+def test_tetrahedron_against_gaussian():
+    dos = MagnonDOS(magnon_dispersion(ferromagnet, **MODEL), 16, 16, 16)
+    step = ENERGIES[1] - ENERGIES[0]
+
+    # Compare the integrated density of states
+    tetrahedron = np.cumsum(dos.tetrahedron(ENERGIES)) * step
+    gaussian = np.cumsum(dos.gaussian(ENERGIES, 0.05)) * step
+
+    assert np.allclose(tetrahedron, gaussian, atol=2e-2)
+
+
+def test_chunks(monkeypatch):
+    dos = MagnonDOS(
+        magnon_dispersion(ferromagnet, **MODEL), 5, 4, 3, shift=(0.5, 0, 0.5)
+    )
+    energies = ENERGIES[::-1]
+
+    reference = [dos.gaussian(energies, 0.1), dos.tetrahedron(energies)]
+
+    monkeypatch.setattr(_chunking, "MAX_ELEMENTS", 1000)
+
+    assert np.allclose(dos.gaussian(energies, 0.1), reference[0])
+    assert np.allclose(dos.tetrahedron(energies), reference[1])
+
+
+def test_errors():
+    dispersion = magnon_dispersion(ferromagnet, **MODEL)
+
+    with pytest.raises(ValueError):
+        MagnonDOS(dispersion, 0, 4, 4)
+    with pytest.raises(ValueError):
+        MagnonDOS(dispersion, 4, 4, 4, shift=(0, 0))
+    with pytest.raises(ValueError):
+        MagnonDOS(dispersion, 4, 4, 4).gaussian(ENERGIES, 0)
+    with pytest.raises(ValueError):
+        MagnonDOS(dispersion, 4, 4, 4).lorentzian(ENERGIES, -1)
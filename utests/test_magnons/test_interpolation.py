@@ -0,0 +1,55 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from magnon_models import antiferromagnet, ferromagnet, magnon_dispersion
+
+from magnopy.magnons.interpolation import DispersionInterpolator
+
+
+def test_grid_points():
+    dispersion = magnon_dispersion(antiferromagnet, second=-0.05)
+    interpolator = dispersion.interpolator(size=(5, 3, 3))
+    kpoints = dispersion.grid(5, 3, 3, symmetry=False).points
+
+    # Interpolation is exact at the points of the grid
+    assert np.allclose(interpolator.J_batch(kpoints), dispersion.J_batch(kpoints))
+
+
+def test_interpolation():
+    dispersion = magnon_dispersion(antiferromagnet, second=-0.05)
+    interpolator = dispersion.interpolator(oversampling=8)
+    assert interpolator.size == (40, 24, 8)
+
+    kpoints = np.random.uniform(-5, 5, size=(100, 3))
+    assert np.allclose(
+        interpolator.J_batch(kpoints), dispersion.J_batch(kpoints), atol=1e-3
+    )
+    assert np.allclose(
+        interpolator.h_batch(kpoints), dispersion.h_batch(kpoints), atol=1e-2
+    )
+    assert np.allclose(interpolator(kpoints), dispersion.omegas(kpoints), atol=1e-2)
+
+
+def test_errors():
+    dispersion = magnon_dispersion(antiferromagnet, second=-0.05)
+    with pytest.raises(ValueError):
+        DispersionInterpolator(dispersion, order=0)
+    with pytest.raises(ValueError):
+        DispersionInterpolator(dispersion, size=(4, 4))
@@ -0,0 +1,101 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pickle
+from copy import deepcopy
+
+import numpy as np
+import pytest
+from wulfric import Atom
+
+from magnopy.magnons.dispersion import MagnonDispersion
+from magnopy.magnons.kernel import DispersionKernel
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+
+def _model(notation):
+    model = SpinHamiltonian(notation="SpinW", cell=np.diag([1.0, 1.0, 2.0]))
+    Cr1 = Atom("Cr1", (0, 0, 0), spin=1.5)
+    Cr2 = Atom("Cr2", (0.5, 0.5, 0.5), spin=2.5)
+    Cr1.spin_vector = (0, 0, 1.5)
+    Cr2.spin_vector = (0, 2.5, 0)
+    model.add_atom(Cr1)
+    model.add_atom(Cr2)
+    for R in [(0, 0, 0), (-1, 0, 0), (0, -1, 0)]:
+        model.add_exchange(Cr1, Cr2, R, iso=1.0, dmi=(0.1, 0, 0.2))
+    model.add_exchange(Cr1, Cr1, (1, 0, 0), iso=-0.5, aniso=np.diag([0.1, 0, 0]))
+    model.add_on_site(Cr1, matrix=np.diag([0, 0, -0.2]))
+    model.add_on_site(Cr2, matrix=np.diag([-0.1, 0, 0]))
+    model.notation = notation
+    return model
+
+
+NOTATIONS = ["SpinW", "Magnopy", "TB2J", "Vampire", (False, True, 2.0, 0.5)]
+
+
+@pytest.mark.parametrize("notation", NOTATIONS)
+def test_notation_conversion(notation):
+    model = _model(notation)
+    reference = deepcopy(model)
+    reference.notation = "SpinW"
+
+    kernel = DispersionKernel(model)
+    # Hamiltonian is not modified
+    assert model.notation == _model(notation).notation
+
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(10, 3))
+    dispersion = MagnonDispersion(kernel)
+    expected = MagnonDispersion(_model("SpinW"))
+    assert kernel.J_matrices.shape[0] == len(reference.exchange_like)
+    assert np.allclose(dispersion.J_batch(kpoints), expected.J_batch(kpoints))
+    assert np.allclose(dispersion.C(), expected.C())
+    assert np.allclose(dispersion.omegas(kpoints), expected.omegas(kpoints))
+
+
+def test_immutable():
+    kernel = DispersionKernel(_model("SpinW"))
+    with pytest.raises(AttributeError):
+        kernel.N = 3
+    with pytest.raises(AttributeError):
+        del kernel.C
+    with pytest.raises(ValueError):
+        kernel.J_matrices[0] = 0
+    with pytest.raises(ValueError):
+        kernel.C[0, 0] = 0
+    assert deepcopy(kernel) is kernel
+
+
+def test_shared():
+    dispersion = MagnonDispersion(_model("SpinW"))
+    other = MagnonDispersion(dispersion.kernel)
+    assert other.kernel is dispersion.kernel
+    assert other.J_matrices is dispersion.J_matrices
+    assert other.C() is dispersion.C()
+
+
+def test_pickle():
+    kernel = DispersionKernel(_model("SpinW"))
+    restored = pickle.loads(pickle.dumps(kernel))
+    for name in DispersionKernel.__slots__:
+        assert np.array_equal(getattr(restored, name), getattr(kernel, name))
+    assert not restored.J_matrices.flags.writeable
+    kpoints = np.random.uniform(-np.pi, np.pi, size=(10, 3))
+    assert np.allclose(
+        MagnonDispersion(restored).omegas(kpoints),
+        MagnonDispersion(kernel).omegas(kpoints),
+    )
@@ -0,0 +1,73 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+from magnopy.magnons.kgrid import KGrid, lattice_point_group
+
+CELLS = [
+    (np.eye(3), 48),
+    (np.diag([1.0, 1.0, 2.0]), 16),
+    (np.array([[1, 0, 0], [-0.5, np.sqrt(3) / 2, 0], [0, 0, 1.6]]), 24),
+    (np.diag([1.0, 2.0, 3.0]), 8),
+]
+
+
+@pytest.mark.parametrize("cell, n_operations", CELLS)
+def test_lattice_point_group(cell, n_operations):
+    reciprocal_cell = 2 * np.pi * np.linalg.inv(cell).T
+    operations = lattice_point_group(reciprocal_cell)
+    assert len(operations) == n_operations
+    assert (operations[0] == np.eye(3)).all()
+    metric = reciprocal_cell @ reciprocal_cell.T
+    for operation in operations:
+        assert np.allclose(operation @ metric @ operation.T, metric)
+
+
+def test_kgrid_without_symmetry():
+    grid = KGrid(2 * np.pi * np.eye(3), 2, 3, 4)
+    assert len(grid) == 24
+    assert grid.relative.shape == (24, 3)
+    assert np.allclose(grid.relative[1], [0, 0, 0.25])
+    assert np.allclose(grid.irreducible, grid.points)
+    assert np.allclose(grid.weights, 1 / 24)
+
+
+@pytest.mark.parametrize("shift", [(0, 0, 0), (0.5, 0.5, 0.5)])
+def test_kgrid_reduction(shift):
+    reciprocal_cell = 2 * np.pi * np.eye(3)
+    grid = KGrid(
+        reciprocal_cell,
+        8,
+        8,
+        8,
+        shift=shift,
+        operations=lattice_point_group(reciprocal_cell),
+    )
+    if shift == (0, 0, 0):
+        assert len(grid.weights) == 35
+    assert np.allclose(grid.weights.sum(), 1)
+
+    # Values of the function with full cubic symmetry are unfolded exactly
+    def function(points):
+        return np.sort(np.cos(points), axis=-1).sum(axis=-1)
+
+    assert np.allclose(
+        grid.unfold(function(grid.irreducible)), function(grid.points), atol=1e-12
+    )
@@ -0,0 +1,85 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from magnon_models import antiferromagnet, ferromagnet, magnon_dispersion
+
+from magnopy.magnons.sqw import SQW
+
+
+def test_ferromagnet():
+    dispersion = magnon_dispersion(ferromagnet)
+    qpoints = [[0, 0, 0.3], [0.3, 0, 0]]
+    omegas, intensities = SQW(dispersion).intensities(qpoints)
+
+    assert np.allclose(omegas, dispersion.omegas(qpoints))
+    # Spin is along z, only the transverse components contribute
+    assert np.allclose(intensities, [[1.5, 0.75]])
+
+
+@pytest.mark.parametrize("model", [ferromagnet, antiferromagnet])
+def test_correlations(model):
+    dispersion = magnon_dispersion(model)
+    qpoints = np.random.uniform(-np.pi, np.pi, size=(10, 3))
+    omegas, correlations = SQW(dispersion).correlations(qpoints)
+
+    assert np.allclose(omegas, dispersion.omegas(qpoints))
+    assert correlations.shape == (dispersion.N, 10, 3, 3)
+    assert np.allclose(correlations, np.conjugate(np.swapaxes(correlations, 2, 3)))
+
+    _, intensities = SQW(dispersion, polarization=False).intensities(qpoints)
+    assert np.allclose(np.trace(correlations, axis1=2, axis2=3).real, intensities)
+
+
+def test_magnetic_bragg_point():
+    sqw = SQW(magnon_dispersion(antiferromagnet))
+    _, intensities = sqw.intensities([[0.05, 0, 0], [2 * np.pi + 0.05, 0, 0]])
+
+    assert np.all(intensities[:, 1] > 100 * intensities[:, 0])
+
+
+def test_form_factor_and_broadening():
+    dispersion = magnon_dispersion(antiferromagnet)
+    qpoints = np.random.uniform(-np.pi, np.pi, size=(5, 3))
+
+    _, bare = SQW(dispersion).intensities(qpoints)
+    _, scaled = SQW(
+        dispersion, form_factor=lambda q: 0.5 * np.ones(q.shape)
+    ).intensities(qpoints)
+    assert np.allclose(scaled, bare / 4)
+
+    energies = np.linspace(-10, 30, 4001)
+    for broadening in ["gaussian", "lorentzian"]:
+        sqw = SQW(dispersion)(qpoints, energies, 0.1, broadening=broadening)
+        assert sqw.shape == (5, len(energies))
+        assert np.allclose(
+            np.sum(sqw, axis=1) * (energies[1] - energies[0]),
+            np.sum(bare, axis=0),
+            rtol=1e-2,
+        )
+
+
+def test_errors():
+    dispersion = magnon_dispersion(antiferromagnet)
+    with pytest.raises(ValueError):
+        SQW(dispersion, form_factor=[None])
+    with pytest.raises(ValueError):
+        SQW(dispersion)([[0, 0, 0]], [0, 1], 0)
+    with pytest.raises(ValueError):
+        SQW(dispersion)([[0, 0, 0]], [0, 1], 1, broadening="voigt")
@@ -0,0 +1,82 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from magnon_models import antiferromagnet, ferromagnet, magnon_dispersion
+
+from magnopy import _chunking
+from magnopy.magnons.thermodynamics import MagnonThermodynamics
+
+# Antiferromagnet without the exchange within the sublattices
+MODELS = [(ferromagnet, {}), (antiferromagnet, dict(iso=None))]
+
+TEMPERATURES = np.linspace(0, 200, 2001)
+
+
+@pytest.mark.parametrize("model, options", MODELS)
+def test_relations(model, options):
+    thermodynamics = MagnonThermodynamics(magnon_dispersion(model, **options), 6, 6, 6)
+    U, F, C, reduction = thermodynamics.compute(TEMPERATURES)
+    step = TEMPERATURES[1] - TEMPERATURES[0]
+
+    assert U[0] == F[0] == C[0] == 0
+    assert np.all(F <= 0)
+    assert reduction.shape == (len(TEMPERATURES), thermodynamics.N)
+    assert np.all(np.diff(reduction, axis=0) >= -1e-12)
+
+    # C = dU/dT
+    assert np.allclose(np.gradient(U, step)[5:-5], C[5:-5], atol=1e-5)
+    # U = F - T dF/dT
+    assert np.allclose(
+        (F - TEMPERATURES * np.gradient(F, step))[5:-5], U[5:-5], atol=1e-4
+    )
+
+    assert np.allclose(thermodynamics.internal_energy(TEMPERATURES), U)
+    assert np.allclose(thermodynamics.free_energy(TEMPERATURES), F)
+    assert np.allclose(thermodynamics.specific_heat(TEMPERATURES), C)
+    assert np.allclose(thermodynamics.magnetization_reduction(TEMPERATURES), reduction)
+
+
+def test_zero_point_reduction():
+    thermodynamics = [
+        MagnonThermodynamics(magnon_dispersion(model, **options), 4, 4, 4)
+        for model, options in MODELS
+    ]
+
+    assert np.allclose(thermodynamics[0].magnetization_reduction([0]), 0)
+    assert np.all(thermodynamics[1].magnetization_reduction([0]) > 0)
+
+
+def test_symmetry_and_chunks(monkeypatch):
+    dispersion = magnon_dispersion(ferromagnet)
+    full = MagnonThermodynamics(dispersion, 6, 6, 6).compute(TEMPERATURES)
+    reduced = MagnonThermodynamics(dispersion, 6, 6, 6, symmetry=True)
+
+    assert len(reduced.omegas) < 6**3
+
+    monkeypatch.setattr(_chunking, "MAX_ELEMENTS", 1000)
+
+    for a, b in zip(full, reduced.compute(TEMPERATURES)):
+        assert np.allclose(a, b)
+
+
+def test_negative_temperature():
+    thermodynamics = MagnonThermodynamics(magnon_dispersion(ferromagnet), 2, 2, 2)
+    with pytest.raises(ValueError):
+        thermodynamics.compute([-1, 10])
@@ -16,4 +16,270 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
 import pytest
+from wulfric import Atom
+
+from magnopy import _numba
+from magnopy.spinham.energy import Energy
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+
+
+def _model():
+    model = SpinHamiltonian(notation="SpinW", cell=np.diag([1.0, 1.0, 2.0]))
+    Cr1 = Atom("Cr1", (0, 0, 0), spin=1.5)
+    Cr2 = Atom("Cr2", (0.5, 0.5, 0.5), spin=2.5)
+    model.add_atom(Cr1)
+    model.add_atom(Cr2)
+    for R in [(0, 0, 0), (-1, 0, 0), (0, -1, 0)]:
+        model.add_exchange(Cr1, Cr2, R, iso=1.0, dmi=(0.1, 0, 0.2))
+    model.add_exchange(Cr1, Cr1, (1, 0, 0), iso=-0.5, aniso=np.diag([0.1, 0, 0]))
+    model.add_on_site(Cr1, matrix=np.diag([0, 0, -0.2]))
+    model.add_on_site(Cr2, matrix=np.diag([-0.1, 0, 0]))
+    return model
+
+
+def test_ferro_chain():
+    model = SpinHamiltonian(notation="SpinW", cell=np.eye(3))
+    Fe = Atom("Fe", (0, 0, 0), spin=2)
+    model.add_exchange(Fe, Fe, (1, 0, 0), iso=-1.0)
+    energy = Energy(model)
+    # Two bonds due to double counting: 2 * J * S^2
+    assert np.allclose(energy.ferro([0, 0, 1]), -8)
+
+
+def test_double_counting_notation():
+    # Same physical model in both notations gives the same energies
+    double_counted = Energy(_model())
+    model = _model()
+    model.double_counting = False
+    single_counted = Energy(model)
+    # Notation of the Hamiltonian is restored
+    assert not model.double_counting
+
+    spins = np.random.uniform(-1, 1, size=(2, 3))
+    cone_axis = np.random.uniform(-1, 1, size=3)
+    spiral_vector = np.random.uniform(-1, 1, size=3)
+
+    energies = [
+        [
+            energy.ferro(spins),
+            energy.antiferro(spins, cone_axis, spiral_vector),
+            energy.spiral(spins, cone_axis, spiral_vector),
+        ]
+        for energy in [double_counted, single_counted]
+    ]
+
+    assert np.allclose(energies[0], energies[1])
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_compiled_backend(enabled, monkeypatch):
+    # Kernels are plain Python functions if numba is not installed,
+    # so the logic of the compiled backend is checked in any case
+    energy = Energy(_model())
+    spins = np.random.uniform(-1, 1, size=(2, 3))
+    cone_axis = np.random.uniform(-1, 1, size=3)
+    spiral_vector = np.random.uniform(-1, 1, size=3)
+
+    monkeypatch.setattr(_numba, "ENABLED", False)
+    expected = [
+        energy.ferro(spins),
+        energy.antiferro(spins, cone_axis, spiral_vector),
+        energy.spiral(spins, cone_axis, spiral_vector),
+    ]
+    energy._gradient_size = 3 * 2 + 6
+    energy._torque_size = 3
+    expected_gradient = energy._spiral_grad(
+        spins / np.linalg.norm(spins, axis=1)[:, np.newaxis],
+        cone_axis / np.linalg.norm(cone_axis),
+        spiral_vector,
+    )[0]
+
+    monkeypatch.setattr(_numba, "ENABLED", enabled)
+    computed = [
+        energy.ferro(spins),
+        energy.antiferro(spins, cone_axis, spiral_vector),
+        energy.spiral(spins, cone_axis, spiral_vector),
+    ]
+    gradient = energy._spiral_grad(
+        spins / np.linalg.norm(spins, axis=1)[:, np.newaxis],
+        cone_axis / np.linalg.norm(cone_axis),
+        spiral_vector,
+    )[0]
+
+    assert np.allclose(computed, expected)
+    assert np.allclose(gradient, expected_gradient)
+
+
+def test_compiled_kernels(monkeypatch):
+    # Runs the kernels compiled by numba, skipped if it is not installed
+    pytest.importorskip("numba")
+    energy = Energy(_model())
+    spins = np.random.uniform(-1, 1, size=(2, 3))
+    cone_axis = np.random.uniform(-1, 1, size=3)
+    spiral_vector = np.random.uniform(-1, 1, size=3)
+
+    expected = []
+    for enabled in [False, True]:
+        monkeypatch.setattr(_numba, "ENABLED", enabled)
+        expected.append(
+            [
+                energy.ferro(spins),
+                energy.antiferro(spins, cone_axis, spiral_vector),
+                energy.spiral(spins, cone_axis, spiral_vector),
+            ]
+        )
+
+    assert np.allclose(expected[1], expected[0])
+
+
+@pytest.mark.parametrize("field", [None, (0.3, -1.0, 2.0)])
+@pytest.mark.parametrize(
+    "case, gradient_size, torque_size", [(0, 6, 2), (1, 9, 3), (2, 12, 3)]
+)
+def test_analytic_gradient(case, gradient_size, torque_size, field):
+    energy = Energy(_model())
+    energy.magnetic_field = field
+    energy._gradient_size = gradient_size
+    energy._torque_size = torque_size
+    spins = np.random.uniform(-1, 1, size=(2, 3))
+    spins /= np.linalg.norm(spins, axis=1)[:, np.newaxis]
+    cone_axis = np.random.uniform(-1, 1, size=3)
+    cone_axis /= np.linalg.norm(cone_axis)
+    spiral_vector = np.random.uniform(-1, 1, size=3)
+    args = [(spins,), (spins, cone_axis, spiral_vector)][min(case, 1)]
+    gradient = [energy._ferro_grad, energy._antiferro_grad, energy._spiral_grad][case]
+
+    analytic = gradient(*[np.copy(arg) for arg in args])
+    energy.numerical_gradient = True
+    numerical = gradient(*[np.copy(arg) for arg in args])
+
+    assert np.allclose(analytic[0], numerical[0], atol=1e-6)
+    assert np.allclose(analytic[1], numerical[1], atol=1e-6)
+
+
+def _reference_energies(model, spins, cone_axis, spiral_vector):
+    # Direct sum over the bonds with the exchange matrices of each case
+    model = model.copy()
+    model.double_counting = True
+    indices = dict([(atom, i) for i, atom in enumerate(model.magnetic_atoms)])
+    spins = spins / np.linalg.norm(spins, axis=1)[:, np.newaxis]
+    n = cone_axis / np.linalg.norm(cone_axis)
+    K = np.array([[0, -n[2], n[1]], [n[2], 0, -n[0]], [-n[1], n[0], 0]])
+    K_sq = K @ K
+    IK_sq = np.eye(3) + K_sq
+    energies = np.zeros(3)
+    for atom1, atom2, R, J in model.exchange_like:
+        i, j = indices[atom1], indices[atom2]
+        J = J.matrix
+        qd = spiral_vector @ (R @ model.cell)
+        prefactor = model.exchange_factor * atom1.spin * atom2.spin
+        C = [
+            J,
+            IK_sq @ J @ IK_sq
+            + K_sq @ J @ K_sq * np.cos(qd)
+            - K_sq @ J @ K * np.sin(qd),
+            IK_sq @ J @ IK_sq
+            - (K @ J @ K - K_sq @ J @ K_sq) / 2 * np.cos(qd)
+            - (K @ J @ K_sq + K_sq @ J @ K) / 2 * np.sin(qd),
+        ]
+        for case in range(3):
+            energies[case] += prefactor * spins[i] @ C[case] @ spins[j]
+    return energies
+
+
+def test_vectorized_energy():
+    model = _model()
+    energy = Energy(model)
+    spins = np.random.uniform(-1, 1, size=(2, 3))
+    cone_axis = np.random.uniform(-1, 1, size=3)
+    spiral_vector = np.random.uniform(-1, 1, size=3)
+    computed = [
+        energy.ferro(spins),
+        energy.antiferro(spins, cone_axis, spiral_vector),
+        energy.spiral(spins, cone_axis, spiral_vector),
+    ]
+    assert np.allclose(
+        computed, _reference_energies(model, spins, cone_axis, spiral_vector)
+    )
+    assert energy._J_matrices.shape == (len(energy._spin_products), 3, 3)
+
+
+@pytest.mark.parametrize("field", [None, (0.1, -0.2, 0.3)])
+def test_batched_energies(field):
+    energy = Energy(_model())
+    energy.magnetic_field = field
+
+    rng = np.random.default_rng(23)
+    spin_orientations = rng.normal(size=(5, 2, 3))
+    cone_axes = rng.normal(size=(5, 3))
+    spiral_vectors = rng.normal(size=(5, 3))
+
+    assert np.allclose(
+        energy.ferro_batch(spin_orientations),
+        [energy.ferro(so) for so in spin_orientations],
+    )
+    for batch, single in [
+        (energy.antiferro_batch, energy.antiferro),
+        (energy.spiral_batch, energy.spiral),
+    ]:
+        assert np.allclose(
+            batch(spin_orientations, cone_axes, spiral_vectors),
+            [
+                single(so, n, q)
+                for so, n, q in zip(spin_orientations, cone_axes, spiral_vectors)
+            ],
+        )
+        # Single spin orientation and cone axis are broadcasted
+        assert np.allclose(
+            batch(spin_orientations[0], cone_axes[0], spiral_vectors),
+            [single(spin_orientations[0], cone_axes[0], q) for q in spiral_vectors],
+        )
+
+    with pytest.raises(ValueError):
+        energy.spiral_batch(spin_orientations, cone_axes[:2], spiral_vectors)
+
+
+def _frustrated_chain():
+    # J1-J2 chain with the spiral ground state: cos(q) = -J1 / (4 J2)
+    model = SpinHamiltonian(notation="SpinW", cell=np.eye(3))
+    Fe = Atom("Fe", (0, 0, 0), spin=1)
+    model.add_exchange(Fe, Fe, (1, 0, 0), iso=-1.0)
+    model.add_exchange(Fe, Fe, (2, 0, 0), iso=1.0)
+    return model
+
+
+def test_scan_spiral():
+    energy = Energy(_frustrated_chain())
+    q_mesh = np.zeros((4, 25, 3))
+    q_mesh[..., 0] = np.linspace(0, 2 * np.pi, 100).reshape((4, 25))
+
+    energies = energy.scan_spiral(q_mesh)
+    assert energies.shape == (4, 25)
+    assert np.allclose(
+        energies, 2 * (-np.cos(q_mesh[..., 0]) + np.cos(2 * q_mesh[..., 0]))
+    )
+    # Luttinger-Tisza is exact for the Bravais lattice
+    assert np.allclose(energy.scan_spiral(q_mesh, lower_bound=True), energies)
+
+    # And is a lower bound in general
+    energy = Energy(_model())
+    q_mesh = np.random.uniform(-np.pi, np.pi, size=(50, 3))
+    assert (
+        energy.scan_spiral(q_mesh)
+        >= energy.scan_spiral(q_mesh, lower_bound=True) - 1e-8
+    ).all()
+
+
+def test_optimize_spiral_from_mesh():
+    energy = Energy(_frustrated_chain())
+    # No iterations: the starting point is returned
+    spin_orientation, cone_axis, spiral_vector = energy.optimize(
+        case="spiral", max_iterations=0, spiral_mesh=(10, 1, 1)
+    )
+    # Minimum on the mesh is at q = 0.4 pi (and its mirror -0.4 pi)
+    assert np.allclose(np.cos(spiral_vector), [np.cos(0.4 * np.pi), 1, 1])
+
+    with pytest.raises(ValueError):
+        energy.optimize(case="spiral", max_iterations=0, spiral_mesh=(10, 0, 1))
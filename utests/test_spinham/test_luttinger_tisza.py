@@ -0,0 +1,107 @@
+# MAGNOPY - Python package for magnons.
+# Copyright (C) 2023-2024 Magnopy Team
+#
+# e-mail: anry@uv.es, web: magnopy.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from wulfric import Atom
+
+from magnopy.spinham.energy import Energy
+from magnopy.spinham.hamiltonian import SpinHamiltonian
+from magnopy.spinham.luttinger_tisza import LuttingerTisza
+
+
+def _chain(J1, J2=0, dmi=(0, 0, 0)):
+    model = SpinHamiltonian(notation="SpinW", cell=np.eye(3))
+    Fe = Atom("Fe", (0, 0, 0), spin=1)
+    model.add_exchange(Fe, Fe, (1, 0, 0), iso=J1, dmi=dmi)
+    if J2 != 0:
+        model.add_exchange(Fe, Fe, (2, 0, 0), iso=J2)
+    return model
+
+
+def _two_sublattices():
+    model = SpinHamiltonian(notation="SpinW", cell=np.eye(3))
+    Cr1 = Atom("Cr1", (0, 0, 0), spin=1.5)
+    Cr2 = Atom("Cr2", (0.5, 0, 0), spin=2.5)
+    model.add_exchange(Cr1, Cr2, (0, 0, 0), iso=1.0, dmi=(0, 0.1, 0))
+    model.add_exchange(Cr1, Cr2, (-1, 0, 0), iso=1.0)
+    model.add_exchange(Cr1, Cr1, (0, 1, 0), iso=0.5)
+    model.add_on_site(Cr1, matrix=np.diag([0, 0, -0.2]))
+    return model
+
+
+def test_J_is_hermitian():
+    lt = LuttingerTisza(_two_sublattices())
+    J = lt.J(np.random.uniform(-4, 4, size=(10, 3)))
+    assert J.shape == (10, 6, 6)
+    assert np.allclose(J, np.conjugate(np.transpose(J, (0, 2, 1))))
+    assert lt.J([0, 0, 0]).shape == (6, 6)
+
+
+def test_lowest_is_lower_bound():
+    model = _two_sublattices()
+    lt = LuttingerTisza(model)
+    energy = Energy(model)
+    q = np.random.uniform(-4, 4, size=(20, 3))
+
+    energies, eigenvectors = lt.lowest(q)
+    assert np.allclose(energies, energy.scan_spiral(q, lower_bound=True))
+    assert np.allclose(np.linalg.norm(eigenvectors, axis=1), 1)
+
+    case, bound, spin_orientation, cone_axis, spiral_vector, exact = lt.solve()
+    assert bound <= energy.ferro(spin_orientation) + 1e-8
+    assert bound <= energy.scan_spiral(q).min() + 1e-8
+
+
+@pytest.mark.parametrize(
+    "model, expected_case, expected_energy",
+    [
+        (_chain(-1.0), "ferro", -2),
+        (_chain(1.0), "antiferro", -2),
+        (_chain(-1.0, 1.0), "spiral", -2.25),
+        (_chain(-1.0, dmi=(0.5, 0, 0)), "spiral", -np.sqrt(5)),
+        (_chain(-1.0, dmi=(-0.5, 0, 0)), "spiral", -np.sqrt(5)),
+    ],
+)
+def test_solve(model, expected_case, expected_energy):
+    lt = LuttingerTisza(model)
+    energy = Energy(model)
+
+    case, bound, spin_orientation, cone_axis, spiral_vector, exact = lt.solve()
+    assert case == expected_case
+    assert exact
+    assert np.allclose(bound, expected_energy)
+
+    # Predicted state reaches the bound
+    if case == "ferro":
+        assert np.allclose(energy.ferro(spin_orientation), bound)
+    elif case == "antiferro":
+        assert np.allclose(
+            energy.antiferro(spin_orientation, cone_axis, spiral_vector), bound
+        )
+    else:
+        assert np.allclose(
+            energy.spiral(spin_orientation, cone_axis, spiral_vector), bound
+        )
+
+
+def test_case():
+    lt = LuttingerTisza(_chain(1.0))
+    assert lt.case([0, 0, 2 * np.pi]) == "ferro"
+    assert lt.case([np.pi, 0, 0]) == "antiferro"
+    assert lt.case([1.0, 0, 0]) == "spiral"